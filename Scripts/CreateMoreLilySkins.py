@@ -1,15 +1,46 @@
 import os
-import csv
-import struct
 import sys
 import json
+import time
 import unreal
 
-# --- Configuration Paths ---
-PROJ_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-CONTENT_DIR = os.path.join(PROJ_DIR, "Content")
-EXTEND_SKINS_ROOT = os.path.join(PROJ_DIR, "ExtendSkins")
-CSV_PATH = os.path.join(PROJ_DIR, "DT_SpineData_p0000.csv")
+# Helper modules live next to this script
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+# Configuration (paths, flags, import settings) is shared with the editor-free helpers
+from skin_config import (
+    CONTENT_DIR, EXTEND_SKINS_ROOT, MANIFEST_PATH, CHUNK_MANIFEST_PATH, CATALOG_PATH, TEXTURE_HASH_INDEX_PATH, SCAN_INDEX_PATH, ATLAS_CACHE_DIR, SKIN_INDEX_LUA_PATH,
+    TRACE_PATH, REGISTRY_WAIT_TIMEOUT, WATCH_MODE, SHARD_PATH, PIPELINE_MODE, PIPELINE_WORKERS, PIPELINE_QUEUE_SIZE, PIPELINE_SIMPLE_CHUNK, WATCH_DEBOUNCE, WATCH_POLL_INTERVAL, FORCE_REBUILD, DEEP_VALIDATE_PNG, DEDUPE_TEXTURES, DEDUPE_TOLERANCE, REPACK_ATLASES, TEXTURE_TIER, SOFT_REFERENCE_LAYOUT, VERBOSE_LOG, IMPORT_BATCH_SIZE, RELEASE_MEMORY_BETWEEN_BATCHES, TEXTURE_IMPORT_SETTINGS,
+    CHARACTERS_PATH, DT_PATH, DT_COLUMNS, ROW_STRUCT_PATH, EXTEND_SKIN_ASSETS_PATH, CHUNK3_LABEL_PATH,
+)
+from build_manifest import BuildManifest
+from build_trace import Tracer, trace_editor_api
+from save_coordinator import SaveCoordinator
+from process_memory import MemoryMonitor
+from skin_pipeline import UnitPipeline, split_units, merge_units
+from skin_watcher import make_watcher, wait_for_changes, describe_changes
+from skin_catalog import load_catalog
+from png_validator import reject_corrupt_pngs as reject_corrupt_files
+from texture_dedupe import TextureHashIndex, find_texture_aliases
+from atlas_repack import repack_advanced_skins, summary_lines as repack_summary_lines
+from texture_tiers import generate_tiers, use_tier, summary_lines as tier_summary_lines
+from build_scheduler import shard_result_path
+from chunk_planner import load_chunk_allocation, save_chunk_manifest, summary_lines as chunk_summary_lines
+from skin_plan import (
+    BuildPlan, asset_file_path, build_plan, plan_stages, load_row_allocation, save_row_allocation, seed_row_allocation, allocate_rows,
+    build_data_table_rows, diff_data_table_rows, rows_to_csv_string, estimate_resident_memory,
+    build_skin_index, write_skin_index_lua,
+)
+
+# Every pipeline stage and editor call of this run is recorded; the trace is written at the end
+TRACER = Tracer()
+unreal = trace_editor_api(unreal, TRACER)
+# Stages only mark packages dirty; every package is written once at the end of execute_plan
+SAVES = SaveCoordinator(unreal, lambda package: os.path.exists(asset_file_path(package)))
+# Editor working set after every import batch and memory release, reported at the end of a build
+MEMORY = MemoryMonitor()
 
 """
 Skin Types Description:
@@ -51,346 +82,456 @@ ExtendSkins/
 └── ...
 """
 
-def get_png_info(file_path):
-    """Parse PNG file header to get resolution and bit depth
-    
-    Returns:
-        tuple: (info_dict, error_string)
-        info_dict contains: w (width), h (height), bd (bit depth), ct (color type)
-        Color types: 0=Grayscale, 2=RGB, 3=Palette, 4=GrayscaleAlpha, 6=RGBA
-    """
-    with open(file_path, 'rb') as f:
-        # Read 33 bytes to ensure coverage of IHDR chunk
-        data = f.read(33)
-        if len(data) < 26 or data[:8] != b'\x89PNG\r\n\x1a\n':
-            return None, "Invalid PNG"
-        # IHDR chunk starts from byte 16: Width(4), Height(4), BitDepth(1), ColorType(1)
-        width, height, bit_depth, color_type = struct.unpack('>IIBB', data[16:26])
-        return {"w": width, "h": height, "bd": bit_depth, "ct": color_type}, ""
+def log_verbose(message):
+    """Per-asset messages inside hot loops, only with --verbose"""
+    if VERBOSE_LOG:
+        unreal.log(message)
 
 def validate_structure():
     """
-    Scan ExtendSkins folder and validate structure
-    Returns:
-    - simple_extensions: { "p0001_Lily": [extension PNG list], ... }
-    - advanced_bases: { 7: {"name": "p0007_Lily", "png": path, "atlas": path, "skel": path, "w": 0, "h": 0} }
-    - advanced_extensions: { "p0007_Lily": [extension PNG list], ... }
+    Scan ExtendSkins folder and validate structure (see skin_scanner.scan_extend_skins); an unchanged
+    tree is read from the saved skin catalog instead (see skin_catalog.load_catalog)
+    Returns: the skin_catalog.SkinCatalog every later stage of the build works on
     """
-    if not os.path.exists(EXTEND_SKINS_ROOT):
-        unreal.log_error("Missing dir: " + EXTEND_SKINS_ROOT)
-        return {}, {}, {}
+    return load_catalog(EXTEND_SKINS_ROOT, CATALOG_PATH, SCAN_INDEX_PATH, unreal.log_error, ATLAS_CACHE_DIR)
 
-    simple_extensions = {}
-    advanced_bases = {}
-    advanced_extensions = {}
+def reject_corrupt_pngs(catalog):
+    """
+    Deep-validate every PNG of the skin catalog (see png_validator.reject_corrupt_pngs)
+    Corrupt files are removed from the catalog in place. Returns the number of rejected files.
+    """
+    return reject_corrupt_files(catalog, unreal.log_error)
 
-    for folder_name in os.listdir(EXTEND_SKINS_ROOT):
-        folder_path = os.path.join(EXTEND_SKINS_ROOT, folder_name)
-        if not os.path.isdir(folder_path): continue
-        if not (folder_name.startswith("p") and folder_name.endswith("_Lily")): continue
+def find_duplicate_textures(catalog, hash_index):
+    """
+    Textures that duplicate another texture of the same skin (see texture_dedupe.find_texture_aliases)
+    Inside the editor uncached files are decoded on threads; the skin_plan.py --check pass of
+    Run_CreateMoreLilySkins.bat fills the hash cache with a process pool before the editor starts.
+    Returns: { alias_texture_name: canonical_texture_name }
+    """
+    return find_texture_aliases(catalog, hash_index, DEDUPE_TOLERANCE)
 
-        try:
-            skin_id = int(folder_name[1:5])
-        except: continue
+def repack_atlases(catalog):
+    """
+    Repack the advanced skin textures to the sheet their atlas regions need (see atlas_repack)
+    The catalog records are pointed at the repacked files in place; the savings are logged.
+    """
+    log_repack_summary(repack_advanced_skins(catalog))
 
-        files = os.listdir(folder_path)
-        
-        # --- Case A: Simple skin extensions (1-6) ---
-        if 1 <= skin_id <= 6:
-            valid_exts = []
-            base_prefix = folder_name[:5]  # Extract "p0001"
-            for f in files:
-                # Match p0001_x_Lily.png, exclude base png that might exist in folder
-                if f.startswith(base_prefix + "_") and f.endswith("_Lily.png") and f != (folder_name + ".png"):
-                    info, err = get_png_info(os.path.join(folder_path, f))
-                    if not err and info['w'] == 1024 and info['h'] == 256:
-                        valid_exts.append(f)
-                    else:
-                        unreal.log_error(f"Simple extension {f} must be 1024x256")
-            if valid_exts: simple_extensions[folder_name] = valid_exts
-
-        # --- Case B: Advanced skins (7+) ---
-        elif skin_id >= 7:
-            # Validate trinity files (required for advanced skins)
-            png_file = folder_name + ".png"      # Texture file
-            atlas_file = folder_name + ".atlas"  # Spine atlas data
-            skel_file = folder_name + ".skel"    # Binary skeleton data
-
-            if all(f in files for f in [png_file, atlas_file, skel_file]):
-                base_png_path = os.path.join(folder_path, png_file)
-                info, err = get_png_info(base_png_path)
-                if err or info['ct'] != 6:  # ColorType 6 = RGBA
-                    unreal.log_error(f"Advanced base {png_file} must be RGBA8888 (ColorType=6)")
-                    continue
-                
-                advanced_bases[skin_id] = {
-                    "name": folder_name,
-                    "png": base_png_path,
-                    "atlas": os.path.join(folder_path, atlas_file),
-                    "skel": os.path.join(folder_path, skel_file),
-                    "w": info['w'], "h": info['h']
-                }
-
-                # Find extensions for this advanced skin
-                valid_exts = []
-                base_prefix = folder_name[:5]  # Extract "p0007"
-                for f in files:
-                    # Match p0007_1_Lily.png, exclude p0007_Lily.png itself
-                    if f.startswith(base_prefix + "_") and f.endswith("_Lily.png") and f != (folder_name + ".png"):
-                        ext_info, err = get_png_info(os.path.join(folder_path, f))
-                        # Validate if size matches this advanced skin's base image
-                        if not err and ext_info['w'] == info['w'] and ext_info['h'] == info['h']:
-                            valid_exts.append(f)
-                        else:
-                            unreal.log_error(f"Extension {f} size must match base {info['w']}x{info['h']}")
-                if valid_exts: advanced_extensions[folder_name] = valid_exts
-            else:
-                unreal.log_error(f"Advanced folder {folder_name} missing Trinity files (.png, .atlas, .skel)")
+def prepare_texture_tier(catalog):
+    """
+    Bring the --texture-tier textures up to date on a process pool (see texture_tiers) and point
+    the catalog records at them.
+    """
+    reports = generate_tiers(catalog, [TEXTURE_TIER])
+    for message in reports[TEXTURE_TIER]["errors"]:
+        unreal.log_error(f"Texture tier x{TEXTURE_TIER}: {message}")
+    for line in tier_summary_lines(reports):
+        unreal.log(line)
+    use_tier(catalog, TEXTURE_TIER)
+
+def log_repack_summary(reports):
+    """Total savings always, one line per skin with --verbose; a skin that could not be repacked is imported as it is"""
+    for report in reports:
+        if report["error"]:
+            unreal.log_warning(f"Atlas repack skipped {report['name']}: {report['error']}")
+    lines = repack_summary_lines(reports)
+    unreal.log(lines[0])
+    for line in lines[1:]:
+        log_verbose(line)
+
+def wait_for_registry(asset_registry, timeout=None):
+    """Block until the asset registry has finished gathering (no fixed delay); returns False on timeout"""
+    if hasattr(asset_registry, "wait_for_completion"):
+        asset_registry.wait_for_completion()
+        return True
+    deadline = time.monotonic() + (timeout or REGISTRY_WAIT_TIMEOUT)
+    while asset_registry.is_loading_assets():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def unindexed_assets(object_paths):
+    """
+    Object paths the asset registry does not know (empty list if all are indexed)
+    Assets created in this run are indexed from memory when they are created, before
+    SAVES.commit() writes their files, so nothing is rescanned here.
+    """
+    if not object_paths:
+        return []
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    if not wait_for_registry(asset_registry):
+        unreal.log_warning(f"Asset registry still busy after {REGISTRY_WAIT_TIMEOUT:.0f}s")
+    return [path for path in object_paths if not asset_registry.get_asset_by_object_path(path).is_valid()]
+
+def refresh_registry(object_paths):
+    """
+    Rescan only the packages of the given object paths, once their files are on disk
+    Cost scales with the number of changed packages instead of the whole Characters tree.
+    Returns the object paths that are still not indexed afterwards (empty list on success).
+    """
+    packages = sorted({path.split(".")[0] for path in object_paths})
+    files = [asset_file_path(package) for package in packages if os.path.exists(asset_file_path(package))]
+    if files:
+        unreal.AssetRegistryHelpers.get_asset_registry().scan_files_synchronous(files, True)
+    return unindexed_assets(object_paths)
 
-    return simple_extensions, advanced_bases, advanced_extensions
+def release_memory(label, packages=()):
+    """
+    Let the editor free what the script no longer references, then record the working set (MEMORY)
+    `packages` were loaded only to be referenced and are unloaded again. Dirty packages always
+    stay in memory until SAVES.commit() has written them.
+    """
+    if RELEASE_MEMORY_BETWEEN_BATCHES:
+        packages = [package for package in packages if package.get_name() not in SAVES.dirty]
+        if packages:
+            unreal.EditorLoadingAndSavingUtils.unload_packages(packages)
+        unreal.SystemLibrary.collect_garbage()
+    current = MEMORY.sample(label)
+    if current is not None:
+        TRACER.gauge("memory", working_set_mb=round(current / 1048576, 1))
+
+def make_texture_factory():
+    """Texture factory shared by every texture import task, carrying TEXTURE_IMPORT_SETTINGS"""
+    factory = unreal.TextureFactory()
+    factory.set_editor_property("mip_gen_settings", getattr(unreal.TextureMipGenSettings, TEXTURE_IMPORT_SETTINGS["mip_gen_settings"]))
+    factory.set_editor_property("lod_group", getattr(unreal.TextureGroup, TEXTURE_IMPORT_SETTINGS["lod_group"]))
+    return factory
 
-def import_texture(png_path, dest_folder, asset_name):
-    """General texture import function"""
+def apply_texture_settings(texture):
+    """Re-apply settings on replaced textures (the factory keeps existing settings on reimport)
+    Returns True if a property had to be changed"""
+    mip_gen = getattr(unreal.TextureMipGenSettings, TEXTURE_IMPORT_SETTINGS["mip_gen_settings"])
+    lod_group = getattr(unreal.TextureGroup, TEXTURE_IMPORT_SETTINGS["lod_group"])
+    changed = False
+    if texture.get_editor_property("mip_gen_settings") != mip_gen:
+        texture.set_editor_property("mip_gen_settings", mip_gen)
+        changed = True
+    if texture.get_editor_property("lod_group") != lod_group:
+        texture.set_editor_property("lod_group", lod_group)
+        changed = True
+    return changed
+
+def make_import_task(filename, dest_folder, asset_name, factory=None):
+    """Build an automated import task; saving is deferred to SAVES.commit()"""
     task = unreal.AssetImportTask()
-    task.set_editor_property('filename', png_path)
+    task.set_editor_property('filename', filename)
     task.set_editor_property('destination_path', dest_folder)
     task.set_editor_property('destination_name', asset_name)
     task.set_editor_property('replace_existing', True)
     task.set_editor_property('automated', True)
-    task.set_editor_property('save', True)
+    task.set_editor_property('save', False)
+    if factory:
+        task.set_editor_property('factory', factory)
+    return task
 
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
-    
-    asset_path = dest_folder + asset_name
-    texture = unreal.load_asset(asset_path)
-    if texture:
-        texture.set_editor_property("mip_gen_settings", unreal.TextureMipGenSettings.TMGS_NO_MIPMAPS)
-        texture.set_editor_property("lod_group", unreal.TextureGroup.TEXTUREGROUP_CHARACTER)
-        unreal.EditorAssetLibrary.save_asset(asset_path)
-    return texture
+def make_import_job(op, kind, factory=None):
+    """
+    Turn a planned import into an import job for run_import_batches
+    Spine imports only submit the skel file; the modified C++ factory loads the atlas next to it.
+    DefaultSkins.json is applied right after the import, saved with the rest of the run.
+    """
+    job = {
+        "kind": kind,
+        "asset_path": op["asset_path"],
+        "fingerprint": op["fingerprint"],
+        "task": make_import_task(op["source"], op["dest"], op["name"], factory),
+    }
+    if kind == "spine":
+        # Recorded in the manifest with the import, DefaultSkins.json is applied by post_import
+        job["layers"] = (f"{op['asset_path']}.{op['name']}-data", op["layers_fingerprint"])
+
+        def post_import():
+            # Internal name is pXXXX_Lily-data
+            if os.path.exists(op["json"]):
+                apply_custom_skin_layers(f"{op['asset_path']}.{op['name']}-data", op["json"])
+        job["post_import"] = post_import
+    return job
 
-def import_spine_assets(skel_path, atlas_path, dest_folder, asset_name):
+def run_import_batches(jobs, batch_size=None):
     """
-    Modified: Only import skel file
-    Rely on modified C++ LoadAtlas to automatically and silently handle the corresponding atlas
+    Submit queued import jobs in batches of `batch_size` tasks
+    Imported objects are already in memory after import_asset_tasks, so texture settings are
+    applied through the imported object paths; the packages are only marked dirty (SAVES).
+    Between batches the import tasks are dropped and garbage is collected (release_memory), so
+    the transient import data of one batch is freed before the next one is submitted.
+    Sets job["imported"] to the list of imported object paths.
     """
-    task = unreal.AssetImportTask()
-    task.set_editor_property('filename', skel_path) # Only handle skel
-    task.set_editor_property('destination_path', dest_folder)
-    task.set_editor_property('destination_name', asset_name)
-    task.set_editor_property('replace_existing', True)
-    task.set_editor_property('automated', True) # Ensure Python side also enables automation
-    task.set_editor_property('save', True)
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+    for start in range(0, len(jobs), batch_size):
+        batch = jobs[start:start + batch_size]
+        kinds = sorted({job["kind"] for job in batch})
+        with TRACER.span(f"import_batch:{'+'.join(kinds)}", "batch", tasks=len(batch)):
+            unreal.log(f"Importing batch {start // batch_size + 1}: {len(batch)} tasks")
+            asset_tools.import_asset_tasks([job["task"] for job in batch])
+
+            for job in batch:
+                job["imported"] = [str(p) for p in job["task"].get_editor_property('imported_object_paths')]
+                if not job["imported"]:
+                    unreal.log_error(f"Import failed: {job['asset_path']}")
+                    continue
+                for object_path in job["imported"]:
+                    obj = unreal.find_object(None, object_path)
+                    if not obj:
+                        continue
+                    SAVES.mark_dirty(obj, "import")
+                    if job["kind"] == "texture" and apply_texture_settings(obj):
+                        SAVES.mark_dirty(obj, "texture_settings")
+                if job.get("post_import"):
+                    job["post_import"]()
+            for job in batch:
+                job["task"] = None
+                job.pop("post_import", None)
+            release_memory(f"import batch ({len(batch)} {'+'.join(kinds)})")
+    return jobs
 
-    unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([task])
-    unreal.log(f"Spine Skeleton triggered for {asset_name}, Atlas will be auto-loaded by C++ Factory.")
+def read_data_table_rows(data_table):
+    """Current DataTable content in the same shape as build_data_table_rows"""
+    lib = unreal.DataTableFunctionLibrary
+    names = [str(n) for n in lib.get_data_table_row_names(data_table)]
+    columns = []
+    for column in DT_COLUMNS:
+        values = [str(v) for v in lib.get_data_table_column_as_string(data_table, column)]
+        # Some engine versions prepend the column title
+        if len(values) == len(names) + 1:
+            values = values[1:]
+        columns.append(values)
+    return {name: [col[i] for col in columns] for i, name in enumerate(names)}
 
-def update_data_table(advanced_ids):
-    """Update CSV records and generate DataTable for advanced skins
+def update_data_table(advanced_ids, planned_rows=None):
+    """Sync DT_SpineData_p0000 rows for advanced skins
+    Rows are allocated once per skin id (row_allocation.json) and never renumbered.
+    The existing DataTable is diffed row by row; nothing is written when it already matches,
+    otherwise the table is refilled in memory from a CSV string (no temp file, no import task).
+    planned_rows (from build_plan) are used as is unless the allocation still has to be seeded.
+    The table and row_allocation.json are written by SAVES.commit().
     Note: Simple skins do not need to add data rows in DT_SpineData_p0000"""
-    rows = []
-    header = ["---", "Notify", "Atlas", "Skeleton", "LightMaterial"]
-    
-    if os.path.exists(CSV_PATH):
-        with open(CSV_PATH, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)
-            for row in reader:
-                if row and int(row[0]) < 12: rows.append(row)
-
-    current_row = 12
-    for sid in sorted(advanced_ids):
-        asset_id = f"p{sid:04d}_Lily"
-        new_row = [
-            str(current_row),
-            "/Game/_Zenith/Characters/p0001_Lily/p0001_Lily-notify.p0001_Lily-notify",  # Shared notify file
-            f"/Game/_Zenith/Characters/{asset_id}/{asset_id}.{asset_id}-atlas",         # Atlas reference
-            f"/Game/_Zenith/Characters/{asset_id}/{asset_id}.{asset_id}-data",          # Skeleton data reference
-            "MaterialInstanceConstant'/Game/_Zenith/Characters/p0000_Lily/MI_LilyLight1.MI_LilyLight1'"  # Light material
-        ]
-        rows.append(new_row)
-        current_row += 1
-
-    import tempfile
-    with tempfile.NamedTemporaryFile(mode='w', newline='', suffix='.csv', delete=False, encoding='utf-8') as tmp_file:
-        writer = csv.writer(tmp_file)
-        writer.writerow(header)
-        writer.writerows(rows)
-        temp_path = tmp_file.name
-
-    # Ensure the destination directory exists
-    data_dir_path = os.path.join(CONTENT_DIR, "_Zenith", "Gameplay", "Data")
-    if not os.path.exists(data_dir_path):
-        os.makedirs(data_dir_path)
-
-    # Check if row struct exists
-    struct_path = "/Game/_Zenith/Gameplay/Structures/FSpineDataGroup"
-    row_struct = unreal.load_asset(struct_path)
-    if not row_struct:
-        unreal.log_error(f"Failed to load row struct from: {struct_path}")
-        os.unlink(temp_path)
-        return
+    allocation = load_row_allocation()
+    asset_lib = unreal.EditorAssetLibrary
+    data_table = asset_lib.load_asset(DT_PATH) if asset_lib.does_asset_exist(DT_PATH) else None
+    current = read_data_table_rows(data_table) if data_table else {}
+
+    if planned_rows is None or not allocation:
+        # Seed the allocation from rows already in the DataTable (first run with this script version)
+        seed_row_allocation(allocation, current)
+        allocate_rows(advanced_ids, allocation)
+        desired = build_data_table_rows(advanced_ids, allocation)
+    else:
+        allocate_rows(advanced_ids, allocation)
+        desired = planned_rows
+    SAVES.on_commit(save_row_allocation, allocation)
+
+    added, changed, removed = diff_data_table_rows(current, desired)
+    if data_table and not (added or changed or removed):
+        unreal.log("DataTable rows already up to date, nothing to write")
+        return True
+    unreal.log(f"DataTable rows: {len(added)} added, {len(changed)} changed, {len(removed)} removed")
+
+    if not data_table:
+        # Check if row struct exists
+        struct_path = ROW_STRUCT_PATH
+        row_struct = unreal.load_asset(struct_path)
+        if not row_struct:
+            unreal.log_error(f"Failed to load row struct from: {struct_path}")
+            return False
+        factory = unreal.DataTableFactory()
+        factory.set_editor_property("struct", row_struct)
+        data_table = unreal.AssetToolsHelpers.get_asset_tools().create_asset(
+            "DT_SpineData_p0000", "/Game/_Zenith/Gameplay/Data", unreal.DataTable, factory)
+        if not data_table:
+            unreal.log_error(f"Failed to create DataTable: {DT_PATH}")
+            return False
 
-    # Create import task
     try:
-        dt_path = "/Game/_Zenith/Gameplay/Data/DT_SpineData_p0000"
-        
-        import_task = unreal.AssetImportTask()
-        import_task.filename = temp_path
-        import_task.destination_path = "/Game/_Zenith/Gameplay/Data/"
-        import_task.destination_name = "DT_SpineData_p0000"
-        import_task.replace_existing = True
-        import_task.automated = True
-        import_task.save = True  # Ensure the asset is saved after import
-        
-        factory = unreal.CSVImportFactory()
-        factory.automated_import_settings.import_row_struct = row_struct
-        import_task.factory = factory
-        
-        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([import_task])
-        
-        # Verify the asset was created/updated and force save
-        if unreal.EditorAssetLibrary.does_asset_exist(dt_path):
-            # Load the asset to ensure it's in memory
-            data_table = unreal.EditorAssetLibrary.load_asset(dt_path)
-            if data_table:
-                # Force save the loaded asset
-                unreal.EditorAssetLibrary.save_loaded_asset(data_table)
-            
+        if not unreal.DataTableFunctionLibrary.fill_data_table_from_csv_string(data_table, rows_to_csv_string(desired)):
+            unreal.log_error(f"Failed to fill DataTable: {DT_PATH}")
+            return False
+        SAVES.mark_dirty(data_table, "update_data_table")
     except Exception as e:
-        unreal.log_error(f"Exception during DataTable import: {str(e)}")
-    finally:
-        os.unlink(temp_path)
+        unreal.log_error(f"Exception during DataTable update: {str(e)}")
+        return False
+    return True
+
+def get_or_create_label(label_name, folder_path):
+    """Load the PrimaryAssetLabel at folder_path/label_name, creating it if needed"""
+    label_path = f"{folder_path}{label_name}"
+    asset_lib = unreal.EditorAssetLibrary
+
+    label = None
+    if asset_lib.does_asset_exist(label_path):
+        label = asset_lib.load_asset(label_path)
+    if not label:
+        label = unreal.AssetToolsHelpers.get_asset_tools().create_asset(label_name, folder_path, unreal.PrimaryAssetLabel, None)
+    if not label:
+        unreal.log_error(f"Failed to create asset: {label_path}")
+    return label
+
+def make_label_rules(chunk_id, priority):
+    rules = unreal.PrimaryAssetRules()
+    rules.set_editor_property("chunk_id", chunk_id)
+    rules.set_editor_property("apply_recursively", False) # Disable recursive application
+    rules.set_editor_property("priority", priority)
+    return rules
+
+def get_resident_or_load(object_path, loaded=None):
+    """
+    Return the object if it is already in memory (e.g. imported this run), otherwise load it
+    The packages loaded here are appended to `loaded`, so they can be unloaded again (release_memory).
+    """
+    obj = unreal.find_object(None, object_path)
+    if obj:
+        return obj
+    obj = unreal.load_asset(object_path)
+    if obj and loaded is not None:
+        loaded.append(obj.get_outermost())
+    return obj
+
+def query_advanced_folder_assets(advanced_folder_paths):
+    """
+    Asset registry query over the advanced skin folders only (no objects are loaded)
+    Returns: { "/Game/_Zenith/Characters/p0007_Lily": [AssetData, ...], ... }
+    """
+    grouped = {folder: [] for folder in advanced_folder_paths}
+    if not advanced_folder_paths:
+        return grouped
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    ar_filter = unreal.ARFilter(package_paths=advanced_folder_paths, recursive_paths=True)
+    for asset_data in asset_registry.get_assets(ar_filter):
+        # "/Game/_Zenith/Characters/p0007_Lily/Textures" -> "/Game/_Zenith/Characters/p0007_Lily"
+        folder = "/".join(str(asset_data.package_path).split("/")[:5])
+        if folder in grouped and str(asset_data.asset_class) != "PrimaryAssetLabel":
+            grouped[folder].append(asset_data)
+    return grouped
 
-def setup_chunk2_label(simple_skins, advanced_base_skins, advanced_extend_skins):
+def setup_advanced_folder_label(folder_path, base_name, chunk_id, priority=1):
     """
-    Configure PrimaryAssetLabel (Chunk2)
-    1. Generated path: Content/Chunk2.uasset
+    Configure a PrimaryAssetLabel inside an advanced skin folder
+    label_assets_in_my_directory makes the cooker label every asset under the folder
+    (including Textures/) from the asset registry, so nothing has to be loaded here.
+    The label keeps its Chunk2_ name when the skin moves to another chunk (one label per folder);
+    its rules decide the chunk.
+    """
+    label = get_or_create_label(f"Chunk2_{base_name}", folder_path + "/")
+    if not label:
+        return None
+    label.set_editor_property("rules", make_label_rules(chunk_id, priority))
+    label.set_editor_property("label_assets_in_my_directory", True)
+    label.set_editor_property("explicit_assets", [])
+    SAVES.mark_dirty(label, "setup_chunk_labels")
+    return label
+
+def setup_chunk_label(label_path, chunk_id, simple_textures, advanced_folders, mod_assets):
+    """
+    Configure one chunk's PrimaryAssetLabel from the planned contents (see skin_plan.build_plan)
+    1. Generated path: Content/Chunk2.uasset (core chunk), Content/ChunkN.uasset (skin chunks, N >= 5)
     2. Priority: 1
     3. Recursive apply: False
     4. Included resources:
-       - Advanced skins: All resources in p0007_Lily and above folders
+       - Advanced skins: All resources in their p0007_Lily and above folders,
+         labeled by a per-folder label (Content/_Zenith/Characters/pXXXX_Lily/Chunk2_pXXXX_Lily.uasset)
        - Simple skins: Extended textures in p0001-p0006_Lily folders
-       - Advanced skin extensions: Extended textures in p0007_Lily and above folders
+       - Advanced skin extensions: Extended textures in p0007_Lily and above folders (covered by the folder labels)
+       - Mod assets (core chunk only)
     """
-    label_name = "Chunk2"
-    folder_path = "/Game/"
-    label_path = f"{folder_path}{label_name}"
+    folder_path, label_name = label_path.rsplit("/", 1)
+    folder_path += "/"
     
-    asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
     asset_lib = unreal.EditorAssetLibrary
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
 
     # 1. Ensure Label asset exists
-    label = None
-    if asset_lib.does_asset_exist(label_path):
-        label = asset_lib.load_asset(label_path)
-    if not label:
-        label = asset_tools.create_asset(label_name, folder_path, unreal.PrimaryAssetLabel, None)
-
+    label = get_or_create_label(label_name, folder_path)
     if not label:
-        unreal.log_error(f"Failed to create asset: {label_path}")
-        return
+        return False
 
     # 2. Configure rules
-    rules = unreal.PrimaryAssetRules()
-    rules.set_editor_property("chunk_id", 2)
-    rules.set_editor_property("apply_recursively", False) # Disable recursive application
-    rules.set_editor_property("priority", 1)              # Set priority to 1
-    label.set_editor_property("rules", rules)
+    label.set_editor_property("rules", make_label_rules(chunk_id, 1))
 
     # 3. Collect resources
     explicit_assets = []
     
-    char_root = "/Game/_Zenith/Characters/"
-    all_assets_in_char = asset_lib.list_assets(char_root, recursive=True)
-    
-    for a_path in all_assets_in_char:
-        path_str = str(a_path)
-        path_parts = path_str.split('/')
-        
-        is_advanced_folder = False
-        for part in path_parts:
-            # Check if it's an advanced skin folder
-            if part.startswith("p") and part.endswith("_Lily") and len(part) == 10:
-                try:
-                    folder_id = int(part[1:5])
-                    if folder_id >= 7:
-                        is_advanced_folder = True
-                        break
-                except ValueError:
-                    continue
-        
-        if is_advanced_folder:
-            asset_obj = asset_lib.load_asset(path_str)
-            if asset_obj:
-                explicit_assets.append(asset_obj)
+    # 3.1 Advanced skin folders: registry query limited to the skin folders, one directory label each
+    folder_assets = query_advanced_folder_assets(advanced_folders)
+    advanced_asset_count = 0
+    for folder, assets in folder_assets.items():
+        if not assets:
+            unreal.log_warning(f"No assets found in advanced skin folder: {folder}")
+            continue
+        if setup_advanced_folder_label(folder, folder.split("/")[-1], chunk_id):
+            advanced_asset_count += len(assets)
     
     # 3.2 Add simple skin texture resources
-    for skin in simple_skins:
-        # Simple skin format: p000x_y_Lily.png
-        base_id = skin[:5] + "_Lily"  # p000x_Lily
-        texture_name = skin.replace(".png", "")
-        texture_path = f"/Game/_Zenith/Characters/{base_id}/Textures/{texture_name}"
-        
-        if asset_lib.does_asset_exist(texture_path):
-            texture_obj = asset_lib.load_asset(texture_path)
+    # explicit_assets are soft references: textures loaded just for the list are unloaded afterwards
+    loaded_packages = []
+    for texture_path in simple_textures:
+        if asset_registry.get_asset_by_object_path(texture_path).is_valid():
+            texture_obj = get_resident_or_load(texture_path, loaded_packages)
             if texture_obj:
                 explicit_assets.append(texture_obj)
-                unreal.log(f"Added simple skin to Chunk2: {texture_path}")
     
-    # 3.3 Add advanced skin extension texture resources
-    for skin in advanced_extend_skins:
-        # Advanced skin extension format: pzzzz_y_Lily.png
-        base_id = skin[:5] + "_Lily"  # pzzzz_Lily
-        texture_name = skin.replace(".png", "")
-        texture_path = f"/Game/_Zenith/Characters/{base_id}/Textures/{texture_name}"
-        
-        if asset_lib.does_asset_exist(texture_path):
-            texture_obj = asset_lib.load_asset(texture_path)
-            if texture_obj:
-                explicit_assets.append(texture_obj)
-                unreal.log(f"Added advanced extend skin to Chunk2: {texture_path}")
+    # 3.3 Advanced skin extension textures live in the advanced folders and are covered by their folder labels
     
     # 3.4 Add Mod specific resources
-    mod_assets = [
-        "/Game/Mods/EnderLilies_More_Skins_Mod/BP_ExtendSkinAssets",
-        "/Game/Mods/EnderLilies_More_Skins_Mod/ExtendSkinAssets",
-        "/Game/Mods/EnderLilies_More_Skins_Mod/ModActor"
-    ]
-    
+    mod_asset_count = 0
     for mod_asset_path in mod_assets:
         if asset_lib.does_asset_exist(mod_asset_path):
             mod_obj = asset_lib.load_asset(mod_asset_path)
             if mod_obj:
                 explicit_assets.append(mod_obj)
-                unreal.log(f"Added Mod asset to Chunk2: {mod_asset_path}")
+                mod_asset_count += 1
+                log_verbose(f"Added Mod asset to {label_name}: {mod_asset_path}")
         else:
             unreal.log_warning(f"Mod asset not found: {mod_asset_path}")
 
-    # 4. Write explicit asset list and save
+    # 4. Write explicit asset list (saved by SAVES.commit)
     label.set_editor_property("explicit_assets", explicit_assets)
-    asset_lib.save_loaded_asset(label)
+    SAVES.mark_dirty(label, "setup_chunk_labels")
+    explicit_count = len(explicit_assets)
+    texture_obj = mod_obj = explicit_assets = None
+    release_memory(f"setup_chunk_label:{label_name}", loaded_packages)
     
-    unreal.log(f"--- [Success] Chunk2 configuration updated ---")
+    unreal.log(f"--- [Success] {label_name} configuration updated ---")
     unreal.log(f"Label location: {label_path}")
     unreal.log(f"Settings: Priority=1, Recursive=False")
-    unreal.log(f"Total included assets: {len(explicit_assets)}")
-    unreal.log(f"- Simple skins: {len(simple_skins)}")
-    unreal.log(f"- Advanced base skins (full folders): {len(advanced_base_skins)}")
-    unreal.log(f"- Advanced extend skins: {len(advanced_extend_skins)}")
-    unreal.log(f"- Mod assets: {len([a for a in mod_assets if asset_lib.does_asset_exist(a)])}")
+    unreal.log(f"Total included assets: {explicit_count + advanced_asset_count}")
+    unreal.log(f"- Simple skins: {len(simple_textures)}")
+    unreal.log(f"- Advanced base skins (full folders, including extensions): {len(advanced_folders)} ({advanced_asset_count} assets)")
+    unreal.log(f"- Mod assets: {mod_asset_count}")
+    return True
+
+def empty_chunk_label(label_path):
+    """Clear a skin chunk label whose skins moved or were removed, so its pak stays empty"""
+    asset_lib = unreal.EditorAssetLibrary
+    if not asset_lib.does_asset_exist(label_path):
+        return
+    label = asset_lib.load_asset(label_path)
+    if label:
+        label.set_editor_property("explicit_assets", [])
+        SAVES.mark_dirty(label, "setup_chunk_labels")
+        unreal.log(f"Emptied chunk label without skins: {label_path}")
+
+def setup_chunk_labels(chunks):
+    """Configure the core chunk and every skin chunk label (plan.chunks); returns False if a label failed"""
+    for label in chunks["labels"]:
+        if not setup_chunk_label(label["label"], label["chunk_id"], label["simple_textures"], label["advanced_folders"], label["mod_assets"]):
+            return False
+    for label_path in chunks["released"]:
+        empty_chunk_label(label_path)
+    return True
 
-def setup_chunk3_label():
+def setup_chunk3_label(assets=None):
     """
     Configure PrimaryAssetLabel (Chunk3) - Specifically for DT_SpineData_p0000
     1. Generated path: Content/Chunk3.uasset
     2. Priority: 2
     3. Recursive apply: False
-    4. Included resources: Only DT_SpineData_p0000
+    4. Included resources: Only DT_SpineData_p0000 (the planned asset list)
     """
-    label_name = "Chunk3"
-    folder_path = "/Game/"
-    label_path = f"{folder_path}{label_name}"
+    folder_path, label_name = CHUNK3_LABEL_PATH.rsplit("/", 1)
+    folder_path += "/"
+    label_path = CHUNK3_LABEL_PATH
     
     asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
     asset_lib = unreal.EditorAssetLibrary
@@ -404,7 +545,7 @@ def setup_chunk3_label():
 
     if not label:
         unreal.log_error(f"Failed to create asset: {label_path}")
-        return
+        return False
 
     # 2. Configure rules
     rules = unreal.PrimaryAssetRules()
@@ -416,32 +557,37 @@ def setup_chunk3_label():
     # 3. Collect resources - only DT_SpineData_p0000
     explicit_assets = []
     
-    dt_path = "/Game/_Zenith/Gameplay/Data/DT_SpineData_p0000"
-    if asset_lib.does_asset_exist(dt_path):
-        dt_obj = asset_lib.load_asset(dt_path)
-        if dt_obj:
-            explicit_assets.append(dt_obj)
-            unreal.log(f"Added DataTable to Chunk3: {dt_path}")
+    for dt_path in assets or [DT_PATH]:
+        if asset_lib.does_asset_exist(dt_path):
+            dt_obj = asset_lib.load_asset(dt_path)
+            if dt_obj:
+                explicit_assets.append(dt_obj)
+                unreal.log(f"Added DataTable to Chunk3: {dt_path}")
+            else:
+                unreal.log_warning(f"Failed to load DataTable: {dt_path}")
         else:
-            unreal.log_warning(f"Failed to load DataTable: {dt_path}")
-    else:
-        unreal.log_warning(f"DataTable not found: {dt_path}")
+            unreal.log_warning(f"DataTable not found: {dt_path}")
 
-    # 4. Write explicit asset list and save
+    # 4. Write explicit asset list (saved by SAVES.commit)
     label.set_editor_property("explicit_assets", explicit_assets)
-    asset_lib.save_loaded_asset(label)
+    SAVES.mark_dirty(label, "setup_chunk3_label")
     
     unreal.log(f"--- [Success] Chunk3 configuration created ---")
     unreal.log(f"Label location: {label_path}")
     unreal.log(f"Settings: Priority=2, Recursive=False")
     unreal.log(f"Total included assets: {len(explicit_assets)}")
+    return True
 
-def update_extend_skin_data_asset(simple_skins, advanced_base_skins, advanced_extend_skins):
+def update_extend_skin_data_asset(texture_paths, atlas_paths, skeleton_paths, soft_references=False):
     """
     Automatically populate the three array variables of ExtendSkinAssets data asset
+    The object paths come from the plan (see skin_plan.build_plan).
+    With soft_references=True the arrays are left empty: SwitchSkinMod resolves each skin
+    from the object paths in SkinIndex.lua and loads only the selected one, while the chunk
+    labels keep every asset in the pak.
     """
     # Target Data Asset path (based on your screenshot)
-    da_path = "/Game/Mods/EnderLilies_More_Skins_Mod/ExtendSkinAssets"
+    da_path = EXTEND_SKIN_ASSETS_PATH
     
     # Check if asset exists
     if not unreal.EditorAssetLibrary.does_asset_exist(da_path):
@@ -452,87 +598,62 @@ def update_extend_skin_data_asset(simple_skins, advanced_base_skins, advanced_ex
         if os.path.exists(empty_file_path):
             import shutil
             shutil.copy2(empty_file_path, target_file_path)
+            SAVES.add_created_file(da_path, target_file_path)
             unreal.log(f"Copied ExtendSkinAssets from .empty file")
             
-            # Refresh asset registry to recognize new file
-            asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
-            asset_registry.scan_paths_synchronous(["/Game/Mods/"], True)
+            # Refresh asset registry to recognize new file (only this package)
+            missing = refresh_registry([f"{da_path}.{da_path.rsplit('/', 1)[-1]}"])
             
             # Check again if asset exists
-            if not unreal.EditorAssetLibrary.does_asset_exist(da_path):
+            if missing or not unreal.EditorAssetLibrary.does_asset_exist(da_path):
                 unreal.log_warning(f"Failed to load ExtendSkinAssets after copying from .empty file")
-                return
+                return False
         else:
             unreal.log_warning(f"ExtendSkinAssets not found and no .empty file available")
-            return
+            return False
 
     # Load Data Asset
     data_asset = unreal.load_asset(da_path)
+
+    if soft_references:
+        data_asset.set_editor_property("ExtendSkinTextures", [])
+        data_asset.set_editor_property("ExtendSkinAtlas", [])
+        data_asset.set_editor_property("ExtendSkinSkeleton", [])
+        SAVES.mark_dirty(data_asset, "update_extend_skin_data_asset")
+        unreal.log(f"--- [Success] Updated ExtendSkinAssets (soft reference layout, paths in SkinIndex.lua) ---")
+        unreal.log_warning("Soft reference layout: SwitchSkinMod finds the advanced skins only through SkinIndex.lua, "
+                           "ship the SkinIndex.lua of this build with the mod")
+        return True
     
-    # --- 1. Collect Textures (include all types) ---
+    # --- 1. Collect Textures (simple, advanced base, advanced extended) ---
     texture_assets = []
-    
-    # Helper function: Get texture path based on filename and type
-    def get_tex_asset(filename, skin_type):
-        asset_name = filename.replace(".png", "")
-        if skin_type == "simple" or skin_type == "advanced_extend":
-            # Extended skins are in corresponding Base folder
-            base_id = filename[:5] + "_Lily"
-            path = f"/Game/_Zenith/Characters/{base_id}/Textures/{asset_name}"
-        else:
-            # Advanced base skins are in their own folder
-            path = f"/Game/_Zenith/Characters/{asset_name}/Textures/{asset_name}"
-        
-        return unreal.load_asset(path)
-
-    # Collect simple skins
-    for skin in simple_skins:
-        tex = get_tex_asset(skin, "simple")
-        if tex: texture_assets.append(tex)
-            
-    # Collect advanced base skins
-    for skin in advanced_base_skins:
-        tex = get_tex_asset(skin, "advanced_base")
-        if tex: texture_assets.append(tex)
-            
-    # Collect advanced extended skins
-    for skin in advanced_extend_skins:
-        tex = get_tex_asset(skin, "advanced_extend")
+    for texture_path in texture_paths:
+        tex = unreal.load_asset(texture_path)
         if tex: texture_assets.append(tex)
 
     # --- 2. Collect Atlas and Skeleton Data (Advanced Base only) ---
+    # UE4 Asset Reference Format: /Path/To/PackageName.ObjectName
+    # PackageName is p0007_Lily (the .uasset filename without extension)
+    # ObjectName is p0007_Lily-atlas or p0007_Lily-data (internal object names)
     atlas_assets = []
     skeleton_assets = []
     
-    for skin in advanced_base_skins:
-        asset_id = skin.replace(".png", "")
-        
-        # UE4 Asset Reference Format: /Path/To/PackageName.ObjectName
-        # PackageName is p0007_Lily (the .uasset filename without extension)
-        # ObjectName is p0007_Lily-atlas or p0007_Lily-data (internal object names)
-        
-        # 1. Base package path (points to .uasset file)
-        package_path = f"/Game/_Zenith/Characters/{asset_id}/{asset_id}"
-        
-        # 2. Build specific object reference path with dot notation
-        # The dot "." separates package path from internal object name
-        atlas_full_path = f"{package_path}.{asset_id}-atlas"
-        data_full_path = f"{package_path}.{asset_id}-data"
-        
-        unreal.log(f"Trying to load Atlas at: {atlas_full_path}")
+    for atlas_full_path, data_full_path in zip(atlas_paths, skeleton_paths):
+        asset_id = atlas_full_path.rsplit("/", 1)[-1].split(".")[0]
+        log_verbose(f"Trying to load Atlas at: {atlas_full_path}")
         
         atlas_obj = unreal.load_asset(atlas_full_path)
         data_obj = unreal.load_asset(data_full_path)
         
         if atlas_obj: 
             atlas_assets.append(atlas_obj)
-            unreal.log(f"Found Atlas: {asset_id}")
+            log_verbose(f"Found Atlas: {asset_id}")
         else: 
             unreal.log_warning(f"Missing Atlas for {asset_id} (Path: {atlas_full_path})")
             
         if data_obj: 
             skeleton_assets.append(data_obj)
-            unreal.log(f"Found Skeleton Data: {asset_id}")
+            log_verbose(f"Found Skeleton Data: {asset_id}")
         else:
             unreal.log_warning(f"Missing Skeleton Data for {asset_id} (Path: {data_full_path})")
 
@@ -541,21 +662,24 @@ def update_extend_skin_data_asset(simple_skins, advanced_base_skins, advanced_ex
     data_asset.set_editor_property("ExtendSkinAtlas", atlas_assets)
     data_asset.set_editor_property("ExtendSkinSkeleton", skeleton_assets)
     
-    unreal.EditorAssetLibrary.save_loaded_asset(data_asset)
+    SAVES.mark_dirty(data_asset, "update_extend_skin_data_asset")
     unreal.log(f"--- [Success] Updated ExtendSkinAssets ---")
     unreal.log(f"Textures: {len(texture_assets)}")
     unreal.log(f"Atlases: {len(atlas_assets)}")
     unreal.log(f"Skeletons: {len(skeleton_assets)}")
+    return True
 
 def apply_custom_skin_layers(asset_path, json_path):
-    """Override DefaultSkins property from JSON only"""
+    """Override DefaultSkins property from JSON only (the asset is saved by SAVES.commit)
+    Returns True if the layers were set"""
     if not os.path.exists(json_path):
-        return
+        return False
 
     # Load asset (internal name is pXXXX_Lily-data)
-    asset = unreal.load_asset(asset_path)
+    asset = get_resident_or_load(asset_path)
     if not asset:
-        return
+        unreal.log_error(f"[SDK] Skeleton data not found: {asset_path}")
+        return False
 
     try:
         with open(json_path, 'r', encoding='utf-8') as f:
@@ -565,87 +689,355 @@ def apply_custom_skin_layers(asset_path, json_path):
             # Directly override C++ default generated ["_common", "pXXXX_Lily", "_Meat_Head_0"]
             asset.set_editor_property("DefaultSkins", config["DefaultSkins"])
             
-            # Save and mark dirty data
-            unreal.EditorAssetLibrary.save_loaded_asset(asset)
-            unreal.log(f"[SDK] Custom skins applied to: {asset_path}")
+            # Mark dirty, saved with the rest of the run
+            SAVES.mark_dirty(asset, "default_skins")
+            log_verbose(f"[SDK] Custom skins applied to: {asset_path}")
+            return True
             
     except Exception as e:
         unreal.log_error(f"[SDK] Failed to parse {json_path}: {str(e)}")
+    return False
 
 
-# --- Main execution flow ---
-if __name__ == "__main__":
+def make_import_jobs(texture_ops, spine_ops):
+    """Import jobs for planned imports, textures first so the spine factory can resolve its page texture"""
+    texture_factory = make_texture_factory() if texture_ops else None
+    import_jobs = [make_import_job(op, "texture", texture_factory) for op in texture_ops]
+    import_jobs += [make_import_job(op, "spine") for op in spine_ops]
+    return import_jobs
+
+def run_plan_stages(plan, manifest):
+    """
+    Run the stages of a BuildPlan in memory; returns False as soon as one fails
+    Finished steps are recorded in the manifest only once SAVES.commit() has written them,
+    so the next plan contains them again if the run is rolled back.
+    """
+    # 1. Imports
+    with TRACER.span("imports", textures=len(plan.texture_imports), spine=len(plan.spine_imports)):
+        import_jobs = run_import_batches(make_import_jobs(plan.texture_imports, plan.spine_imports))
+    return run_asset_stages(plan, manifest, import_jobs)
+
+def run_asset_stages(plan, manifest, import_jobs):
+    """Every stage after the imports (run_plan_stages); `import_jobs` are the jobs run_import_batches finished"""
+    for job in import_jobs:
+        if job["imported"]:
+            SAVES.on_commit(manifest.mark_asset, job["asset_path"], job["fingerprint"])
+            if job.get("layers"):
+                SAVES.on_commit(manifest.mark_asset, *job["layers"])
+    unreal.log(f"Imported {len([j for j in import_jobs if j['imported']])}/{len(import_jobs)} queued assets")
+
+    # DefaultSkins.json edits on spine assets that were not reimported
+    if plan.layer_updates:
+        with TRACER.span("apply_custom_skin_layers", assets=len(plan.layer_updates)):
+            for op in plan.layer_updates:
+                if apply_custom_skin_layers(op["asset_path"], op["json"]):
+                    SAVES.on_commit(manifest.mark_asset, op["asset_path"], op["fingerprint"])
+
+    # 2. Update DataTable (only for advanced base skins)
+    if plan.data_table:
+        with TRACER.span("update_data_table", rows=len(plan.data_table["rows"])):
+            if not update_data_table(plan.data_table["advanced_ids"], plan.data_table["rows"]):
+                return False
+        SAVES.on_commit(manifest.mark_stage, "update_data_table", plan.data_table["fingerprint"])
+    else:
+        unreal.log("DataTable inputs unchanged, skipping update_data_table")
+
+    # 3. Check that the registry knows the assets imported above, then update DataAsset and Labels
+    imported_paths = [path for job in import_jobs for path in job["imported"]]
+    if imported_paths:
+        with TRACER.span("registry_check", assets=len(imported_paths)):
+            missing = unindexed_assets(imported_paths)
+        if missing:
+            # Fail fast: the data asset and labels would silently leave these skins out
+            unreal.log_error(f"Asset registry is missing {len(missing)} imported assets, "
+                             f"stopping before the data asset and label stages:")
+            for object_path in missing:
+                unreal.log_error(f"- Not indexed: {object_path}")
+            return False
+
+    if plan.data_asset:
+        unreal.log("Updating ExtendSkinAssets Data Asset...")
+        data_asset = plan.data_asset
+        with TRACER.span("update_extend_skin_data_asset", textures=len(data_asset["textures"])):
+            if not update_extend_skin_data_asset(data_asset["textures"], data_asset["atlases"], data_asset["skeletons"], data_asset["soft_references"]):
+                return False
+        release_memory("update_extend_skin_data_asset")
+        SAVES.on_commit(manifest.mark_stage, "update_extend_skin_data_asset", data_asset["fingerprint"])
+    else:
+        unreal.log("Skin lists unchanged, skipping update_extend_skin_data_asset")
+
+    if plan.chunks:
+        with TRACER.span("setup_chunk_labels", labels=len(plan.chunks["labels"]), released=len(plan.chunks["released"])):
+            if not setup_chunk_labels(plan.chunks):
+                return False
+        SAVES.on_commit(manifest.mark_stage, "setup_chunk_labels", plan.chunks["fingerprint"])
+    else:
+        unreal.log("Skin lists unchanged, skipping setup_chunk_labels")
+
+    if plan.chunk3:
+        with TRACER.span("setup_chunk3_label"):
+            if not setup_chunk3_label(plan.chunk3["assets"]):
+                return False
+        SAVES.on_commit(manifest.mark_stage, "setup_chunk3_label", plan.chunk3["fingerprint"])
+    else:
+        unreal.log("DataTable unchanged, skipping setup_chunk3_label")
+    return True
+
+def run_pipelined_stages(pipeline, plan, manifest):
+    """
+    Import skin units as the pipeline workers prepare them, then run the remaining stages (--pipeline)
+    The editor imports whatever is prepared whenever it would otherwise wait, or once
+    IMPORT_BATCH_SIZE imports are queued. A unit the workers could not prepare is logged and left
+    out of the build. The import operations are collected on `plan`; the DataTable, data asset
+    and label stages are planned once every unit is in, from the units that made it.
+    """
+    import_jobs = []
+    pending = []  # prepared units whose imports were not submitted yet
+    spine_fingerprints = []
+    aliases = {}
+    repack_reports = []
+
+    def flush():
+        texture_ops = [op for prepared in pending for op in prepared.plan.texture_imports]
+        spine_ops = [op for prepared in pending for op in prepared.plan.spine_imports]
+        with TRACER.span("imports", textures=len(texture_ops), spine=len(spine_ops), units=len(pending)):
+            import_jobs.extend(run_import_batches(make_import_jobs(texture_ops, spine_ops)))
+        pending.clear()
+
+    for prepared in pipeline:
+        for message in prepared.rejected:
+            unreal.log_error(message)
+        for message in prepared.tier_errors:
+            unreal.log_error(f"Texture tier x{TEXTURE_TIER}: {message}")
+        if prepared.error:
+            unreal.log_error(f"Skipping {prepared.label}: {prepared.error}")
+            continue
+        fragment = prepared.plan
+        plan.texture_imports += fragment.texture_imports
+        plan.spine_imports += fragment.spine_imports
+        plan.layer_updates += fragment.layer_updates
+        plan.skipped += fragment.skipped
+        spine_fingerprints += prepared.spine_fingerprints
+        aliases.update(prepared.aliases)
+        repack_reports += prepared.repack_reports
+        if fragment.imports:
+            pending.append(prepared)
+        queued = sum(len(unit.plan.imports) for unit in pending)
+        if queued >= IMPORT_BATCH_SIZE or (queued and not pipeline.ready()):
+            flush()
+    if pending:
+        flush()
+
+    failed = [prepared for prepared in pipeline.prepared if prepared.error]
+    if REPACK_ATLASES:
+        log_repack_summary(repack_reports)
+    with TRACER.span("build_plan"):
+        plan_stages(plan, merge_units(pipeline.prepared), manifest, SOFT_REFERENCE_LAYOUT, spine_fingerprints, aliases)
+    unreal.log("\n--- Build Plan (pipelined) ---")
+    for line in plan.summary_lines(verbose=VERBOSE_LOG):
+        unreal.log(line)
+    if failed:
+        unreal.log_warning(f"{len(failed)} of {len(pipeline.prepared)} skin units were left out, see the errors above")
+    return run_asset_stages(plan, manifest, import_jobs)
+
+def run_transaction(run_stages, *args):
+    """
+    Run build stages through the editor as one transaction
+    Every stage runs in memory first; only if all of them succeed are the dirty packages
+    written, each exactly once. Otherwise the changes are rolled back and nothing of this
+    run reaches the disk (no half-updated chunk labels).
+    """
+    SAVES.reset()
+    try:
+        succeeded = run_stages(*args)
+    except Exception as e:
+        unreal.log_error(f"Exception during build: {str(e)}")
+        succeeded = False
+
+    if not succeeded:
+        unreal.log_warning("Build stage failed, discarding the changes of this run...")
+        with TRACER.span("rollback", packages=len(SAVES.dirty)):
+            SAVES.rollback()
+        return False
+
+    with TRACER.span("save_packages", packages=len(SAVES.dirty)):
+        if not SAVES.commit():
+            return False
+    # The packages are on disk now: rescan just their files so the registry matches what was written
+    saved_paths = [obj.get_path_name() for objects in SAVES.dirty.values() for obj in objects]
+    if saved_paths:
+        unreal.log(f"Refreshing asset registry for {len(SAVES.dirty)} saved packages...")
+        with TRACER.span("registry_refresh", packages=len(SAVES.dirty)):
+            missing = refresh_registry(saved_paths)
+        for object_path in missing:
+            unreal.log_warning(f"Not indexed after saving: {object_path}")
+    release_memory("save_packages")
+    for line in SAVES.summary_lines(verbose=VERBOSE_LOG):
+        unreal.log(line)
+    return True
+
+def execute_plan(plan, manifest):
+    """Apply a BuildPlan through the editor as one transaction (run_transaction)"""
+    return run_transaction(run_plan_stages, plan, manifest)
+
+
+def run_build(force=False):
+    """Validate, plan and apply one build; returns False if a stage failed"""
+    MEMORY.reset()
+    # Load the build manifest (content hashes of the previous run)
+    manifest = BuildManifest(MANIFEST_PATH, force=force)
+    if force:
+        unreal.log("Force rebuild requested, ignoring build manifest")
+
     # Validate folder structure and collect skin files
-    simple_exts, adv_bases, adv_exts = validate_structure()
-
-    # 1. Process simple skin extensions (p0001-p0006)
-    unreal.log("\n--- Processing Simple Extensions ---")
-    for base_name, png_list in simple_exts.items():
-        dest = f"/Game/_Zenith/Characters/{base_name}/Textures/"
-        folder_path = os.path.join(EXTEND_SKINS_ROOT, base_name)
-        for png in png_list:
-            import_texture(os.path.join(folder_path, png), dest, png.replace(".png", ""))
-
-    # 2. Process advanced skin bases (p0007+)
-    unreal.log("\n--- Processing Advanced Bases ---")
-    for sid, info in adv_bases.items():
-        base_name = info['name']
-        dest_root = f"/Game/_Zenith/Characters/{base_name}/"
-        dest_tex = dest_root + "Textures/"
-        
-        # Import texture
-        import_texture(info['png'], dest_tex, base_name)
-        # Import Spine (will call modified C++ Factory to merge into dest_root/base_name.uasset)
-        import_spine_assets(info['skel'], info['atlas'], dest_root, base_name)
-        
-        # Apply custom skin layers from JSON if available
-        json_path = os.path.join(EXTEND_SKINS_ROOT, base_name, "DefaultSkins.json")
-        if os.path.exists(json_path):
-            # Build asset path (internal name is pXXXX_Lily-data)
-            data_asset_path = f"{dest_root}{base_name}.{base_name}-data"
-            apply_custom_skin_layers(data_asset_path, json_path)
-
-    # 3. Process advanced skin extension textures
-    unreal.log("\n--- Processing Advanced Extensions ---")
-    for base_name, png_list in adv_exts.items():
-        dest = f"/Game/_Zenith/Characters/{base_name}/Textures/"
-        folder_path = os.path.join(EXTEND_SKINS_ROOT, base_name)
-        for png in png_list:
-            import_texture(os.path.join(folder_path, png), dest, png.replace(".png", ""))
-
-    # 4. Update DataTable (only for advanced base skins)
-    update_data_table(adv_bases.keys())
-
-    # 5. Refresh assets and update DataAsset and Labels
-    unreal.log("Refreshing asset registry...")
-    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
-    asset_registry.scan_paths_synchronous(["/Game/_Zenith/Characters/"], True)
-    
-    # Small delay to ensure asset indexing is complete
-    import time
-    time.sleep(0.5)
-    
-    # Need to convert to suitable format for subsequent functions
-    simple_skins = []
-    for base_name, png_list in simple_exts.items():
-        simple_skins.extend(png_list)
-    
-    advanced_base_skins = []
-    for info in adv_bases.values():
-        advanced_base_skins.append(info['name'] + ".png")
-    
-    advanced_extend_skins = []
-    for base_name, png_list in adv_exts.items():
-        advanced_extend_skins.extend(png_list)
-    
-    # Update ExtendSkinAssets DataAsset
-    unreal.log("Updating ExtendSkinAssets Data Asset...")
-    update_extend_skin_data_asset(simple_skins, advanced_base_skins, advanced_extend_skins)
-    
-    setup_chunk2_label(simple_skins, advanced_base_skins, advanced_extend_skins)
-    setup_chunk3_label()
+    with TRACER.span("validate_structure"):
+        skins = validate_structure()
+    hash_index = TextureHashIndex(TEXTURE_HASH_INDEX_PATH) if DEDUPE_TEXTURES else None
+
+    if PIPELINE_MODE:
+        # Prepare skin folders on worker threads while the editor imports the ones already prepared
+        units = split_units(skins, PIPELINE_SIMPLE_CHUNK)
+        unreal.log(f"Pipelined build: {len(units)} skin units, {PIPELINE_WORKERS} preparation workers")
+        pipeline = UnitPipeline(units, manifest, DEEP_VALIDATE_PNG, PIPELINE_WORKERS, PIPELINE_QUEUE_SIZE, TRACER,
+                                hash_index, DEDUPE_TOLERANCE, REPACK_ATLASES, TEXTURE_TIER)
+        plan = BuildPlan()
+        try:
+            succeeded = run_transaction(run_pipelined_stages, pipeline, plan, manifest)
+        finally:
+            pipeline.close()
+        skins = merge_units(pipeline.prepared)
+    else:
+        if DEEP_VALIDATE_PNG:
+            unreal.log("Deep-validating PNG files...")
+            with TRACER.span("deep_validate_png"):
+                rejected = reject_corrupt_pngs(skins)
+            unreal.log(f"Deep validation finished, {rejected} corrupt PNG(s) rejected")
+
+        aliases = None
+        if hash_index is not None:
+            with TRACER.span("dedupe_textures"):
+                aliases = find_duplicate_textures(skins, hash_index)
+
+        if REPACK_ATLASES:
+            with TRACER.span("repack_atlases"):
+                repack_atlases(skins)
+
+        if TEXTURE_TIER > 1:
+            with TRACER.span("texture_tiers"):
+                prepare_texture_tier(skins)
+
+        # Decide everything up front, then apply only what is out of date
+        with TRACER.span("build_plan"):
+            plan = build_plan(skins, manifest, SOFT_REFERENCE_LAYOUT, aliases)
+        unreal.log("\n--- Build Plan ---")
+        for line in plan.summary_lines(verbose=VERBOSE_LOG):
+            unreal.log(line)
+        succeeded = plan.is_empty() or execute_plan(plan, manifest)
+
+    # Skin id -> chunk map, once the chunk labels match it (or were already up to date)
+    if plan.chunk_manifest and (succeeded or not plan.chunks):
+        if save_chunk_manifest(plan.chunk_manifest):
+            unreal.log(f"Updated chunk manifest: {CHUNK_MANIFEST_PATH}")
+        for line in chunk_summary_lines(plan.chunk_manifest):
+            log_verbose(line)
+
+    # Precomputed skin table for SwitchSkinMod (levels follow the DataTable row allocation, chunks the
+    # chunk manifest); a pipelined run that stopped before every unit was prepared leaves the previous one in place
+    simple_skins, advanced_base_skins, advanced_extend_skins = plan.skin_lists
+    if plan.skin_index is not None:
+        with TRACER.span("write_skin_index"):
+            skin_index = build_skin_index(plan.catalog, load_row_allocation(), load_chunk_allocation(), plan.aliases)
+            if write_skin_index_lua(skin_index, SKIN_INDEX_LUA_PATH):
+                unreal.log(f"Updated skin index: {SKIN_INDEX_LUA_PATH}")
+
+    with TRACER.span("manifest_save"):
+        manifest.save()
+        if hash_index is not None:
+            hash_index.save()
     
-    unreal.log("=== SDK Process Finished Successfully ===")
+    if succeeded:
+        unreal.log("=== SDK Process Finished Successfully ===")
+    else:
+        unreal.log_error("=== SDK Process Stopped, see the errors above ===")
     unreal.log(f"Processed {len(simple_skins)} simple skins")
     unreal.log(f"Processed {len(advanced_base_skins)} advanced base skins")
-    unreal.log(f"Processed {len(advanced_extend_skins)} advanced extend skins")
\ No newline at end of file
+    unreal.log(f"Processed {len(advanced_extend_skins)} advanced extend skins")
+    hard_bytes, lazy_bytes = estimate_resident_memory(skins)
+    unreal.log(f"ExtendSkinAssets resident memory estimate: hard references {hard_bytes / 1048576:.1f} MB, "
+               f"soft references {lazy_bytes / 1048576:.1f} MB (one skin loaded)"
+               f"{' [active]' if SOFT_REFERENCE_LAYOUT else ''}")
+    unreal.log(f"Skipped {len(manifest.skipped)} unchanged assets (use --force to rebuild everything)")
+    for asset_path in manifest.skipped:
+        log_verbose(f"- Unchanged: {asset_path}")
+    for line in MEMORY.summary_lines():
+        unreal.log(line)
+    return succeeded
+
+def watch_extend_skins():
+    """
+    Rebuild whenever ExtendSkins changes, until Ctrl+C (--watch)
+    The editor stays loaded between rebuilds and the manifest limits each one to what the change
+    touched: a new extension PNG is one texture import plus ExtendSkinAssets, a changed .skel one
+    spine reimport with its DefaultSkins, an edited DefaultSkins.json only the layers.
+    """
+    watcher = make_watcher(EXTEND_SKINS_ROOT, poll_interval=WATCH_POLL_INTERVAL)
+    unreal.log(f"\n--- Watching {EXTEND_SKINS_ROOT} ({type(watcher).__name__}), press Ctrl+C to stop ---")
+    try:
+        while True:
+            changed = wait_for_changes(watcher, WATCH_DEBOUNCE)
+            unreal.log(f"\n--- {len(changed)} change(s) detected ---")
+            for line in describe_changes(EXTEND_SKINS_ROOT, changed):
+                unreal.log(line)
+            start = time.perf_counter()
+            with TRACER.span("watch_rebuild", changes=len(changed)):
+                succeeded = run_build()
+            unreal.log(f"Rebuild {'finished' if succeeded else 'failed'} in {time.perf_counter() - start:.2f}s, watching for changes...")
+            TRACER.write_chrome_trace(TRACE_PATH)
+    except KeyboardInterrupt:
+        unreal.log("Watch mode stopped")
+    finally:
+        watcher.close()
+
+def run_shard(shard_path):
+    """
+    Worker mode (--shard, started by build_scheduler.py)
+    Imports the operations of one shard and saves their packages; the DataTable, data asset and
+    labels are left to the final pass. The imported assets are recorded in a build manifest next
+    to the shard (see build_scheduler.shard_result_path) that the scheduler merges.
+    """
+    with open(shard_path, 'r', encoding='utf-8') as f:
+        shard = json.load(f)
+    plan = BuildPlan()
+    plan.texture_imports = shard["texture_imports"]
+    plan.spine_imports = shard["spine_imports"]
+    unreal.log(f"--- Worker {os.path.basename(shard_path)}: {len(plan.texture_imports)} textures, "
+               f"{len(plan.spine_imports)} spine assets ---")
+    results = BuildManifest(shard_result_path(shard_path))
+    succeeded = execute_plan(plan, results)
+    results.save()
+    for line in MEMORY.summary_lines():
+        unreal.log(line)
+    if succeeded:
+        unreal.log("=== Worker Finished Successfully ===")
+    else:
+        unreal.log_error("=== Worker Stopped, see the errors above ===")
+    return succeeded
+
+
+# --- Main execution flow ---
+if __name__ == "__main__":
+    if SHARD_PATH:
+        run_shard(SHARD_PATH)
+        trace_path = os.path.splitext(SHARD_PATH)[0] + ".trace.json"
+    else:
+        run_build(FORCE_REBUILD)
+        if WATCH_MODE:
+            watch_extend_skins()
+        trace_path = TRACE_PATH
+
+    # Timing summary and trace (open trace.json in chrome://tracing or ui.perfetto.dev)
+    unreal.log("\n--- Timing ---")
+    for line in TRACER.summary_lines():
+        unreal.log(line)
+    TRACER.write_chrome_trace(trace_path)
+    unreal.log(f"Trace written to {trace_path}")
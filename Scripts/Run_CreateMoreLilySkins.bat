@@ -14,6 +14,20 @@ set "UPROJECT=%~dp0..\EnderLilies.uproject"
 set "PYTHON_SCRIPT=%~dp0CreateMoreLilySkins.py"
 set "UE4_CMD=%UE4PATH%\Engine\Binaries\Win64\UE4Editor-Cmd.exe"
 
+rem --- Plan the build without the editor (needs a Python 3 on PATH, skipped otherwise) ---
+rem Watch mode keeps the editor running even when nothing is out of date yet
+echo %* | find /I "--watch" >NUL
+if not errorlevel 1 goto check_editor
+where python >NUL 2>NUL
+if errorlevel 1 goto check_editor
+python "%~dp0skin_plan.py" --check %*
+if errorlevel 1 goto check_editor
+echo.
+echo [INFO] All mod assets are up to date, the Editor is not needed.
+echo Pass --force to rebuild everything anyway.
+pause
+exit /b 0
+
 :check_editor
 rem --- Check if Unreal Editor is running ---
 tasklist /FI "IMAGENAME eq UE4Editor.exe" 2>NUL | find /I /N "UE4Editor.exe">NUL
@@ -55,10 +69,17 @@ if not exist "%UE4_CMD%" (
     exit /b 1
 )
 
-rem 3. Execute Python script
+rem 3. Execute Python script (--workers N: imports split over N headless editors, see build_scheduler.py)
+echo %* | find /I "--workers" >NUL
+if not errorlevel 1 (
+    echo [INFO] Running sharded build via build_scheduler.py...
+    python "%~dp0build_scheduler.py" --editor "%UE4_CMD%" --project "%UPROJECT%" %*
+    goto report
+)
 echo [INFO] Running Python script via UE4Editor-Cmd...
-"%UE4_CMD%" "%UPROJECT%" -run=pythonscript -script="%PYTHON_SCRIPT%" -unattended -nopause -nosplash -stdout -UTF8Output
+"%UE4_CMD%" "%UPROJECT%" -run=pythonscript -script="%PYTHON_SCRIPT% %*" -unattended -nopause -nosplash -stdout -UTF8Output
 
+:report
 if %ERRORLEVEL% EQU 0 (
     echo.
     echo ============================================================
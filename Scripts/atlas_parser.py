@@ -0,0 +1,225 @@
+import os
+import json
+from array import array
+
+from build_manifest import hash_file
+
+"""
+Spine .atlas parser
+
+Streams a libgdx/Spine 3.8 text atlas (page header followed by indented region
+records: rotate/xy/size/orig/offset/index) into a compact, array-backed region
+table with a name -> region index. Results are cached by file content hash, in
+memory and optionally on disk, so an unchanged atlas is parsed only once.
+
+validate_atlas checks the page header against the PNG (get_png_info) and that
+every region lies inside the texture, which catches atlas/texture mismatches
+before the spine import.
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+CACHE_VERSION = 1
+
+# Integer columns of the region table, in storage order
+REGION_COLUMNS = ("page", "x", "y", "w", "h", "orig_w", "orig_h", "off_x", "off_y", "rotate", "index")
+
+_memory_cache = {}
+
+
+class Atlas:
+    """
+    Parsed atlas
+    - pages: [{"name": "p0007_Lily.png", "w": 1777, "h": 523, "format": "RGBA8888"}, ...]
+    - names: region names in file order
+    - columns: { column_name: array('i') } for REGION_COLUMNS, one entry per region
+    - region_index: { region_name: row }
+    `w`/`h` are the unrotated region size; `rotate` is the rotation in degrees (0/90/180/270).
+    """
+    __slots__ = ("pages", "names", "columns", "region_index")
+
+    def __init__(self):
+        self.pages = []
+        self.names = []
+        self.columns = {column: array('i') for column in REGION_COLUMNS}
+        self.region_index = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.region_index
+
+    def region(self, name_or_row):
+        """Return one region as a dict (for reporting; hot paths should use the columns)"""
+        row = self.region_index[name_or_row] if isinstance(name_or_row, str) else name_or_row
+        region = {column: self.columns[column][row] for column in REGION_COLUMNS}
+        region["name"] = self.names[row]
+        return region
+
+    def page_rect(self, row):
+        """Rectangle (x, y, w, h) the region occupies on its page, accounting for rotation"""
+        c = self.columns
+        w, h = c["w"][row], c["h"][row]
+        if c["rotate"][row] in (90, 270):
+            w, h = h, w
+        return c["x"][row], c["y"][row], w, h
+
+    def to_dict(self):
+        return {
+            "pages": self.pages,
+            "names": self.names,
+            "columns": {column: values.tolist() for column, values in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        atlas = cls()
+        atlas.pages = data["pages"]
+        atlas.names = data["names"]
+        for column in REGION_COLUMNS:
+            atlas.columns[column] = array('i', data["columns"][column])
+        atlas.region_index = {name: row for row, name in enumerate(atlas.names)}
+        return atlas
+
+
+def _ints(value):
+    return [int(v) for v in value.split(",")]
+
+
+def _rotation(value):
+    value = value.strip().lower()
+    if value == "true":
+        return 90
+    if value == "false":
+        return 0
+    return int(value) % 360
+
+
+def parse_atlas(lines):
+    """Parse an iterable of atlas text lines into an Atlas"""
+    atlas = Atlas()
+    columns = atlas.columns
+    page = None
+    region = None
+
+    def flush_region():
+        if region is None:
+            return
+        w, h = region.get("size", (0, 0))
+        orig_w, orig_h = region.get("orig", (w, h))
+        off_x, off_y = region.get("offset", (0, 0))
+        x, y = region.get("xy", (0, 0))
+        values = (page, x, y, w, h, orig_w, orig_h, off_x, off_y, region.get("rotate", 0), region.get("index", -1))
+        for column, value in zip(REGION_COLUMNS, values):
+            columns[column].append(value)
+        atlas.region_index[region["name"]] = len(atlas.names)
+        atlas.names.append(region["name"])
+
+    new_page = True
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.strip()
+        if not stripped:
+            flush_region()
+            region = None
+            new_page = True
+            continue
+
+        if ":" not in stripped:
+            flush_region()
+            if new_page:
+                atlas.pages.append({"name": stripped, "w": 0, "h": 0, "format": ""})
+                page = len(atlas.pages) - 1
+                region = None
+                new_page = False
+            else:
+                region = {"name": stripped}
+            continue
+
+        key, value = stripped.split(":", 1)
+        key = key.strip()
+        value = value.strip()
+        if region is None:
+            # Page header fields
+            if page is None:
+                raise ValueError(f"Atlas field '{key}' before any page name")
+            if key == "size":
+                atlas.pages[page]["w"], atlas.pages[page]["h"] = _ints(value)
+            elif key == "format":
+                atlas.pages[page]["format"] = value
+            continue
+
+        if key == "rotate":
+            region["rotate"] = _rotation(value)
+        elif key in ("xy", "size", "orig", "offset"):
+            region[key] = tuple(_ints(value))
+        elif key == "bounds":
+            # Spine 4 layout: bounds: x, y, w, h
+            x, y, w, h = _ints(value)
+            region["xy"], region["size"] = (x, y), (w, h)
+        elif key == "offsets":
+            off_x, off_y, orig_w, orig_h = _ints(value)
+            region["offset"], region["orig"] = (off_x, off_y), (orig_w, orig_h)
+        elif key == "index":
+            region["index"] = int(value)
+
+    flush_region()
+    return atlas
+
+
+def load_atlas(atlas_path, cache_dir=None):
+    """Parse an atlas file, reusing a cached result when the file hash is unchanged"""
+    digest = hash_file(atlas_path)
+    atlas = _memory_cache.get(digest)
+    if atlas is not None:
+        return atlas
+
+    cache_path = os.path.join(cache_dir, digest + ".json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                atlas = Atlas.from_dict(data["atlas"])
+        except (OSError, ValueError, KeyError):
+            atlas = None
+
+    if atlas is None:
+        with open(atlas_path, 'r', encoding='utf-8') as f:
+            atlas = parse_atlas(f)
+        if cache_path:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "atlas": atlas.to_dict()}, f, separators=(",", ":"))
+
+    _memory_cache[digest] = atlas
+    return atlas
+
+
+def validate_atlas(atlas, png_info, png_name=None):
+    """
+    Check an atlas against its page texture
+    - exactly one page (skins use a single texture), named png_name if given
+    - page `size:` equals the PNG resolution from get_png_info
+    - every region lies inside the texture
+    Returns: list of error strings (empty if valid)
+    """
+    errors = []
+    if len(atlas.pages) != 1:
+        errors.append(f"Atlas must have exactly one page, found {len(atlas.pages)}")
+        return errors
+
+    page = atlas.pages[0]
+    if png_name and page["name"] != png_name:
+        errors.append(f"Atlas page '{page['name']}' does not match texture '{png_name}'")
+    if (page["w"], page["h"]) != (png_info["w"], png_info["h"]):
+        errors.append(f"Atlas size {page['w']}x{page['h']} does not match texture {png_info['w']}x{png_info['h']}")
+
+    tex_w, tex_h = png_info["w"], png_info["h"]
+    for row in range(len(atlas)):
+        x, y, w, h = atlas.page_rect(row)
+        if x < 0 or y < 0 or x + w > tex_w or y + h > tex_h:
+            errors.append(f"Region '{atlas.names[row]}' ({x},{y} {w}x{h}) lies outside the {tex_w}x{tex_h} texture")
+    return errors
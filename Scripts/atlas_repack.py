@@ -0,0 +1,353 @@
+import os
+import sys
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from skin_config import (
+    EXTEND_SKINS_ROOT, REPACK_DIR, REPACK_PADDING, REPACK_POWER_OF_TWO, RESIDENT_BYTES_PER_TEXEL,
+)
+from build_manifest import hash_file, hash_value
+from atlas_parser import load_atlas
+from png_codec import read_rgba, write_png
+from png_validator import can_spawn_processes
+
+"""
+Atlas-aware repacking of advanced skin textures (--repack, --repack-pot)
+
+Advanced base textures are imported at the size they were exported with, no
+matter how much of the sheet the .atlas regions cover. This step reads the
+region table, packs the regions into the tightest sheet (bottom-left skyline,
+trying a range of sheet widths; with --repack-pot the sheet is a power of two),
+copies the pixels of the base texture and of every extension with that same
+layout and rewrites the .atlas (page size and region positions only; sizes,
+offsets and rotation are unchanged, so the skeleton needs no change).
+
+The repacked files are written to Saved/CreateMoreLilySkins/repacked/<skin>/ with
+their original names, next to a copy of the .skel (the spine factory loads the
+atlas next to it); ExtendSkins is never modified. A skin is only repacked when it
+gets smaller (or a power of two was asked for), and again only when one of its
+inputs changes.
+
+Usage outside the editor:
+    python atlas_repack.py [--repack-pot]    repack ExtendSkins and print the savings per skin
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+REPACK_VERSION = 1
+REPACK_WORKERS = os.cpu_count() or 4
+REPACK_STATE_FILE = "repack.json"
+# Sheet widths tried per skin (evenly spaced between the widest region and the original width)
+WIDTH_CANDIDATES = 48
+
+
+def _pot(value):
+    return 1 << max(0, (value - 1).bit_length())
+
+
+def cluster_rects(rects):
+    """
+    Group overlapping region rectangles (shared or overlapping sheet areas) so they move together
+    Returns: [(x, y, w, h, [region rows]), ...] bounding boxes of the groups
+    """
+    parent = list(range(len(rects)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (x, y, w, h) in enumerate(rects):
+        for j in range(i + 1, len(rects)):
+            x2, y2, w2, h2 = rects[j]
+            if x < x2 + w2 and x2 < x + w and y < y2 + h2 and y2 < y + h:
+                parent[find(i)] = find(j)
+
+    groups = {}
+    for i in range(len(rects)):
+        groups.setdefault(find(i), []).append(i)
+    clusters = []
+    for rows in groups.values():
+        x0 = min(rects[i][0] for i in rows)
+        y0 = min(rects[i][1] for i in rows)
+        x1 = max(rects[i][0] + rects[i][2] for i in rows)
+        y1 = max(rects[i][1] + rects[i][3] for i in rows)
+        clusters.append((x0, y0, x1 - x0, y1 - y0, rows))
+    return clusters
+
+
+def skyline_pack(sizes, sheet_width):
+    """
+    Place (w, h) boxes in the given order at the lowest, then leftmost, spot of a sheet `sheet_width` wide
+    Returns: ([(x, y), ...], used_width, used_height), or None if a box is wider than the sheet
+    """
+    skyline = [[0, 0, sheet_width]]  # [x, y, w] segments, left to right, covering the whole width
+    positions = []
+    for w, h in sizes:
+        best = None
+        for i, (x, _, _) in enumerate(skyline):
+            if x + w > sheet_width:
+                break
+            y, covered, j = 0, 0, i
+            while covered < w:
+                y = max(y, skyline[j][1])
+                covered += skyline[j][2]
+                j += 1
+            if best is None or (y + h, x) < best[0]:
+                best = ((y + h, x), i, x, y)
+        if best is None:
+            return None
+        _, i, x, y = best
+        positions.append((x, y))
+
+        end = x + w
+        j = i
+        while j < len(skyline) and skyline[j][0] < end:
+            segment_end = skyline[j][0] + skyline[j][2]
+            if segment_end <= end:
+                del skyline[j]
+            else:
+                skyline[j][0], skyline[j][2] = end, segment_end - end
+                break
+        skyline.insert(i, [x, y + h, w])
+        merged = [skyline[0]]
+        for segment in skyline[1:]:
+            if segment[1] == merged[-1][1]:
+                merged[-1][2] += segment[2]
+            else:
+                merged.append(segment)
+        skyline = merged
+
+    used_width = max((x + w for (x, _), (w, _) in zip(positions, sizes)), default=0)
+    used_height = max((y + h for (_, y), (_, h) in zip(positions, sizes)), default=0)
+    return positions, used_width, used_height
+
+
+def plan_layout(rects, page_width, padding=REPACK_PADDING, power_of_two=False):
+    """
+    Tightest sheet for the region rectangles [(x, y, w, h), ...] of one atlas page
+    Returns: {"w": int, "h": int, "moves": [(src_x, src_y, w, h, dst_x, dst_y), ...],
+              "regions": [(dst_x, dst_y), ...] new position of every region}
+    """
+    clusters = cluster_rects(rects)
+    order = sorted(range(len(clusters)), key=lambda c: (-clusters[c][3], -clusters[c][2]))
+    sizes = [(clusters[c][2] + padding, clusters[c][3] + padding) for c in order]
+    widest = max((w for w, _ in sizes), default=1)
+    upper = max(widest, page_width + padding)
+    if power_of_two:
+        candidates = [1 << n for n in range(_pot(widest).bit_length() - 1, _pot(upper).bit_length())]
+    else:
+        step = max(1, (upper - widest) // WIDTH_CANDIDATES)
+        candidates = sorted(set(range(widest, upper + 1, step)) | {upper})
+
+    best = None
+    for sheet_width in candidates:
+        packed = skyline_pack(sizes, sheet_width)
+        if packed is None:
+            continue
+        positions, used_w, used_h = packed
+        # The trailing padding of the right/bottom boxes is not part of the sheet
+        w, h = max(1, used_w - padding), max(1, used_h - padding)
+        if power_of_two:
+            w, h = _pot(w), _pot(h)
+        key = (w * h, max(w, h))
+        if best is None or key < best[0]:
+            best = (key, w, h, positions)
+
+    _, sheet_w, sheet_h, positions = best
+    moves = []
+    regions = [None] * len(rects)
+    for (dst_x, dst_y), c in zip(positions, order):
+        x, y, w, h, rows = clusters[c]
+        moves.append((x, y, w, h, dst_x, dst_y))
+        for row in rows:
+            regions[row] = (dst_x + rects[row][0] - x, dst_y + rects[row][1] - y)
+    return {"w": sheet_w, "h": sheet_h, "moves": moves, "regions": regions}
+
+
+def repack_rows(src_rows, layout):
+    """RGBA8 rows of the source texture -> rows of the repacked sheet (unused texels transparent)"""
+    dst_rows = [bytearray(layout["w"] * 4) for _ in range(layout["h"])]
+    for src_x, src_y, w, h, dst_x, dst_y in layout["moves"]:
+        for row in range(h):
+            dst_rows[dst_y + row][dst_x * 4:(dst_x + w) * 4] = src_rows[src_y + row][src_x * 4:(src_x + w) * 4]
+    return dst_rows
+
+
+def rewrite_atlas(lines, sheet_size, region_positions):
+    """
+    Atlas text with the page size and the region positions (in file order) replaced
+    Everything else, including indentation and separators, is kept as it was.
+    """
+    out = []
+    new_page = True
+    in_region = False
+    region = -1
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.strip()
+        indent = line[:len(line) - len(line.lstrip())]
+        if not stripped:
+            new_page, in_region = True, False
+        elif ":" not in stripped:
+            if new_page:
+                new_page, in_region = False, False
+            else:
+                in_region = True
+                region += 1
+        else:
+            key, value = stripped.split(":", 1)
+            key, value = key.strip(), value.strip()
+            sep = ", " if ", " in value else ","
+            if not in_region and key == "size":
+                line = f"{indent}size: {sheet_size[0]}{sep}{sheet_size[1]}"
+            elif in_region and key == "xy":
+                x, y = region_positions[region]
+                line = f"{indent}xy: {x}{sep}{y}"
+            elif in_region and key == "bounds":
+                _, _, w, h = value.split(",")
+                x, y = region_positions[region]
+                line = f"{indent}bounds: {x}{sep}{y}{sep}{w.strip()}{sep}{h.strip()}"
+        out.append(line + "\n")
+    return out
+
+
+def repack_skin(job):
+    """
+    Repack one advanced skin (runs in a worker process)
+    job: {"name", "png", "atlas", "skel", "json", "extensions": [png paths], "out_dir", "padding", "power_of_two"}
+    Returns the report: {"name", "from": [w, h], "to": [w, h], "textures", "repacked", "error"}
+    """
+    report = {"name": job["name"], "from": None, "to": None, "textures": 1 + len(job["extensions"]),
+              "repacked": False, "error": ""}
+    try:
+        atlas = load_atlas(job["atlas"])
+        if len(atlas.pages) != 1:
+            raise ValueError(f"{os.path.basename(job['atlas'])} has {len(atlas.pages)} pages, only single page atlases are repacked")
+        page = atlas.pages[0]
+        report["from"] = [page["w"], page["h"]]
+        rects = [atlas.page_rect(row) for row in range(len(atlas))]
+        layout = plan_layout(rects, page["w"], job["padding"], job["power_of_two"])
+        report["to"] = [layout["w"], layout["h"]]
+        if layout["w"] * layout["h"] >= page["w"] * page["h"] and not job["power_of_two"]:
+            return report
+
+        out_dir = job["out_dir"]
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        os.makedirs(out_dir)
+        for png_path in [job["png"]] + job["extensions"]:
+            width, height, rows = read_rgba(png_path)
+            if (width, height) != (page["w"], page["h"]):
+                raise ValueError(f"{os.path.basename(png_path)} is {width}x{height}, the atlas page {page['w']}x{page['h']}")
+            write_png(os.path.join(out_dir, os.path.basename(png_path)), layout["w"], layout["h"], repack_rows(rows, layout))
+            del rows
+        with open(job["atlas"], 'r', encoding='utf-8') as f:
+            atlas_lines = rewrite_atlas(f, (layout["w"], layout["h"]), layout["regions"])
+        with open(os.path.join(out_dir, os.path.basename(job["atlas"])), 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(atlas_lines)
+        for path in (job["skel"], job["json"]):
+            if path and os.path.exists(path):
+                shutil.copyfile(path, os.path.join(out_dir, os.path.basename(path)))
+        report["repacked"] = True
+    except (OSError, ValueError) as e:
+        report["error"] = str(e)
+    return report
+
+
+def _load_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, REPACK_STATE_FILE), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == REPACK_VERSION else None
+
+
+def repack_advanced_skins(catalog, root=EXTEND_SKINS_ROOT, out_root=REPACK_DIR, padding=REPACK_PADDING,
+                          power_of_two=REPACK_POWER_OF_TWO, max_workers=REPACK_WORKERS):
+    """
+    Repack every advanced skin of a skin_catalog.SkinCatalog whose inputs changed, and point its records at the repacked files
+    The base record of a repacked skin gets the png/atlas/skel paths and w/h of the repacked sheet,
+    its extension records the repacked textures next to it.
+    Returns: the report of every skin (see repack_skin), in id order
+    """
+    jobs, reports = [], {}
+    for sid in catalog.advanced_ids():
+        base = catalog.base_record(sid)
+        json_path = os.path.join(root, base.base, "DefaultSkins.json")
+        job = {
+            "name": base.base, "png": base.source, "atlas": base.atlas, "skel": base.skel,
+            "json": json_path if os.path.exists(json_path) else None,
+            "extensions": [record.source for record in catalog.extensions(sid)],
+            "out_dir": os.path.join(out_root, base.base), "padding": padding, "power_of_two": power_of_two,
+        }
+        inputs = [job["png"], job["atlas"], job["skel"]] + job["extensions"] + ([job["json"]] if job["json"] else [])
+        job["fingerprint"] = hash_value({
+            "files": [[os.path.basename(path), hash_file(path)] for path in inputs],
+            "padding": padding, "power_of_two": power_of_two,
+        })
+        state = _load_state(job["out_dir"])
+        if state and state["fingerprint"] == job["fingerprint"]:
+            reports[sid] = state["report"]
+        else:
+            jobs.append((sid, job))
+
+    if jobs:
+        workers = max(1, min(max_workers, len(jobs)))
+        executor_class = ProcessPoolExecutor if can_spawn_processes() and workers > 1 else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as pool:
+            for (sid, job), report in zip(jobs, pool.map(repack_skin, [job for _, job in jobs])):
+                reports[sid] = report
+                if not report["error"]:
+                    if not os.path.isdir(job["out_dir"]):
+                        os.makedirs(job["out_dir"])
+                    with open(os.path.join(job["out_dir"], REPACK_STATE_FILE), 'w', encoding='utf-8') as f:
+                        json.dump({"version": REPACK_VERSION, "fingerprint": job["fingerprint"], "report": report}, f)
+
+    for sid, report in reports.items():
+        if report["repacked"]:
+            out_dir = os.path.join(out_root, report["name"])
+            for record in catalog.by_id[sid]:
+                record.source = os.path.join(out_dir, os.path.basename(record.source))
+                record.w, record.h = report["to"]
+            base = catalog.base_record(sid)
+            base.atlas = os.path.join(out_dir, os.path.basename(base.atlas))
+            base.skel = os.path.join(out_dir, os.path.basename(base.skel))
+    return [reports[sid] for sid in sorted(reports)]
+
+
+def summary_lines(reports):
+    """Savings per skin (resident texture bytes, every texture of the skin) and in total"""
+    lines = []
+    total_before = total_after = 0
+    for report in reports:
+        if report["error"]:
+            lines.append(f"- {report['name']}: not repacked ({report['error']})")
+            continue
+        (from_w, from_h), (to_w, to_h) = report["from"], report["to"]
+        before = from_w * from_h * report["textures"] * RESIDENT_BYTES_PER_TEXEL
+        after = to_w * to_h * report["textures"] * RESIDENT_BYTES_PER_TEXEL if report["repacked"] else before
+        total_before += before
+        total_after += after
+        if report["repacked"]:
+            lines.append(f"- {report['name']}: {from_w}x{from_h} -> {to_w}x{to_h}, {report['textures']} textures, "
+                         f"{(before - after) / 1048576:.2f} MB saved ({(1 - after / before) * 100 if before else 0:.0f}%)")
+        else:
+            lines.append(f"- {report['name']}: {from_w}x{from_h} kept, the tightest sheet is {to_w}x{to_h}")
+    saved = total_before - total_after
+    lines.insert(0, f"Repack: {len([r for r in reports if r['repacked']])}/{len(reports)} advanced skins repacked, "
+                    f"{saved / 1048576:.2f} MB of {total_before / 1048576:.2f} MB texture memory saved")
+    return lines
+
+
+if __name__ == "__main__":
+    from skin_catalog import load_catalog
+
+    def log_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    for line in summary_lines(repack_advanced_skins(load_catalog(log_error=log_error))):
+        print(line)
@@ -0,0 +1,244 @@
+"""
+Scaling benchmark for CreateMoreLilySkins.py
+
+For every size (N simple, M advanced skins) a synthetic ExtendSkins tree is
+generated (synthetic_skins.py) and the build is timed piece by piece:
+    validate_structure     cold (no scan index / atlas cache) and warm
+    get_png_info           over every PNG of the tree
+    data_table_csv         build_data_table_rows + rows_to_csv_string
+    build_plan             import/DataTable/data-asset/label list building, empty manifest
+    texture_dedupe         pixel hashes of every PNG (no hash cache) and the alias search
+    atlas_repack           repack of every advanced skin (no repack cache)
+    texture_tiers          tier 2 of every texture (no tier cache)
+    full_build             the whole script against fake_unreal, from scratch
+    incremental_build      the same again with nothing changed
+    reference_validator    every reference of the built tree resolved against Content/ (no index cache)
+The fake editor counts load_asset/save_asset/import_asset_tasks and the other API
+calls of both builds. Results are written as JSON; pass a previous result with
+--compare to fail on per-skin cost or call count regressions.
+
+Usage outside the editor:
+    python benchmark.py [--sizes 10x2,100x20,1000x100] [--extensions K] [--invalid RATIO] [--repeat R]
+                        [--workdir DIR] [--output FILE] [--compare FILE] [--tolerance 0.25]
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+
+BENCHMARK_VERSION = 1
+DEFAULT_SIZES = "10x2,100x20,1000x100"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(SCRIPTS_DIR, "CreateMoreLilySkins.py")
+
+# Call counts that are compared against a baseline (any increase is a regression)
+TRACKED_CALLS = ("load_asset", "save_asset", "save_loaded_assets", "import_asset_tasks", "import_task",
+                 "find_object", "get_assets", "scan_paths_synchronous", "create_asset")
+
+
+def best_time(func, repeat, setup=None):
+    """Minimum wall time of `repeat` calls; setup() runs untimed before each call. Returns (seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def run_case(workdir, simple_count, advanced_count, extensions, invalid_ratio, repeat):
+    # Build modules read their configuration at import time (see skin_config.set_output_root)
+    import skin_config
+    import atlas_parser
+    import fake_unreal
+    from build_manifest import BuildManifest
+    from skin_scanner import get_png_info, scan_extend_skins
+    from skin_catalog import SkinCatalog
+    from skin_plan import build_plan, build_data_table_rows, rows_to_csv_string, allocate_rows
+    from synthetic_skins import generate_tree
+    from texture_dedupe import TextureHashIndex, find_texture_aliases
+    from atlas_repack import repack_advanced_skins
+    from texture_tiers import generate_tiers
+    from reference_validator import ContentIndex, collect_references, validate_references
+
+    stats = generate_tree(skin_config.EXTEND_SKINS_ROOT, simple_count, advanced_count, extensions, invalid_ratio)
+    for path in (skin_config.CONTENT_DIR, os.path.dirname(skin_config.BUILD_CACHE_DIR), skin_config.SKIN_INDEX_LUA_PATH):
+        _remove(path)
+
+    errors = []
+    def scan():
+        del errors[:]
+        return scan_extend_skins(skin_config.EXTEND_SKINS_ROOT, skin_config.SCAN_INDEX_PATH,
+                                 log_error=errors.append, atlas_cache_dir=skin_config.ATLAS_CACHE_DIR)
+
+    def cold_scan_setup():
+        _remove(skin_config.SCAN_INDEX_PATH)
+        _remove(skin_config.ATLAS_CACHE_DIR)
+        atlas_parser._memory_cache.clear()
+
+    timings = {}
+    timings["validate_structure_cold"], _ = best_time(scan, repeat, cold_scan_setup)
+    timings["validate_structure_warm"], scan_result = best_time(scan, repeat)
+
+    def catalog():
+        # Repacking and tiers repoint the records at their own files: every stage gets a fresh catalog
+        return SkinCatalog.from_scan(*scan_result, root=skin_config.EXTEND_SKINS_ROOT)
+    skins = catalog()
+
+    png_paths = []
+    for dir_path, dir_names, file_names in os.walk(skin_config.EXTEND_SKINS_ROOT):
+        png_paths.extend(os.path.join(dir_path, name) for name in file_names if name.endswith(".png"))
+    timings["get_png_info"], _ = best_time(lambda: [get_png_info(p) for p in png_paths], repeat)
+
+    advanced_ids = skins.advanced_ids()
+    timings["data_table_csv"], _ = best_time(
+        lambda: rows_to_csv_string(build_data_table_rows(advanced_ids, allocate_rows(advanced_ids, {}))), repeat)
+
+    def plan():
+        # Fresh manifest without file hash cache: every input is hashed, every step planned
+        return build_plan(skins, BuildManifest(os.path.join(skin_config.BUILD_CACHE_DIR, "none.json")))
+    timings["build_plan"], planned = best_time(plan, repeat)
+    timings["texture_dedupe"], _ = best_time(
+        lambda: find_texture_aliases(skins, TextureHashIndex(None), 0,
+                                     atlas_cache_dir=skin_config.ATLAS_CACHE_DIR), repeat)
+    timings["atlas_repack"], _ = best_time(
+        lambda: repack_advanced_skins(catalog(), root=skin_config.EXTEND_SKINS_ROOT, out_root=skin_config.REPACK_DIR),
+        repeat, lambda: _remove(skin_config.REPACK_DIR))
+    timings["texture_tiers"], _ = best_time(
+        lambda: generate_tiers(catalog(), [2], out_root=skin_config.TIERS_DIR),
+        repeat, lambda: _remove(skin_config.TIERS_DIR))
+
+    # Whole script against the fake editor: from scratch, then a no-op rebuild
+    argv = sys.argv
+    try:
+        def clean_build_setup():
+            for path in (skin_config.CONTENT_DIR, skin_config.MANIFEST_PATH, skin_config.ROW_ALLOCATION_PATH):
+                _remove(path)
+        timings["full_build"], _ = best_time(
+            lambda: fake_unreal.run_script(MAIN_SCRIPT, [], os.path.abspath(workdir), quiet_log=True),
+            repeat, clean_build_setup)
+        full_calls = dict(fake_unreal.calls)
+        timings["incremental_build"], _ = best_time(
+            lambda: fake_unreal.run_script(MAIN_SCRIPT, [], os.path.abspath(workdir), quiet_log=True), repeat)
+        incremental_calls = dict(fake_unreal.calls)
+    finally:
+        sys.argv = argv
+
+    def check_references():
+        references, game_references, generated = collect_references(skins)
+        return validate_references(references, ContentIndex([skin_config.CONTENT_DIR]), game_references, generated)
+    timings["reference_validator"], _ = best_time(check_references, repeat)
+
+    skin_count = max(1, simple_count + advanced_count)
+    return {
+        "simple": simple_count,
+        "advanced": advanced_count,
+        "extensions": extensions,
+        "invalid_ratio": invalid_ratio,
+        "tree": stats,
+        "scan_errors": len(errors),
+        "planned": {
+            "texture_imports": len(planned.texture_imports),
+            "spine_imports": len(planned.spine_imports),
+            "data_table_rows": len(planned.data_table["rows"]) if planned.data_table else 0,
+            "data_asset_textures": len(planned.data_asset["textures"]) if planned.data_asset else 0,
+        },
+        "seconds": {name: round(value, 6) for name, value in timings.items()},
+        "per_skin_us": {name: round(value / skin_count * 1e6, 3) for name, value in timings.items()},
+        "calls": {"full_build": full_calls, "incremental_build": incremental_calls},
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return regression messages of results against a baseline result file"""
+    messages = []
+    baseline_cases = {(c["simple"], c["advanced"], c["extensions"], c["invalid_ratio"]): c for c in baseline.get("cases", [])}
+    for case in results["cases"]:
+        key = (case["simple"], case["advanced"], case["extensions"], case["invalid_ratio"])
+        old = baseline_cases.get(key)
+        if not old:
+            continue
+        label = f"{case['simple']}x{case['advanced']}"
+        for name, value in case["per_skin_us"].items():
+            old_value = old["per_skin_us"].get(name)
+            if old_value and value > old_value * (1 + tolerance):
+                messages.append(f"{label} {name}: {old_value:.1f} -> {value:.1f} us/skin (+{(value / old_value - 1) * 100:.0f}%)")
+        for build in ("full_build", "incremental_build"):
+            for name in TRACKED_CALLS:
+                new_count = case["calls"][build].get(name, 0)
+                old_count = old["calls"].get(build, {}).get(name, 0)
+                if new_count > old_count:
+                    messages.append(f"{label} {build} {name}: {old_count} -> {new_count} calls")
+    return messages
+
+
+def parse_sizes(value):
+    return [tuple(int(n) for n in size.lower().split("x")) for size in value.split(",") if size]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--sizes": DEFAULT_SIZES, "--extensions": "2", "--invalid": "0.1", "--repeat": "3",
+               "--workdir": os.path.join(SCRIPTS_DIR, "..", "Saved", "Benchmark"), "--output": None,
+               "--compare": None, "--tolerance": "0.25"}
+    while args:
+        flag = args.pop(0)
+        if flag not in options or not args:
+            print(__doc__)
+            sys.exit(2)
+        options[flag] = args.pop(0)
+
+    workdir = os.path.abspath(options["--workdir"])
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    # No build flags for the benchmarked script
+    sys.argv = [MAIN_SCRIPT]
+    import skin_config
+    skin_config.set_output_root(workdir, os.path.join(workdir, "ExtendSkins"))
+
+    results = {
+        "benchmark_version": BENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": int(options["--repeat"]),
+        "cases": [],
+    }
+    for simple_count, advanced_count in parse_sizes(options["--sizes"]):
+        case = run_case(workdir, simple_count, advanced_count, int(options["--extensions"]),
+                        float(options["--invalid"]), int(options["--repeat"]))
+        results["cases"].append(case)
+        print(f"{simple_count:>6} simple {advanced_count:>5} advanced | " +
+              " ".join(f"{name}={value * 1000:.1f}ms" for name, value in case["seconds"].items()), file=sys.stderr)
+        full = case["calls"]["full_build"]
+        print(f"{'':>26} | full build: load_asset={full.get('load_asset', 0)} save_asset={full.get('save_asset', 0)} "
+              f"import_asset_tasks={full.get('import_asset_tasks', 0)}", file=sys.stderr)
+
+    output = json.dumps(results, indent=1, sort_keys=True)
+    if options["--output"]:
+        with open(options["--output"], 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if options["--compare"]:
+        with open(options["--compare"], 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), float(options["--tolerance"]))
+        for message in regressions:
+            print(f"[REGRESSION] {message}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,142 @@
+import os
+import json
+import hashlib
+
+"""
+Persistent build manifest for CreateMoreLilySkins.py
+
+The manifest remembers, for every generated asset, the content hashes of the
+source files it was built from (.png, .atlas, .skel, DefaultSkins.json) plus the
+import settings used. A later run compares against it and only re-imports
+inputs that actually changed. Pipeline stages (DataTable, data asset, chunk
+labels) store a fingerprint of their inputs the same way.
+
+File hashes are cached by (size, mtime) so an unchanged tree is not re-read.
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+MANIFEST_VERSION = 1
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path):
+    """Return the blake2b hex digest of a file, read in fixed-size blocks"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def hash_value(value):
+    """Return a stable digest of any JSON-serializable value"""
+    data = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class BuildManifest:
+    """
+    Manifest layout on disk (JSON):
+    {
+        "version": 1,
+        "files":  { abs_path: {"size": int, "mtime": int, "hash": str} },
+        "assets": { asset_path: fingerprint },
+        "stages": { stage_name: fingerprint }
+    }
+    """
+
+    def __init__(self, manifest_path, force=False):
+        self.path = manifest_path
+        self.force = force
+        self.files = {}
+        self.assets = {}
+        self.stages = {}
+        self.skipped = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            return
+        self.files = data.get("files", {})
+        self.assets = data.get("assets", {})
+        self.stages = data.get("stages", {})
+
+    def save(self):
+        manifest_dir = os.path.dirname(self.path)
+        if manifest_dir and not os.path.exists(manifest_dir):
+            os.makedirs(manifest_dir)
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": self.files,
+            "assets": self.assets,
+            "stages": self.stages,
+        }
+        # Write to a temporary file first so an interrupted run never corrupts the manifest
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def file_hash(self, file_path):
+        """Content hash of a file, reusing the cached value when size and mtime are unchanged.
+        Missing files hash to None so optional inputs (DefaultSkins.json) can be fingerprinted too."""
+        if not file_path:
+            return None
+        file_path = os.path.abspath(file_path)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.files.pop(file_path, None)
+            return None
+        cached = self.files.get(file_path)
+        if cached and cached["size"] == st.st_size and cached["mtime"] == st.st_mtime_ns:
+            return cached["hash"]
+        digest = hash_file(file_path)
+        self.files[file_path] = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": digest}
+        return digest
+
+    def fingerprint(self, input_paths, settings=None):
+        """Combine the hashes of all input files and the settings into one fingerprint"""
+        return hash_value({
+            "inputs": [[os.path.basename(p) if p else None, self.file_hash(p)] for p in input_paths],
+            "settings": settings,
+        })
+
+    # --- Imported assets ---
+
+    def is_asset_dirty(self, asset_path, fingerprint, output_file=None):
+        """An asset is dirty if forced, never built, built from other inputs, or its .uasset is gone"""
+        if self.force:
+            return True
+        if self.assets.get(asset_path) != fingerprint:
+            return True
+        if output_file and not os.path.exists(output_file):
+            return True
+        return False
+
+    def mark_asset(self, asset_path, fingerprint):
+        self.assets[asset_path] = fingerprint
+
+    def skip_asset(self, asset_path):
+        self.skipped.append(asset_path)
+
+    # --- Pipeline stages ---
+
+    def is_stage_dirty(self, stage_name, fingerprint, output_file=None):
+        if self.force:
+            return True
+        if self.stages.get(stage_name) != fingerprint:
+            return True
+        if output_file and not os.path.exists(output_file):
+            return True
+        return False
+
+    def mark_stage(self, stage_name, fingerprint):
+        self.stages[stage_name] = fingerprint
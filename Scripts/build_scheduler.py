@@ -0,0 +1,269 @@
+"""
+Sharded build scheduler for CreateMoreLilySkins.py
+
+Imports are CPU-bound inside the editor (texture compression, spine import) and one
+editor process keeps one core busy. The scheduler plans the build without the editor
+(skin_plan.build_plan), splits the imports into shards balanced by source bytes and
+runs one headless editor worker per shard (CreateMoreLilySkins.py --shard). Every
+worker imports and saves its own package set: a spine asset and its page texture are
+always in the same shard, every other texture can go anywhere.
+
+Workers record what they imported in result manifests, which are merged into the
+build manifest. A final, ordinary run of the script then finds those imports up to
+date and only updates the DataTable, ExtendSkinAssets and the chunk labels
+(the commandlet's startup scan puts the worker packages in its asset registry).
+Imports a worker failed are not marked, so the final pass retries them.
+
+Launchers are pluggable: EditorLauncher starts UE4Editor-Cmd, FakeEditorLauncher runs
+the script against fake_unreal in plain Python processes, so the scheduler can be run
+without the engine.
+
+Usage outside the editor:
+    python build_scheduler.py [--workers N] (--editor UE4Editor-Cmd.exe --project EnderLilies.uproject | --fake)
+                              [--output DIR] [--skins DIR] [script flags: --force --soft-refs --deep-validate --dedupe --repack --texture-tier N --verbose]
+    --output / --skins   redirect the build output / read another ExtendSkins folder (see skin_config.set_output_root);
+                         --skins needs --output, the skins are only redirected together with the build output
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import shlex
+import shutil
+import subprocess
+
+import skin_config
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_SCRIPT = os.path.join(SCRIPTS_DIR, "CreateMoreLilySkins.py")
+FAKE_UNREAL = os.path.join(SCRIPTS_DIR, "fake_unreal.py")
+
+# Script flags the workers also get (the others only matter for planning and the final pass)
+WORKER_FLAGS = ("--verbose",)
+
+
+def shard_result_path(shard_path):
+    """Build manifest a worker writes its imported assets to"""
+    return os.path.splitext(shard_path)[0] + ".result.json"
+
+def shard_log_path(shard_path):
+    return os.path.splitext(shard_path)[0] + ".log"
+
+
+# --- Partitioning ---
+
+def import_cost(op):
+    """Source bytes an import reads (PNG, or skel + atlas)"""
+    paths = [op["source"]] + ([op["atlas"]] if op.get("atlas") else [])
+    return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+def group_imports(plan):
+    """
+    Imports that have to run in the same worker
+    A spine import resolves its page texture (pXXXX_Lily/Textures/pXXXX_Lily) while importing, so the
+    two share a group; every other texture is a group of its own.
+    Returns: [[op, ...], ...] in plan order
+    """
+    groups = {}
+    prefix = skin_config.CHARACTERS_PATH + "/"
+    for op in plan.texture_imports + plan.spine_imports:
+        folder = op["asset_path"][len(prefix):].split("/")[0]
+        key = folder if op["name"] == folder else op["asset_path"]
+        groups.setdefault(key, []).append(op)
+    return list(groups.values())
+
+def partition_imports(plan, shard_count):
+    """
+    Split the imports of a plan into at most shard_count shards of about equal source bytes
+    Largest group first, always onto the lightest shard (LPT scheduling).
+    Returns: [{"texture_imports": [...], "spine_imports": [...], "bytes": int}, ...] without empty shards
+    """
+    weighted = sorted(((sum(import_cost(op) for op in group), group) for group in group_imports(plan)),
+                      key=lambda item: -item[0])
+    shards = [{"texture_imports": [], "spine_imports": [], "bytes": 0} for _ in range(max(1, shard_count))]
+    lightest = [(0, index) for index in range(len(shards))]
+    for cost, group in weighted:
+        load, index = heapq.heappop(lightest)
+        for op in group:
+            shards[index]["spine_imports" if "atlas" in op else "texture_imports"].append(op)
+        shards[index]["bytes"] += cost
+        heapq.heappush(lightest, (load + cost, index))
+    return [shard for shard in shards if shard["texture_imports"] or shard["spine_imports"]]
+
+
+# --- Worker launchers ---
+
+class EditorLauncher:
+    """Runs CreateMoreLilySkins.py in a headless UE4Editor-Cmd (pythonscript commandlet)"""
+
+    def __init__(self, editor_cmd, uproject):
+        self.editor_cmd = editor_cmd
+        self.uproject = uproject
+
+    def command(self, script_args):
+        # Same command line as Run_CreateMoreLilySkins.bat: the script and its arguments are one -script= value
+        script = " ".join([MAIN_SCRIPT] + list(script_args))
+        return (f'"{self.editor_cmd}" "{self.uproject}" -run=pythonscript -script="{script}" '
+                f'-unattended -nopause -nosplash -stdout -UTF8Output')
+
+    def launch(self, script_args, stdout=None):
+        """Start one worker; output goes to `stdout` (a file) or the console"""
+        command = self.command(script_args)
+        if os.name != "nt":
+            command = shlex.split(command)
+        return subprocess.Popen(command, stdout=stdout, stderr=subprocess.STDOUT if stdout else None)
+
+
+class FakeEditorLauncher(EditorLauncher):
+    """Stand-in worker: the script against fake_unreal in a plain Python process"""
+
+    def __init__(self, output_root=None, extend_skins_root=None):
+        self.output_root = output_root
+        self.extend_skins_root = extend_skins_root
+
+    def command(self, script_args):
+        command = [sys.executable, FAKE_UNREAL]
+        if self.output_root:
+            command += ["--output", self.output_root]
+        if self.extend_skins_root:
+            command += ["--skins", self.extend_skins_root]
+        return command + list(script_args)
+
+    def launch(self, script_args, stdout=None):
+        return subprocess.Popen(self.command(script_args), stdout=stdout, stderr=subprocess.STDOUT if stdout else None)
+
+
+# --- Scheduler ---
+
+def run_sharded_build(launcher, workers, script_flags=(), log=print):
+    """
+    Plan, import the shards in parallel workers, merge their results and run the final pass
+    script_flags are the CreateMoreLilySkins.py flags of this build (--force, --soft-refs, ...).
+    Returns True if every worker import succeeded and the final pass exited cleanly.
+    """
+    # Read at call time: set_output_root may have redirected the paths
+    from build_manifest import BuildManifest
+    from skin_catalog import load_catalog
+    from png_validator import reject_corrupt_pngs
+    from texture_dedupe import TextureHashIndex, find_texture_aliases
+    from atlas_repack import repack_advanced_skins, summary_lines as repack_summary_lines
+    from texture_tiers import generate_tiers, use_tier, summary_lines as tier_summary_lines
+    from skin_plan import build_plan, write_skin_index_lua
+    from chunk_planner import save_chunk_manifest
+
+    def log_error(message):
+        log(f"[ERROR] {message}")
+
+    force = "--force" in script_flags
+    start = time.perf_counter()
+    # The final pass starts from the catalog saved here
+    skins = load_catalog(skin_config.EXTEND_SKINS_ROOT, skin_config.CATALOG_PATH, skin_config.SCAN_INDEX_PATH, log_error,
+                         skin_config.ATLAS_CACHE_DIR)
+    if "--deep-validate" in script_flags:
+        reject_corrupt_pngs(skins, log_error=log_error)
+    aliases = None
+    if "--dedupe" in script_flags or "--dedupe-tolerance" in script_flags:
+        # Same aliases as the final pass will find (from the hash cache written here)
+        tolerance = int(script_flags[script_flags.index("--dedupe-tolerance") + 1]) if "--dedupe-tolerance" in script_flags else 0
+        hash_index = TextureHashIndex(skin_config.TEXTURE_HASH_INDEX_PATH)
+        aliases = find_texture_aliases(skins, hash_index, tolerance, atlas_cache_dir=skin_config.ATLAS_CACHE_DIR)
+        hash_index.save()
+    if "--repack" in script_flags or "--repack-pot" in script_flags:
+        # Workers import the repacked files; the final pass finds them up to date in the repack cache
+        reports = repack_advanced_skins(skins, root=skin_config.EXTEND_SKINS_ROOT, out_root=skin_config.REPACK_DIR,
+                                        power_of_two="--repack-pot" in script_flags)
+        log(repack_summary_lines(reports)[0])
+    if skin_config.TEXTURE_TIER > 1:
+        # Workers import the tier textures generated here (one process pool for the whole tree)
+        reports = generate_tiers(skins, [skin_config.TEXTURE_TIER], out_root=skin_config.TIERS_DIR)
+        for message in reports[skin_config.TEXTURE_TIER]["errors"]:
+            log_error(message)
+        for line in tier_summary_lines(reports):
+            log(line)
+        use_tier(skins, skin_config.TEXTURE_TIER, skin_config.TIERS_DIR)
+    manifest = BuildManifest(skin_config.MANIFEST_PATH, force=force)
+    plan = build_plan(skins, manifest, "--soft-refs" in script_flags, aliases)
+    for line in plan.summary_lines(verbose=False):
+        log(line)
+    if plan.is_empty():
+        save_chunk_manifest(plan.chunk_manifest, skin_config.CHUNK_MANIFEST_PATH)
+        if write_skin_index_lua(plan.skin_index, skin_config.SKIN_INDEX_LUA_PATH):
+            log(f"Updated skin index: {skin_config.SKIN_INDEX_LUA_PATH}")
+        return True
+
+    # 1. Shards, one worker each
+    if os.path.isdir(skin_config.SHARD_DIR):
+        shutil.rmtree(skin_config.SHARD_DIR)
+    os.makedirs(skin_config.SHARD_DIR)
+    worker_flags = [flag for flag in script_flags if flag in WORKER_FLAGS]
+    running = []
+    for index, shard in enumerate(partition_imports(plan, workers)):
+        shard_path = os.path.join(skin_config.SHARD_DIR, f"shard_{index:02d}.json")
+        with open(shard_path, 'w', encoding='utf-8') as f:
+            json.dump(shard, f, indent=1)
+        log(f"Shard {index}: {len(shard['texture_imports'])} textures, {len(shard['spine_imports'])} spine assets, "
+            f"{shard['bytes'] / 1048576:.1f} MB")
+        stdout = open(shard_log_path(shard_path), 'w', encoding='utf-8')
+        running.append((shard_path, shard, stdout, launcher.launch(["--shard", shard_path] + worker_flags, stdout)))
+
+    # 2. Merge what the workers imported (asset and DefaultSkins fingerprints) into the manifest
+    failed = []
+    for shard_path, shard, stdout, process in running:
+        process.wait()
+        stdout.close()
+        results = BuildManifest(shard_result_path(shard_path))
+        for asset_path, fingerprint in results.assets.items():
+            manifest.mark_asset(asset_path, fingerprint)
+        missing = [op["asset_path"] for op in shard["texture_imports"] + shard["spine_imports"] if op["asset_path"] not in results.assets]
+        if missing or process.returncode:
+            log_error(f"Worker {os.path.basename(shard_path)} (exit code {process.returncode}) did not import "
+                      f"{len(missing)} assets, see {shard_log_path(shard_path)}")
+        failed.extend(missing)
+    if force:
+        # Imports are done; the final pass still has to rebuild every stage
+        manifest.stages = {}
+    manifest.save()
+    log(f"Workers finished in {time.perf_counter() - start:.1f}s, {len(failed)} imports left for the final pass")
+
+    # 3. Final pass in one editor: DataTable, ExtendSkinAssets, labels (and any failed import)
+    final_flags = [flag for flag in script_flags if flag != "--force"]
+    final = launcher.launch(final_flags)
+    final.wait()
+    log(f"Sharded build finished in {time.perf_counter() - start:.1f}s")
+    return not failed and final.returncode == 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--workers": str(skin_config.SHARD_WORKERS), "--editor": None, "--project": None, "--output": None, "--skins": None}
+    use_fake = False
+    script_flags = []
+    while args:
+        arg = args.pop(0)
+        if arg in options and args:
+            options[arg] = args.pop(0)
+        elif arg == "--fake":
+            use_fake = True
+        else:
+            script_flags.append(arg)
+
+    if options["--skins"] and not options["--output"]:
+        print(__doc__)
+        print("--skins needs --output")
+        sys.exit(2)
+    if options["--output"]:
+        skin_config.set_output_root(os.path.abspath(options["--output"]),
+                                    os.path.abspath(options["--skins"]) if options["--skins"] else None)
+    if use_fake:
+        build_launcher = FakeEditorLauncher(options["--output"] and os.path.abspath(options["--output"]),
+                                            options["--skins"] and os.path.abspath(options["--skins"]))
+    elif options["--editor"] and options["--project"]:
+        build_launcher = EditorLauncher(options["--editor"], options["--project"])
+    else:
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(0 if run_sharded_build(build_launcher, int(options["--workers"]), script_flags) else 1)
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+
+"""
+Lightweight tracing for CreateMoreLilySkins.py
+
+A Tracer records nested spans (pipeline stages, import batches, editor API
+calls) and per-asset counters (bytes read, loads, saves). At the end of a run
+it writes a Chrome trace JSON (chrome://tracing or https://ui.perfetto.dev) and
+renders a summary table of where the time went.
+
+trace_editor_api wraps the `unreal` module so every call listed in
+TRACED_EDITOR_CALLS becomes a span; everything else (classes, enums) is
+passed through untouched.
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+TRACE_FORMAT_VERSION = 1
+
+# Editor API calls recorded as spans: { namespace: [function, ...] } ("" is the module itself).
+# AssetTools / AssetRegistry are the objects returned by the *Helpers getters.
+TRACED_EDITOR_CALLS = {
+    "": ["load_asset", "find_object"],
+    "EditorAssetLibrary": ["load_asset", "does_asset_exist", "save_loaded_asset", "save_loaded_assets", "save_asset",
+                           "delete_loaded_asset"],
+    "EditorLoadingAndSavingUtils": ["reload_packages", "unload_packages"],
+    "SystemLibrary": ["collect_garbage"],
+    "DataTableFunctionLibrary": ["get_data_table_row_names", "get_data_table_column_as_string", "fill_data_table_from_csv_string"],
+    "AssetTools": ["import_asset_tasks", "create_asset"],
+    "AssetRegistry": ["scan_paths_synchronous", "scan_files_synchronous", "wait_for_completion", "get_assets",
+                      "get_asset_by_object_path", "get_assets_by_package_name"],
+}
+
+
+class Tracer:
+    """Collects spans and counters; spans nest per thread"""
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.events = []
+        self.asset_counters = defaultdict(lambda: defaultdict(int))
+        self.gauges = []  # (ts, track, {series: value})
+        self._local = threading.local()
+
+    def _now_us(self):
+        return (time.perf_counter_ns() - self.start_ns) / 1000.0
+
+    def span(self, name, category="stage", **args):
+        return _Span(self, name, category, args)
+
+    def count(self, asset, counter, amount=1):
+        """Add to a per-asset counter, e.g. count(package, "loads")"""
+        self.asset_counters[str(asset)][counter] += amount
+
+    def gauge(self, track, **values):
+        """Record absolute values now, e.g. gauge("memory", working_set_mb=812.5) (a counter track in the trace)"""
+        self.gauges.append((self._now_us(), track, values))
+
+    def totals(self):
+        """{ span_name: [calls, total_us, max_us, category] }"""
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault(event["name"], [0, 0.0, 0.0, event["cat"]])
+            entry[0] += 1
+            entry[1] += event["dur"]
+            entry[2] = max(entry[2], event["dur"])
+        return totals
+
+    def counter_totals(self):
+        totals = defaultdict(int)
+        for counters in self.asset_counters.values():
+            for counter, value in counters.items():
+                totals[counter] += value
+        return dict(totals)
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        events = [dict(event, ph="X", pid=pid) for event in self.events]
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "CreateMoreLilySkins"}})
+        # Running totals of the counters, so Perfetto shows loads/saves/bytes over time
+        running = defaultdict(int)
+        for event in sorted(self.events, key=lambda e: e["ts"] + e["dur"]):
+            delta = event.get("args", {}).get("_counters")
+            if not delta:
+                continue
+            for counter, value in delta.items():
+                running[counter] += value
+            events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0, "ts": event["ts"] + event["dur"],
+                           "args": dict(running)})
+        for ts, track, values in self.gauges:
+            events.append({"name": track, "ph": "C", "pid": pid, "tid": 0, "ts": ts, "args": values})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "version": TRACE_FORMAT_VERSION,
+                "asset_counters": {asset: dict(c) for asset, c in sorted(self.asset_counters.items())},
+            },
+        }
+
+    def write_chrome_trace(self, path):
+        trace_dir = os.path.dirname(path)
+        if trace_dir and not os.path.exists(trace_dir):
+            os.makedirs(trace_dir)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, separators=(",", ":"))
+
+    def summary_lines(self, top_assets=10):
+        """Table of span totals (stages first, then editor calls) and the busiest assets"""
+        run_us = max(self._now_us(), 1.0)
+        lines = [f"{'span':<44}{'calls':>7}{'total ms':>11}{'max ms':>10}{'% run':>8}"]
+        for category in ("stage", "batch", "editor"):
+            rows = [(name, t) for name, t in self.totals().items() if t[3] == category]
+            for name, (calls, total, longest, _) in sorted(rows, key=lambda row: -row[1][1]):
+                lines.append(f"{name[:43]:<44}{calls:>7}{total / 1000:>11.1f}{longest / 1000:>10.1f}{total / run_us * 100:>7.1f}%")
+
+        totals = self.counter_totals()
+        if totals:
+            lines.append("Counters: " + ", ".join(f"{name}={value}" for name, value in sorted(totals.items())))
+        busiest = sorted(self.asset_counters.items(), key=lambda item: -sum(item[1].values()))[:top_assets]
+        for asset, counters in busiest:
+            lines.append(f"  {asset}: " + ", ".join(f"{name}={value}" for name, value in sorted(counters.items())))
+        return lines
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start", "counters")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.counters = None
+
+    def count(self, asset, counter, amount=1):
+        """Per-asset counter attributed to this span (also shown as a counter track in the trace)"""
+        self.tracer.count(asset, counter, amount)
+        if self.counters is None:
+            self.counters = defaultdict(int)
+        self.counters[counter] += amount
+
+    def __enter__(self):
+        self.start = self.tracer._now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = self.tracer._now_us()
+        event = {"name": self.name, "cat": self.category, "ts": self.start, "dur": end - self.start,
+                 "tid": threading.get_ident()}
+        args = {key: value if isinstance(value, (int, float, bool)) else str(value) for key, value in self.args.items()}
+        if self.counters:
+            args["_counters"] = dict(self.counters)
+        if exc_type is not None:
+            args["error"] = exc_type.__name__
+        if args:
+            event["args"] = args
+        self.tracer.events.append(event)
+        return False
+
+
+# --- Editor API wrapping ---
+
+def _package_of(value):
+    """Package name of an object path or an editor object"""
+    path = value if isinstance(value, str) else value.get_path_name() if hasattr(value, "get_path_name") else str(value)
+    return str(path).split(".")[0]
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _record(span, namespace, name, args):
+    """Per-asset counters for the calls that touch assets"""
+    if name == "load_asset" and args:
+        span.count(_package_of(args[0]), "loads")
+    elif name in ("save_loaded_asset", "save_asset") and args:
+        span.count(_package_of(args[0]), "saves")
+    elif name == "save_loaded_assets" and args:
+        for package in {_package_of(obj) for obj in args[0]}:
+            span.count(package, "saves")
+    elif name == "import_asset_tasks" and args:
+        for task in args[0]:
+            filename = str(task.get_editor_property("filename"))
+            package = str(task.get_editor_property("destination_path")).rstrip("/") + "/" + str(task.get_editor_property("destination_name"))
+            span.count(package, "imports")
+            span.count(package, "bytes_read", _file_size(filename))
+            if filename.lower().endswith(".skel"):
+                # The spine factory also reads the atlas next to the skeleton
+                span.count(package, "bytes_read", _file_size(os.path.splitext(filename)[0] + ".atlas"))
+
+
+def _traced_call(tracer, namespace, name, func):
+    label = f"{namespace}.{name}" if namespace else f"unreal.{name}"
+
+    def call(*args, **kwargs):
+        with tracer.span(label, "editor") as span:
+            _record(span, namespace, name, args)
+            return func(*args, **kwargs)
+    call.__name__ = name
+    call.__doc__ = getattr(func, "__doc__", None)
+    return call
+
+
+class _TracedNamespace:
+    """Proxy that turns the listed methods of `target` into spans"""
+
+    def __init__(self, target, tracer, namespace, names, getters=None):
+        self._target = target
+        self._tracer = tracer
+        self._namespace = namespace
+        self._names = set(names)
+        self._getters = getters or {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name in self._names:
+            return _traced_call(self._tracer, self._namespace, name, attr)
+        if name in self._getters:
+            # get_asset_tools() / get_asset_registry(): wrap the returned object too
+            namespace = self._getters[name]
+            return lambda *args, **kwargs: _TracedNamespace(attr(*args, **kwargs), self._tracer, namespace,
+                                                            TRACED_EDITOR_CALLS[namespace])
+        return attr
+
+
+def trace_editor_api(unreal_module, tracer):
+    """Return a stand-in for the `unreal` module whose editor calls are recorded by `tracer`"""
+    namespaces = {
+        name: _TracedNamespace(getattr(unreal_module, name), tracer, name, calls)
+        for name, calls in TRACED_EDITOR_CALLS.items() if name and hasattr(unreal_module, name)
+    }
+    if hasattr(unreal_module, "AssetToolsHelpers"):
+        namespaces["AssetToolsHelpers"] = _TracedNamespace(unreal_module.AssetToolsHelpers, tracer, "AssetToolsHelpers", [],
+                                                           {"get_asset_tools": "AssetTools"})
+    if hasattr(unreal_module, "AssetRegistryHelpers"):
+        namespaces["AssetRegistryHelpers"] = _TracedNamespace(unreal_module.AssetRegistryHelpers, tracer, "AssetRegistryHelpers", [],
+                                                              {"get_asset_registry": "AssetRegistry"})
+
+    class TracedUnreal(_TracedNamespace):
+        def __getattr__(self, name):
+            if name in namespaces:
+                return namespaces[name]
+            return _TracedNamespace.__getattr__(self, name)
+
+    return TracedUnreal(unreal_module, tracer, "", TRACED_EDITOR_CALLS[""])
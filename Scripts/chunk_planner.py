@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+
+from skin_config import (
+    BUILD_CACHE_DIR, CHUNK_MANIFEST_PATH, RESIDENT_BYTES_PER_TEXEL, CORE_CHUNK_ID, CORE_PAK_NAME, MOD_ASSETS,
+    SKIN_CHUNK_BUDGET, SKIN_CHUNK_FIRST_ID, SKIN_CHUNK_PAK_NAME, TEXTURE_TIER,
+)
+from texture_tiers import tier_size
+from skin_catalog import parse_skin_key, skin_key
+
+"""
+Size-budgeted chunk planner for the skin paks
+
+Every skin (a base skin id with all of its extensions, e.g. p0001 or p0007) goes
+into one skin chunk, and a chunk holds at most SKIN_CHUNK_BUDGET estimated cooked
+bytes, so the paks stay small and a player can leave out the ones with skins
+they do not use. The mod assets (ExtendSkinAssets, BP_ExtendSkinAssets,
+ModActor) stay in the small core chunk (Chunk2).
+
+Allocations are stable like the DataTable rows: a skin keeps its chunk from the
+previous build while it still fits, so adding a skin changes only the chunk it
+lands in. The result is written to chunk_manifest.json and into SkinIndex.lua,
+which maps every skin id to its chunk and pak.
+
+Usage outside the editor:
+    python chunk_planner.py [--chunk-budget MB]    print the chunk layout of ExtendSkins
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+CHUNK_MANIFEST_VERSION = 1
+
+# Simple extensions replace a 1024x256 page texture (same estimate as skin_plan.estimate_resident_memory),
+# scaled down with the texture tier of the build
+SIMPLE_TEXTURE_TEXELS = tier_size(1024, 256, TEXTURE_TIER)[0] * tier_size(1024, 256, TEXTURE_TIER)[1]
+
+
+def pak_name(chunk_id):
+    return CORE_PAK_NAME if chunk_id == CORE_CHUNK_ID else SKIN_CHUNK_PAK_NAME.format(chunk_id=chunk_id)
+
+
+def estimate_skin_bytes(catalog, aliases=()):
+    """
+    Estimated cooked size of every skin of a skin_catalog.SkinCatalog, { skin_id: bytes }
+    Textures count as DXT5 without mips; spine assets by source file size. Aliased
+    textures (texture_dedupe) are not cooked and cost nothing.
+    """
+    skin_bytes = {}
+    for sid, records in catalog.by_id.items():
+        total = 0
+        for record in records:
+            if record.name not in aliases:
+                total += (record.w * record.h if record.kind != "simple" else SIMPLE_TEXTURE_TEXELS) * RESIDENT_BYTES_PER_TEXEL
+            if record.kind == "advanced":
+                total += sum(os.path.getsize(p) for p in (record.atlas, record.skel) if os.path.exists(p))
+        skin_bytes[sid] = total
+    return skin_bytes
+
+
+def allocate_chunks(skin_bytes, previous, budget=SKIN_CHUNK_BUDGET, first_id=SKIN_CHUNK_FIRST_ID):
+    """
+    Give every skin a stable chunk with at most `budget` bytes per chunk
+    Skins keep their previous chunk while it still fits (in id order). The others go into
+    the first chunk with room, or open the lowest free chunk id; a skin larger than the budget
+    gets a chunk of its own. budget <= 0 puts every skin into the core chunk.
+    Returns: { skin_id: chunk_id }
+    """
+    if budget <= 0:
+        return {sid: CORE_CHUNK_ID for sid in skin_bytes}
+    allocation, loads = {}, {}
+    for sid in sorted(skin_bytes):
+        chunk_id = previous.get(sid)
+        if chunk_id is None or chunk_id < first_id:
+            continue
+        if loads.get(chunk_id) and loads[chunk_id] + skin_bytes[sid] > budget:
+            continue
+        allocation[sid] = chunk_id
+        loads[chunk_id] = loads.get(chunk_id, 0) + skin_bytes[sid]
+
+    for sid in sorted(skin_bytes):
+        if sid in allocation:
+            continue
+        chunk_id = next((c for c in sorted(loads) if loads[c] + skin_bytes[sid] <= budget), None)
+        if chunk_id is None:
+            chunk_id = next(c for c in range(first_id, first_id + len(loads) + 1) if c not in loads)
+        allocation[sid] = chunk_id
+        loads[chunk_id] = loads.get(chunk_id, 0) + skin_bytes[sid]
+    return allocation
+
+
+def build_chunk_manifest(allocation, skin_bytes, budget=SKIN_CHUNK_BUDGET):
+    """
+    Skin id -> chunk map with the pak of every chunk, as written to chunk_manifest.json
+    Returns: {
+        "version": 1, "budget": bytes,
+        "core": {"chunk": 2, "pak": "EnderLilies_More_Skins_Mod", "assets": [...]},
+        "chunks": {"5": {"pak": "...", "bytes": int, "skins": ["p0001", "p0007"]}, ...},
+        "skins": {"p0001": 5, "p0007": 5, ...}
+    }
+    """
+    chunks = {}
+    for sid, chunk_id in sorted(allocation.items()):
+        chunk = chunks.setdefault(str(chunk_id), {"pak": pak_name(chunk_id), "bytes": 0, "skins": []})
+        chunk["bytes"] += skin_bytes.get(sid, 0)
+        chunk["skins"].append(skin_key(sid))
+    return {
+        "version": CHUNK_MANIFEST_VERSION,
+        "budget": max(0, budget),
+        "core": {"chunk": CORE_CHUNK_ID, "pak": CORE_PAK_NAME, "assets": list(MOD_ASSETS)},
+        "chunks": dict(sorted(chunks.items(), key=lambda item: int(item[0]))),
+        "skins": {skin_key(sid): chunk_id for sid, chunk_id in sorted(allocation.items())},
+    }
+
+
+def load_chunk_manifest(path=CHUNK_MANIFEST_PATH):
+    """chunk_manifest.json of the last build, or None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and manifest.get("version") == CHUNK_MANIFEST_VERSION else None
+
+def load_chunk_allocation(path=CHUNK_MANIFEST_PATH):
+    """Persisted skin id -> chunk map, { 7: 5, ... }"""
+    manifest = load_chunk_manifest(path) or {}
+    allocation = {parse_skin_key(key): int(chunk_id) for key, chunk_id in manifest.get("skins", {}).items()}
+    allocation.pop(None, None)
+    return allocation
+
+def save_chunk_manifest(manifest, path=CHUNK_MANIFEST_PATH):
+    """Write chunk_manifest.json (returns True if the content changed)"""
+    if load_chunk_manifest(path) == manifest:
+        return False
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    return True
+
+
+def summary_lines(manifest):
+    lines = [f"Chunks: core {manifest['core']['chunk']} ({len(manifest['core']['assets'])} mod assets), "
+             f"{len(manifest['chunks'])} skin chunks, budget {manifest['budget'] / 1048576:.0f} MB"]
+    for chunk_id, chunk in manifest["chunks"].items():
+        lines.append(f"- Chunk{chunk_id} ({chunk['pak']}): {len(chunk['skins'])} skins, {chunk['bytes'] / 1048576:.1f} MB")
+    return lines
+
+
+if __name__ == "__main__":
+    from skin_catalog import load_catalog
+
+    def log_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    sizes = estimate_skin_bytes(load_catalog(log_error=log_error))
+    for line in summary_lines(build_chunk_manifest(allocate_chunks(sizes, load_chunk_allocation()), sizes)):
+        print(line)
@@ -48,4 +48,15 @@ for %%E in (pak ucas utoc) do (
   )
 )
 
+echo.
+echo Copying skin chunk files...
+for /L %%N in (5,1,99) do (
+  for %%E in (pak ucas utoc) do (
+    if exist "%SRC%\pakchunk%%N-WindowsNoEditor.%%E" (
+      copy /Y "%SRC%\pakchunk%%N-WindowsNoEditor.%%E" "%DST%\EnderLilies_More_Skins_Mod_Chunk%%N_0_P.%%E" >nul
+      echo Copied pakchunk%%N-WindowsNoEditor.%%E to EnderLilies_More_Skins_Mod_Chunk%%N_0_P.%%E
+    )
+  )
+)
+
 endlocal
\ No newline at end of file
@@ -0,0 +1,545 @@
+import os
+import io
+import csv
+import sys
+import json
+import time
+import runpy
+from collections import Counter
+
+"""
+In-process stand-in for the UE 4.26 `unreal` Python module
+
+Implements the part of the editor API CreateMoreLilySkins.py uses (import tasks,
+EditorAssetLibrary, asset registry, PrimaryAssetLabel, DataTable functions) on
+top of an in-memory asset store. Every API call is counted in `calls`, imports
+sleep for `import_latency` seconds per task to simulate the editor, and saved
+packages are written as small JSON placeholders below `content_dir`, which are
+read back by the next install() so incremental runs behave like the real thing.
+
+Usage outside the editor:
+    python fake_unreal.py [--latency SECONDS] [--output DIR] [--skins DIR] [--quiet] [script args ...]
+    Runs CreateMoreLilySkins.py against this module; everything it writes goes to DIR
+    (default Saved/FakeUnreal) and the call counts are printed at the end. --skins reads
+    another ExtendSkins folder.
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+calls = Counter()
+package_writes = Counter()
+import_latency = 0.0
+content_dir = None
+quiet = False
+
+_objects = {}      # object path -> _EditorObject
+_packages = {}     # package name -> [object path, ...]
+_resident = set()  # object paths loaded in memory
+
+# Assets of the game project that the script expects to exist (package name -> class)
+PROJECT_ASSETS = {
+    "/Game/_Zenith/Gameplay/Structures/FSpineDataGroup": "UserDefinedStruct",
+    "/Game/_Zenith/Characters/p0001_Lily/p0001_Lily-notify": "SpineAnimNotify",
+    "/Game/_Zenith/Characters/p0000_Lily/MI_LilyLight1": "MaterialInstanceConstant",
+    "/Game/Mods/EnderLilies_More_Skins_Mod/BP_ExtendSkinAssets": "Blueprint",
+    "/Game/Mods/EnderLilies_More_Skins_Mod/ExtendSkinAssets": "ExtendSkinAssets",
+    "/Game/Mods/EnderLilies_More_Skins_Mod/ModActor": "Blueprint",
+}
+
+
+def _count(name):
+    calls[name] += 1
+
+
+def _split_path(path):
+    """'/Game/A/B' or '/Game/A/B.B' -> ('/Game/A/B', 'B')"""
+    path = str(path)
+    if "'" in path:
+        path = path.split("'")[1]
+    package, _, name = path.partition(".")
+    return package, name or package.rsplit("/", 1)[-1]
+
+
+def _placeholder_path(package):
+    return os.path.join(content_dir, package[len("/Game/"):].replace("/", os.sep) + ".uasset")
+
+
+# --- Logging ---
+
+def log(message):
+    _count("log")
+    if not quiet:
+        print(f"LogPython: {message}")
+
+def log_warning(message):
+    _count("log_warning")
+    if not quiet:
+        print(f"LogPython: Warning: {message}")
+
+def log_error(message):
+    _count("log_error")
+    if not quiet:
+        print(f"LogPython: Error: {message}")
+
+
+# --- Objects ---
+
+class _EditorObject:
+    """Base of every fake object: editor properties live in a dict"""
+
+    def __init__(self, **properties):
+        self._properties = dict(properties)
+        self._path = ""
+
+    def get_editor_property(self, name):
+        return self._properties.get(name)
+
+    def set_editor_property(self, name, value):
+        self._properties[name] = value
+
+    def get_path_name(self):
+        return self._path
+
+    def get_name(self):
+        return self._path.rsplit(".", 1)[-1]
+
+    def get_class(self):
+        return type(self)
+
+    def get_outermost(self):
+        return Package(self._path.split(".")[0])
+
+    def __repr__(self):
+        return f"<{type(self).__name__} '{self._path}'>"
+
+
+class Package(_EditorObject):
+    def __init__(self, package_name):
+        super().__init__()
+        self._path = package_name
+
+    def get_name(self):
+        return self._path
+
+
+class AssetImportTask(_EditorObject):
+    def __init__(self):
+        super().__init__(filename="", destination_path="", destination_name="", replace_existing=False,
+                         automated=False, save=False, factory=None, imported_object_paths=[])
+
+
+class TextureFactory(_EditorObject):
+    pass
+
+
+class DataTableFactory(_EditorObject):
+    pass
+
+
+class PrimaryAssetRules(_EditorObject):
+    pass
+
+
+class PrimaryAssetLabel(_EditorObject):
+    pass
+
+
+class DataTable(_EditorObject):
+    def __init__(self, **properties):
+        super().__init__(**properties)
+        self._rows = {}
+
+
+class Texture2D(_EditorObject):
+    pass
+
+
+class SpineAtlasAsset(_EditorObject):
+    pass
+
+
+class SpineSkeletonDataAsset(_EditorObject):
+    pass
+
+
+class DataAsset(_EditorObject):
+    pass
+
+
+class TextureMipGenSettings:
+    TMGS_FROM_TEXTURE_GROUP = "TMGS_FROM_TEXTURE_GROUP"
+    TMGS_NO_MIPMAPS = "TMGS_NO_MIPMAPS"
+    TMGS_SIMPLE_AVERAGE = "TMGS_SIMPLE_AVERAGE"
+
+
+class TextureGroup:
+    TEXTUREGROUP_WORLD = "TEXTUREGROUP_WORLD"
+    TEXTUREGROUP_CHARACTER = "TEXTUREGROUP_CHARACTER"
+    TEXTUREGROUP_UI = "TEXTUREGROUP_UI"
+
+
+_CLASSES = {cls.__name__: cls for cls in (PrimaryAssetLabel, DataTable, Texture2D, SpineAtlasAsset, SpineSkeletonDataAsset)}
+
+
+def _register(package, name, cls, resident=True):
+    obj = cls()
+    obj._path = f"{package}.{name}"
+    _objects[obj._path] = obj
+    paths = _packages.setdefault(package, [])
+    if obj._path not in paths:
+        paths.append(obj._path)
+    if resident:
+        _resident.add(obj._path)
+    return obj
+
+
+def _resolve(path):
+    package, name = _split_path(path)
+    return _objects.get(f"{package}.{name}")
+
+
+def _write_package(package):
+    package_writes[package] += 1
+    if not content_dir:
+        return
+    file_path = _placeholder_path(package)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    objects = {_objects[p].get_name(): type(_objects[p]).__name__ for p in _packages.get(package, [])}
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({"fake_unreal": 1, "objects": objects}, f)
+
+
+def _unregister_package(package):
+    for path in _packages.pop(package, []):
+        _objects.pop(path, None)
+        _resident.discard(path)
+
+
+def find_object(outer, name):
+    _count("find_object")
+    path = str(name)
+    return _objects.get(path) if path in _resident else None
+
+def load_asset(name):
+    _count("load_asset")
+    obj = _resolve(name)
+    if obj is not None:
+        _resident.add(obj._path)
+    return obj
+
+def load_object(outer, name):
+    return load_asset(name)
+
+
+# --- Editor asset library ---
+
+class EditorAssetLibrary:
+    @staticmethod
+    def does_asset_exist(asset_path):
+        _count("does_asset_exist")
+        return _split_path(asset_path)[0] in _packages
+
+    @staticmethod
+    def load_asset(asset_path):
+        return load_asset(asset_path)
+
+    @staticmethod
+    def save_loaded_asset(asset_to_save, only_if_is_dirty=True):
+        _count("save_asset")
+        _write_package(_split_path(asset_to_save.get_path_name())[0])
+        return True
+
+    @staticmethod
+    def save_loaded_assets(assets_to_save, only_if_is_dirty=True):
+        _count("save_loaded_assets")
+        for package in sorted({_split_path(obj.get_path_name())[0] for obj in assets_to_save}):
+            _count("save_asset")
+            _write_package(package)
+        return True
+
+    @staticmethod
+    def delete_loaded_asset(asset_to_delete):
+        _count("delete_loaded_asset")
+        package = _split_path(asset_to_delete.get_path_name())[0]
+        _unregister_package(package)
+        if content_dir and os.path.exists(_placeholder_path(package)):
+            os.remove(_placeholder_path(package))
+        return True
+
+    @staticmethod
+    def save_asset(asset_to_save, only_if_is_dirty=True):
+        _count("save_asset")
+        package = _split_path(asset_to_save)[0]
+        if package not in _packages:
+            return False
+        _write_package(package)
+        return True
+
+
+class ReloadPackagesInteractionMode:
+    INTERACTIVE = "INTERACTIVE"
+    ASSUME_POSITIVE = "ASSUME_POSITIVE"
+    ASSUME_NEGATIVE = "ASSUME_NEGATIVE"
+
+
+class EditorLoadingAndSavingUtils:
+    @staticmethod
+    def reload_packages(packages_to_reload, interaction_mode):
+        """Drop the in-memory objects and read the saved placeholders again"""
+        _count("reload_packages")
+        for package in packages_to_reload:
+            name = package.get_name()
+            _unregister_package(name)
+            if name in PROJECT_ASSETS:
+                _register(name, name.rsplit("/", 1)[-1], _CLASSES.get(PROJECT_ASSETS[name], DataAsset), resident=False)
+            elif content_dir:
+                _register_file(_placeholder_path(name))
+        return True, ""
+
+    @staticmethod
+    def unload_packages(packages_to_unload):
+        """Drop the objects of the packages from memory (they stay registered, like saved packages)"""
+        _count("unload_packages")
+        for package in packages_to_unload:
+            for path in _packages.get(package.get_name(), []):
+                _resident.discard(path)
+        return bool(packages_to_unload), ""
+
+
+class SystemLibrary:
+    @staticmethod
+    def collect_garbage():
+        _count("collect_garbage")
+
+
+# --- Asset tools ---
+
+class _AssetTools:
+    def import_asset_tasks(self, import_tasks):
+        _count("import_asset_tasks")
+        for task in import_tasks:
+            _count("import_task")
+            if import_latency:
+                time.sleep(import_latency)
+            filename = task.get_editor_property("filename")
+            package = task.get_editor_property("destination_path").rstrip("/") + "/" + task.get_editor_property("destination_name")
+            name = package.rsplit("/", 1)[-1]
+            imported = []
+            if os.path.exists(filename):
+                if filename.lower().endswith(".skel"):
+                    # The modified spine factory merges atlas and skeleton data into one package
+                    if os.path.exists(os.path.splitext(filename)[0] + ".atlas"):
+                        atlas = _register(package, f"{name}-atlas", SpineAtlasAsset)
+                        data = _register(package, f"{name}-data", SpineSkeletonDataAsset)
+                        imported = [atlas._path, data._path]
+                else:
+                    imported = [_register(package, name, Texture2D)._path]
+            task.set_editor_property("imported_object_paths", imported)
+            if imported and task.get_editor_property("save"):
+                _write_package(package)
+
+    def create_asset(self, asset_name, package_path, asset_class, factory):
+        _count("create_asset")
+        package = package_path.rstrip("/") + "/" + asset_name
+        obj = _register(package, asset_name, asset_class)
+        if factory is not None and factory.get_editor_property("struct") is not None:
+            obj.set_editor_property("row_struct", factory.get_editor_property("struct"))
+        return obj
+
+
+class AssetToolsHelpers:
+    @staticmethod
+    def get_asset_tools():
+        return _AssetTools()
+
+
+# --- Asset registry ---
+
+class ARFilter:
+    def __init__(self, package_names=None, package_paths=None, object_paths=None, class_names=None,
+                 recursive_paths=False, recursive_classes=False):
+        self.package_names = package_names or []
+        self.package_paths = package_paths or []
+        self.object_paths = object_paths or []
+        self.class_names = class_names or []
+        self.recursive_paths = recursive_paths
+
+
+class AssetData:
+    def __init__(self, object_path=None):
+        obj = _objects.get(object_path) if object_path else None
+        self.object_path = object_path or ""
+        self.package_name, self.asset_name = _split_path(object_path) if object_path else ("", "")
+        self.package_path = self.package_name.rsplit("/", 1)[0]
+        self.asset_class = type(obj).__name__ if obj else ""
+
+    def is_valid(self):
+        return bool(self.asset_class)
+
+    def get_asset(self):
+        return load_asset(self.object_path)
+
+
+class _AssetRegistry:
+    def scan_paths_synchronous(self, paths, force_rescan=False):
+        _count("scan_paths_synchronous")
+
+    def scan_files_synchronous(self, files, force_rescan=False):
+        _count("scan_files_synchronous")
+        for file_path in files:
+            _register_file(file_path)
+
+    def search_all_assets(self, synchronous_search):
+        _count("search_all_assets")
+
+    def wait_for_completion(self):
+        _count("wait_for_completion")
+
+    def is_loading_assets(self):
+        return False
+
+    def get_asset_by_object_path(self, object_path, include_only_on_disk_assets=False):
+        _count("get_asset_by_object_path")
+        return AssetData(object_path if object_path in _objects else None)
+
+    def get_assets_by_package_name(self, package_name, include_only_on_disk_assets=False):
+        _count("get_assets_by_package_name")
+        return [AssetData(p) for p in _packages.get(package_name, [])]
+
+    def get_assets(self, filter):
+        _count("get_assets")
+        results = []
+        for package, paths in _packages.items():
+            folder = package.rsplit("/", 1)[0]
+            if filter.package_names and package not in filter.package_names:
+                continue
+            if filter.package_paths and not any(
+                    folder == p.rstrip("/") or (filter.recursive_paths and folder.startswith(p.rstrip("/") + "/"))
+                    for p in filter.package_paths):
+                continue
+            for path in paths:
+                if filter.object_paths and path not in filter.object_paths:
+                    continue
+                if filter.class_names and type(_objects[path]).__name__ not in filter.class_names:
+                    continue
+                results.append(AssetData(path))
+        return results
+
+
+class AssetRegistryHelpers:
+    @staticmethod
+    def get_asset_registry():
+        return _AssetRegistry()
+
+
+# --- DataTable functions ---
+
+class DataTableFunctionLibrary:
+    @staticmethod
+    def get_data_table_row_names(data_table):
+        _count("get_data_table_row_names")
+        return list(data_table._rows)
+
+    @staticmethod
+    def get_data_table_column_as_string(data_table, property_name):
+        _count("get_data_table_column_as_string")
+        column = data_table._columns.index(property_name) if property_name in getattr(data_table, "_columns", []) else None
+        return [values[column] if column is not None else "" for values in data_table._rows.values()]
+
+    @staticmethod
+    def fill_data_table_from_csv_string(data_table, csv_string):
+        _count("fill_data_table_from_csv_string")
+        reader = csv.reader(io.StringIO(csv_string))
+        header = next(reader, None)
+        if not header:
+            return False
+        data_table._columns = header[1:]
+        data_table._rows = {row[0]: row[1:] for row in reader if row}
+        return True
+
+
+# --- Setup ---
+
+def reset():
+    calls.clear()
+    package_writes.clear()
+    _objects.clear()
+    _packages.clear()
+    _resident.clear()
+
+
+def _register_file(file_path):
+    """Register a .uasset below content_dir: a placeholder of an earlier run, or a real file (e.g. copied .empty)"""
+    if not content_dir or not os.path.isfile(file_path):
+        return
+    relative = os.path.relpath(file_path, content_dir)
+    if relative.startswith("..") or not relative.endswith(".uasset"):
+        return
+    package = "/Game/" + relative[:-len(".uasset")].replace(os.sep, "/")
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            objects = json.load(f).get("objects", {})
+    except (OSError, ValueError, UnicodeDecodeError, AttributeError):
+        objects = {package.rsplit("/", 1)[-1]: "DataAsset"}
+    for name, class_name in objects.items():
+        if f"{package}.{name}" not in _objects:
+            _register(package, name, _CLASSES.get(class_name, DataAsset), resident=False)
+
+
+def _load_placeholders():
+    """Register packages saved by earlier fake runs (not resident until loaded)"""
+    if not content_dir or not os.path.isdir(content_dir):
+        return
+    for root, dirs, files in os.walk(content_dir):
+        for file_name in files:
+            _register_file(os.path.join(root, file_name))
+
+
+def install(output_content_dir=None, latency=0.0, quiet_log=False):
+    """Reset the fake editor state and make `import unreal` return this module"""
+    global content_dir, import_latency, quiet
+    reset()
+    content_dir = output_content_dir
+    import_latency = latency
+    quiet = quiet_log
+    for package, class_name in PROJECT_ASSETS.items():
+        _register(package, package.rsplit("/", 1)[-1], _CLASSES.get(class_name, DataAsset), resident=False)
+    _load_placeholders()
+    sys.modules["unreal"] = sys.modules[__name__]
+    return sys.modules[__name__]
+
+
+def run_script(script_path, script_args=(), output_root=None, latency=0.0, quiet_log=False, extend_skins_root=None):
+    """Run CreateMoreLilySkins.py (or another editor script) against the fake module"""
+    sys.argv = [script_path] + list(script_args)
+    scripts_dir = os.path.dirname(os.path.abspath(script_path))
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    # Imported only now so the flags in skin_config see the script arguments
+    import skin_config
+    if output_root:
+        skin_config.set_output_root(output_root, extend_skins_root)
+    install(skin_config.CONTENT_DIR if output_root else None, latency, quiet_log)
+    start = time.perf_counter()
+    runpy.run_path(script_path, run_name="__main__")
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--latency": 0.0, "--output": None, "--skins": None}
+    quiet_run = False
+    while args and args[0] in ("--latency", "--output", "--skins", "--quiet"):
+        flag = args.pop(0)
+        if flag == "--quiet":
+            quiet_run = True
+        else:
+            options[flag] = args.pop(0)
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    output_root = options["--output"] or os.path.join(scripts_dir, "..", "Saved", "FakeUnreal")
+    elapsed = run_script(os.path.join(scripts_dir, "CreateMoreLilySkins.py"), args, os.path.abspath(output_root),
+                         float(options["--latency"]), quiet_run, options["--skins"] and os.path.abspath(options["--skins"]))
+    print(f"\nFake editor run finished in {elapsed:.3f}s, output in {os.path.abspath(output_root)}")
+    for name, count in sorted(calls.items()):
+        if not name.startswith("log"):
+            print(f"  {name}: {count}")
@@ -0,0 +1,272 @@
+import os
+import sys
+import zlib
+import struct
+
+from png_validator import PNG_SIGNATURE, READ_BLOCK_SIZE, INFLATE_BUFFER_SIZE, CHANNELS
+
+"""
+Minimal streaming PNG codec (no image library; the editor's Python has none)
+
+PngRows decodes a PNG one scanline at a time: the IDAT stream is inflated through
+a fixed-size buffer and every row is unfiltered against the previous one, so a
+texture is never held in memory as a whole unless the caller keeps the rows.
+write_png encodes RGBA8 rows the same way, Up-filtered and compressed as they
+come. Used by texture_dedupe.py (pixel hashes) and atlas_repack.py.
+
+Usage outside the editor:
+    python png_codec.py <in.png> <out.png>    re-encode a PNG as RGBA8
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+# Compressed bytes per IDAT chunk written by write_png
+IDAT_CHUNK_SIZE = 256 * 1024
+
+
+class PngFormatError(ValueError):
+    pass
+
+
+# Per-byte addition / subtraction mod 256 of whole scanlines as big integers
+# (the Up filter without a Python loop over the bytes)
+_masks = {}
+
+def _row_masks(n):
+    masks = _masks.get(n)
+    if masks is None:
+        masks = _masks[n] = (int.from_bytes(b'\x7f' * n, 'big'), int.from_bytes(b'\x80' * n, 'big'),
+                             int.from_bytes(b'\x01' * n, 'big'))
+    return masks
+
+def _add_ints(x, y, low_mask, high_mask):
+    return ((x & low_mask) + (y & low_mask)) ^ ((x ^ y) & high_mask)
+
+def _add_bytes(line, prev):
+    low_mask, high_mask, _ = _row_masks(len(line))
+    return _add_ints(int.from_bytes(line, 'big'), int.from_bytes(prev, 'big'), low_mask, high_mask).to_bytes(len(line), 'big')
+
+def _subtract_bytes(line, prev):
+    low_mask, high_mask, ones = _row_masks(len(line))
+    negated = _add_ints(int.from_bytes(prev, 'big') ^ (low_mask | high_mask), ones, low_mask, high_mask)
+    return _add_ints(int.from_bytes(line, 'big'), negated, low_mask, high_mask).to_bytes(len(line), 'big')
+
+
+def unfilter(filter_type, line, prev, bpp):
+    """Undo the PNG filter of one scanline; `prev` is the previous unfiltered scanline (zeros for the first)"""
+    if filter_type == 0:
+        return bytes(line)
+    if filter_type == 2:
+        return _add_bytes(line, prev)
+    out = bytearray(line)
+    n = len(out)
+    if filter_type == 1:
+        for i in range(bpp, n):
+            out[i] = (out[i] + out[i - bpp]) & 255
+    elif filter_type == 3:
+        for i in range(min(bpp, n)):
+            out[i] = (out[i] + (prev[i] >> 1)) & 255
+        for i in range(bpp, n):
+            out[i] = (out[i] + ((out[i - bpp] + prev[i]) >> 1)) & 255
+    elif filter_type == 4:
+        for i in range(min(bpp, n)):
+            out[i] = (out[i] + prev[i]) & 255
+        for i in range(bpp, n):
+            a, b, c = out[i - bpp], prev[i], prev[i - bpp]
+            pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - 2 * c)
+            out[i] = (out[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 255
+    else:
+        raise PngFormatError(f"Invalid filter type {filter_type}")
+    return bytes(out)
+
+
+class PngRows:
+    """
+    Scanlines of a PNG, decoded one at a time
+    Only the current and previous scanline plus the inflate buffer are held in memory.
+    `format` says what the rows can be compared as:
+    - "rgba8": 8-bit images, rgba_rows() yields every row as RGBA8
+    - "raw": 16-bit and low bit depth images, rows() yields the unfiltered rows as stored
+    - "file": interlaced images, which are not decoded (only byte-identical files match)
+    """
+
+    def __init__(self, file_path):
+        self.file = open(file_path, 'rb')
+        try:
+            self._read_header()
+        except Exception:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.file.close()
+
+    def _read_header(self):
+        """Read the chunks before the first IDAT (IHDR, PLTE, tRNS)"""
+        f = self.file
+        if f.read(8) != PNG_SIGNATURE:
+            raise PngFormatError("Invalid PNG signature")
+        self.info = None
+        self.palette = b""
+        self.transparency = b""
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise PngFormatError("Truncated file")
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'IDAT':
+                self._idat_left = length
+                break
+            if chunk_type == b'IEND':
+                raise PngFormatError("Missing IDAT")
+            data = f.read(length)
+            if len(data) < length or len(f.read(4)) < 4:
+                raise PngFormatError(f"Truncated {chunk_type.decode('latin-1')} chunk")
+            if chunk_type == b'IHDR':
+                width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data[:13])
+                if color_type not in CHANNELS:
+                    raise PngFormatError(f"Invalid color type {color_type}")
+                self.info = {"w": width, "h": height, "bd": bit_depth, "ct": color_type}
+                self.interlace = interlace
+            elif chunk_type == b'PLTE':
+                self.palette = data
+            elif chunk_type == b'tRNS':
+                self.transparency = data
+        if self.info is None:
+            raise PngFormatError("IDAT before IHDR")
+
+        width, bit_depth, color_type = self.info["w"], self.info["bd"], self.info["ct"]
+        bits_per_pixel = CHANNELS[color_type] * bit_depth
+        self.row_bytes = (width * bits_per_pixel + 7) // 8
+        self.bpp = max(1, bits_per_pixel // 8)
+        self.format = "file" if self.interlace else "rgba8" if bit_depth == 8 else "raw"
+        if self.format == "rgba8" and color_type == 3:
+            alpha = self.transparency + b'\xff' * 256
+            self._palette_rgba = [self.palette[i * 3:i * 3 + 3] + alpha[i:i + 1] for i in range(len(self.palette) // 3)]
+            self._palette_rgba += [b'\x00\x00\x00\xff'] * (256 - len(self._palette_rgba))
+        # Single transparent color of gray / RGB images (tRNS holds 16-bit samples)
+        self._color_key = bytes(self.transparency[1::2]) * (3 if color_type == 0 else 1) \
+            if self.transparency and color_type in (0, 2) else None
+
+    def _idat_blocks(self):
+        f = self.file
+        while True:
+            while self._idat_left:
+                block = f.read(min(READ_BLOCK_SIZE, self._idat_left))
+                if not block:
+                    raise PngFormatError("Truncated IDAT chunk")
+                self._idat_left -= len(block)
+                yield block
+            # CRCs are checked by png_validator (--deep-validate)
+            f.read(4)
+            header = f.read(8)
+            if len(header) < 8:
+                raise PngFormatError("Truncated file")
+            self._idat_left, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type != b'IDAT':
+                return
+
+    def rows(self):
+        """Unfiltered scanlines, top to bottom (without the filter byte)"""
+        if self.interlace:
+            raise PngFormatError("Interlaced PNGs are not decoded row by row")
+        height = self.info["h"]
+        line_len = self.row_bytes + 1
+        inflater = zlib.decompressobj()
+        buf = bytearray()
+        prev = bytes(self.row_bytes)
+        produced = 0
+        for block in self._idat_blocks():
+            data = inflater.decompress(block, INFLATE_BUFFER_SIZE)
+            while True:
+                buf += data
+                while len(buf) >= line_len and produced < height:
+                    prev = unfilter(buf[0], buf[1:line_len], prev, self.bpp)
+                    del buf[:line_len]
+                    produced += 1
+                    yield prev
+                if not inflater.unconsumed_tail:
+                    break
+                data = inflater.decompress(inflater.unconsumed_tail, INFLATE_BUFFER_SIZE)
+        if produced < height:
+            raise PngFormatError("Truncated image data")
+
+    def rgba_rows(self):
+        """Scanlines as RGBA8 (format "rgba8" only)"""
+        width, color_type = self.info["w"], self.info["ct"]
+        opaque = b'\xff' * width
+        for row in self.rows():
+            if color_type == 6:
+                yield row
+                continue
+            if color_type == 3:
+                yield b"".join([self._palette_rgba[i] for i in row])
+                continue
+            out = bytearray(width * 4)
+            if color_type == 2:
+                out[0::4], out[1::4], out[2::4], out[3::4] = row[0::3], row[1::3], row[2::3], opaque
+            elif color_type == 0:
+                out[0::4] = out[1::4] = out[2::4] = row
+                out[3::4] = opaque
+            else:
+                gray = row[0::2]
+                out[0::4] = out[1::4] = out[2::4] = gray
+                out[3::4] = row[1::2]
+            if self._color_key is not None:
+                for i in range(0, len(out), 4):
+                    if out[i:i + 3] == self._color_key:
+                        out[i + 3] = 0
+            yield bytes(out)
+
+
+def read_rgba(file_path):
+    """Decode a whole 8-bit PNG: (width, height, [RGBA8 row, ...])"""
+    with PngRows(file_path) as png:
+        if png.format != "rgba8":
+            raise PngFormatError(f"Only 8-bit non-interlaced PNGs can be decoded to RGBA8 ({png.info['bd']}-bit, "
+                                 f"interlace {png.interlace})")
+        return png.info["w"], png.info["h"], list(png.rgba_rows())
+
+
+def _write_chunk(f, chunk_type, data):
+    f.write(struct.pack('>I', len(data)) + chunk_type + data)
+    f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+
+def write_png(file_path, width, height, rows, compress_level=6):
+    """
+    Write RGBA8 rows (width * 4 bytes each, top to bottom) as a PNG
+    The file is written next to its destination and moved into place once complete.
+    """
+    compressor = zlib.compressobj(compress_level)
+    prev = bytes(width * 4)
+    written = 0
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        _write_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        pending = bytearray()
+        for row in rows:
+            if len(row) != width * 4:
+                raise ValueError(f"Row {written} has {len(row)} bytes, expected {width * 4}")
+            pending += compressor.compress(b'\x02' + _subtract_bytes(row, prev))
+            prev = row
+            written += 1
+            if len(pending) >= IDAT_CHUNK_SIZE:
+                _write_chunk(f, b'IDAT', bytes(pending))
+                pending.clear()
+        if written != height:
+            raise ValueError(f"Got {written} rows for a {width}x{height} image")
+        pending += compressor.flush()
+        _write_chunk(f, b'IDAT', bytes(pending))
+        _write_chunk(f, b'IEND', b'')
+    os.replace(tmp_path, file_path)
+
+
+if __name__ == "__main__":
+    image_width, image_height, image_rows = read_rgba(sys.argv[1])
+    write_png(sys.argv[2], image_width, image_height, image_rows)
+    print(f"{sys.argv[2]}: {image_width}x{image_height} RGBA8")
@@ -0,0 +1,107 @@
+import os
+import sys
+
+"""
+Working set of the running process (the editor, when imported by CreateMoreLilySkins.py)
+
+working_set() reads the current and peak resident memory from the OS: psapi's
+GetProcessMemoryInfo on Windows, /proc/self/status on Linux, getrusage (peak
+only) elsewhere. MemoryMonitor samples it after every import batch and memory
+release so a build can report its peak and how much each batch added, which is
+what IMPORT_BATCH_SIZE (--batch-size) has to be chosen by.
+
+Usage outside the editor:
+    python process_memory.py     print the working set of this Python process
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+
+def _windows_working_set():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None, None
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def _proc_working_set():
+    values = {}
+    with open("/proc/self/status", 'r') as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(value.split()[0]) * 1024
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def _rusage_working_set():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in KiB everywhere else
+    return None, peak if sys.platform == "darwin" else peak * 1024
+
+
+def working_set():
+    """(current_bytes, peak_bytes) of this process; either is None where the OS does not report it"""
+    try:
+        if os.name == "nt":
+            return _windows_working_set()
+        if os.path.exists("/proc/self/status"):
+            return _proc_working_set()
+        return _rusage_working_set()
+    except (OSError, ImportError, AttributeError, ValueError):
+        return None, None
+
+
+def format_mb(value):
+    return "n/a" if value is None else f"{value / 1048576:.1f} MB"
+
+
+class MemoryMonitor:
+    """Working set samples taken at points of a build, e.g. after every import batch"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new series (e.g. the next rebuild in watch mode)"""
+        self.start, _ = working_set()
+        self.samples = []  # (label, current_bytes, peak_bytes)
+
+    def sample(self, label):
+        """Record the working set now; returns the current bytes (None if unknown)"""
+        current, peak = working_set()
+        self.samples.append((label, current, peak))
+        return current
+
+    @property
+    def peak(self):
+        """Highest working set of the process so far (OS peak, so spikes between samples count)"""
+        values = [value for _, current, peak in self.samples for value in (current, peak) if value is not None]
+        return max(values) if values else working_set()[1]
+
+    def summary_lines(self):
+        lines = [f"Editor memory: peak {format_mb(self.peak)}, at start {format_mb(self.start)}"]
+        previous = self.start
+        for label, current, _ in self.samples:
+            delta = "" if current is None or previous is None else f" ({(current - previous) / 1048576:+.1f} MB)"
+            lines.append(f"  {label}: {format_mb(current)}{delta}")
+            previous = current if current is not None else previous
+        return lines
+
+
+if __name__ == "__main__":
+    current_bytes, peak_bytes = working_set()
+    print(f"Working set {format_mb(current_bytes)}, peak {format_mb(peak_bytes)}")
@@ -0,0 +1,260 @@
+import os
+import sys
+import json
+import time
+
+import skin_config
+
+"""
+Editor-free reference validator for the generated assets
+
+Every /Game/... path the build writes into an asset is checked against the packages
+that are actually in Content/, so a bad reference shows up before the DataTable
+import instead of in game:
+    DT_SpineData_p0000   Notify, Atlas, Skeleton and LightMaterial of every row
+                         (the CSV rows of the game skins and the generated advanced rows)
+    ExtendSkinAssets     the texture, atlas and skeleton arrays (hard reference layout)
+    chunk labels         the textures, advanced skin folders and mod assets of every label
+The references are the ones a full rebuild would write (skin_plan.build_plan with a
+forced manifest, nothing is imported or saved).
+
+Content/ is indexed with os.scandir. The listing of every directory is cached with
+the directory's mtime (which changes whenever an entry is added, removed or renamed),
+so a later run only re-lists the directories that changed.
+
+A reference resolves if its package exists; an object path must also name the
+package's asset (p0007_Lily.p0007_Lily) or a spine sub-object of it
+(p0007_Lily.p0007_Lily-atlas). Game assets that only the CSV rows of the game skins
+reference (the shared notify, the atlases of skins 1-6) are cooked into the game's
+paks, not this project; they are reported as external instead of missing.
+
+Usage outside the editor:
+    python reference_validator.py [--output DIR] [--skins DIR] [--dedupe] [--verbose]
+    --output / --skins   check a redirected build (see skin_config.set_output_root); the project's own
+                         Content/ is indexed too, a redirected build only writes the generated packages
+    exits with code 1 if a reference does not resolve
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+CONTENT_INDEX_VERSION = 1
+PACKAGE_EXTENSIONS = (".uasset", ".umap")
+
+
+class ContentIndex:
+    """
+    Packages and folders below one or more Content/ directories, all mounted at /Game
+    Cache layout: { content_dir: { relative_dir: [mtime_ns, [package names], [subdirectories]] } }
+    Directories that are gone are dropped from the cache on save.
+    """
+
+    def __init__(self, content_dirs, index_path=None):
+        self.index_path = index_path
+        self.packages = set()
+        self.folders = set()
+        self.listed = 0
+        self.dirs = {}
+        cached = {}
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == CONTENT_INDEX_VERSION:
+                    cached = data.get("roots", {})
+            except (OSError, ValueError):
+                cached = {}
+        for content_dir in content_dirs:
+            content_dir = os.path.abspath(content_dir)
+            self.dirs[content_dir] = self._index(content_dir, cached.get(content_dir, {}))
+
+    def _index(self, content_dir, cached):
+        dirs = {}
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            dir_path = os.path.join(content_dir, relative) if relative else content_dir
+            try:
+                mtime = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                continue
+            entry = cached.get(relative)
+            if entry is None or entry[0] != mtime:
+                packages, subdirs = [], []
+                try:
+                    with os.scandir(dir_path) as it:
+                        for dir_entry in it:
+                            if dir_entry.is_dir(follow_symlinks=False):
+                                subdirs.append(dir_entry.name)
+                            elif dir_entry.name.endswith(PACKAGE_EXTENSIONS):
+                                packages.append(os.path.splitext(dir_entry.name)[0])
+                except OSError:
+                    continue
+                entry = [mtime, sorted(packages), sorted(subdirs)]
+                self.listed += 1
+            dirs[relative] = entry
+
+            folder = "/Game/" + relative.replace(os.sep, "/") if relative else "/Game"
+            self.folders.add(folder)
+            self.packages.update(f"{folder}/{name}" for name in entry[1])
+            stack.extend(os.path.join(relative, name) if relative else name for name in entry[2])
+        return dirs
+
+    def __len__(self):
+        return len(self.packages)
+
+    def save(self):
+        if not self.index_path:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": CONTENT_INDEX_VERSION, "roots": self.dirs}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+
+def split_reference(value):
+    """
+    "Class'/Game/A/B.B'" / "/Game/A/B.B" / "/Game/A/B" -> ("/Game/A/B", "B" or None)
+    Returns None for anything that is not a /Game path.
+    """
+    from skin_plan import normalize_reference
+
+    path = normalize_reference(value)
+    if not path.startswith("/Game/") or path.endswith("/"):
+        return None
+    package, _, object_name = path.partition(".")
+    return package, object_name or None
+
+
+def collect_references(catalog, aliases=None):
+    """
+    Every reference a full rebuild writes, from the skin catalog (skin_catalog.SkinCatalog)
+    Returns: (references, game_references, generated)
+    - references: [(where, reference, kind)], kind "object", "package" or "folder"
+    - game_references: references of the CSV rows of the game skins (rows below FIRST_ADVANCED_ROW)
+    - generated: packages the build itself imports or creates
+    """
+    from build_manifest import BuildManifest
+    from skin_plan import build_plan
+
+    # A forced manifest plans every stage; it is only read (its file hash cache spares rehashing)
+    plan = build_plan(catalog, BuildManifest(skin_config.MANIFEST_PATH, force=True), False, aliases)
+    table_name = skin_config.DT_PATH.rsplit("/", 1)[-1]
+    references, game_references = [], set()
+    for row_name, values in plan.data_table["rows"].items():
+        for column, value in zip(skin_config.DT_COLUMNS, values):
+            references.append((f"{table_name} row {row_name} {column}", value, "object"))
+            if int(row_name) < skin_config.FIRST_ADVANCED_ROW:
+                game_references.add(value)
+    asset_name = skin_config.EXTEND_SKIN_ASSETS_PATH.rsplit("/", 1)[-1]
+    for array in ("textures", "atlases", "skeletons"):
+        references.extend((f"{asset_name} {array}", value, "object") for value in plan.data_asset[array])
+    for label in plan.chunks["labels"]:
+        label_name = label["label"].rsplit("/", 1)[-1]
+        references.extend((f"{label_name} simple_textures", value, "object") for value in label["simple_textures"])
+        references.extend((f"{label_name} advanced_folders", value, "folder") for value in label["advanced_folders"])
+        references.extend((f"{label_name} mod_assets", value, "package") for value in label["mod_assets"])
+    label_name = skin_config.CHUNK3_LABEL_PATH.rsplit("/", 1)[-1]
+    references.extend((f"{label_name} assets", value, "package") for value in plan.chunk3["assets"])
+
+    generated = {op["asset_path"] for op in plan.imports}
+    generated.update([skin_config.DT_PATH, skin_config.EXTEND_SKIN_ASSETS_PATH, skin_config.CHUNK3_LABEL_PATH]
+                     + [label["label"] for label in plan.chunks["labels"]])
+    return references, game_references, generated
+
+
+def validate_references(references, content_index, game_references=(), generated=()):
+    """
+    Resolve references against a ContentIndex
+    Returns: {"checked": int, "resolved": int, "external": [reference, ...],
+              "missing": [(where, reference, reason), ...]}
+    """
+    report = {"checked": len(references), "resolved": 0, "external": [], "missing": []}
+    external = set()
+    for where, reference, kind in references:
+        if kind == "folder":
+            if reference.rstrip("/") in content_index.folders:
+                report["resolved"] += 1
+            else:
+                report["missing"].append((where, reference, "folder not found"))
+            continue
+        parsed = split_reference(reference)
+        if parsed is None:
+            report["missing"].append((where, reference, "not a /Game object path"))
+            continue
+        package, object_name = parsed
+        asset_name = package.rsplit("/", 1)[-1]
+        if kind == "object" and object_name != asset_name and not (object_name or "").startswith(asset_name + "-"):
+            report["missing"].append((where, reference, f"{asset_name} has no object {object_name}"))
+        elif package in content_index.packages:
+            report["resolved"] += 1
+        elif reference in game_references:
+            external.add(reference)
+        elif package in generated:
+            report["missing"].append((where, reference, "not built yet (run CreateMoreLilySkins.py)"))
+        else:
+            report["missing"].append((where, reference, "package not found"))
+    report["external"] = sorted(external)
+    return report
+
+
+def summary_lines(report, content_index, verbose=False):
+    lines = [f"References: {report['checked']} checked, {report['resolved']} resolved, "
+             f"{len(report['external'])} external (game assets), {len(report['missing'])} missing "
+             f"({len(content_index)} packages indexed, {content_index.listed} directories listed)"]
+    for reference in report["external"] if verbose else []:
+        lines.append(f"- External {reference}")
+    for where, reference, reason in report["missing"]:
+        lines.append(f"- {where}: {reference}: {reason}")
+    return lines
+
+
+def check_references(log=print, log_error=print, verbose=False):
+    """
+    Scan (skin catalog), plan and check every reference of the current tree; returns the report
+    Paths are read at call time: set_output_root may have redirected them.
+    """
+    from skin_catalog import load_catalog
+
+    start = time.perf_counter()
+    skins = load_catalog(skin_config.EXTEND_SKINS_ROOT, skin_config.CATALOG_PATH, skin_config.SCAN_INDEX_PATH, log_error,
+                         skin_config.ATLAS_CACHE_DIR)
+    aliases = None
+    if skin_config.DEDUPE_TEXTURES:
+        from texture_dedupe import TextureHashIndex, find_texture_aliases
+        hash_index = TextureHashIndex(skin_config.TEXTURE_HASH_INDEX_PATH)
+        aliases = find_texture_aliases(skins, hash_index, skin_config.DEDUPE_TOLERANCE,
+                                       atlas_cache_dir=skin_config.ATLAS_CACHE_DIR)
+        hash_index.save()
+    references, game_references, generated = collect_references(skins, aliases)
+
+    # The project's own assets stay in its Content/ when the build output is redirected
+    content_dirs = [os.path.join(skin_config.PROJ_DIR, "Content")]
+    if os.path.abspath(skin_config.CONTENT_DIR) != os.path.abspath(content_dirs[0]):
+        content_dirs.append(skin_config.CONTENT_DIR)
+    content_index = ContentIndex(content_dirs, skin_config.CONTENT_INDEX_PATH)
+    content_index.save()
+
+    report = validate_references(references, content_index, game_references, generated)
+    for line in summary_lines(report, content_index, verbose):
+        log(line)
+    log(f"Checked in {time.perf_counter() - start:.2f}s")
+    return report
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--output": None, "--skins": None}
+    while args:
+        arg = args.pop(0)
+        if arg in options and args:
+            options[arg] = args.pop(0)
+    if options["--output"]:
+        skin_config.set_output_root(os.path.abspath(options["--output"]),
+                                    os.path.abspath(options["--skins"]) if options["--skins"] else None)
+
+    def print_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    result = check_references(log_error=print_error, verbose=skin_config.VERBOSE_LOG)
+    sys.exit(1 if result["missing"] else 0)
@@ -0,0 +1,109 @@
+import os
+from collections import Counter
+
+"""
+Deferred package saving for CreateMoreLilySkins.py
+
+Pipeline stages do not save anything themselves. They mark the objects they
+changed with mark_dirty(obj, stage), and commit() writes every dirty package
+exactly once, in one save_loaded_assets call, at the end of the run. Work that
+must only happen once the packages are on disk (manifest entries, the row
+allocation) is queued with on_commit().
+
+If a stage fails, rollback() discards the in-memory changes instead: packages
+that already existed on disk are reloaded from their saved state, and packages
+created during the run are deleted, together with any file a stage wrote
+outside of commit() (add_created_file). Nothing of the failed run reaches the
+disk, so the chunk labels are never left half-updated.
+
+The editor module is passed in, so this file does not import `unreal` itself.
+"""
+
+
+class SaveCoordinator:
+    """Collects dirty packages during a run; commit() saves each once, rollback() discards them"""
+
+    def __init__(self, editor, package_on_disk):
+        """
+        editor: the `unreal` module (or a stand-in)
+        package_on_disk: callable(package_name) -> bool, whether the package has a saved .uasset
+        """
+        self.editor = editor
+        self.package_on_disk = package_on_disk
+        self.reset()
+
+    def reset(self):
+        """Start a new transaction (the state of the previous one is dropped)"""
+        self.dirty = {}            # package name -> [object, ...]
+        self.created = set()       # packages without a .uasset when they were first marked
+        self.created_files = []    # files stages wrote directly during the run (deleted by rollback)
+        self.requests = Counter()  # save requests per stage (one per package the stage touched)
+        self._requested = set()    # (stage, package)
+        self._on_commit = []
+
+    @staticmethod
+    def package_of(obj):
+        return obj.get_path_name().split(".")[0]
+
+    def mark_dirty(self, obj, stage):
+        """Record that `stage` changed `obj`; its package is written by commit()"""
+        if not obj:
+            return
+        package = self.package_of(obj)
+        if package not in self.dirty:
+            self.dirty[package] = []
+            if not self.package_on_disk(package):
+                self.created.add(package)
+        if obj not in self.dirty[package]:
+            self.dirty[package].append(obj)
+        if (stage, package) not in self._requested:
+            self._requested.add((stage, package))
+            self.requests[stage] += 1
+
+    def add_created_file(self, package, file_path):
+        """Record a package file a stage wrote itself (e.g. copied); rollback() deletes it and its package"""
+        self.created.add(package)
+        self.created_files.append(file_path)
+
+    def on_commit(self, callback, *args):
+        """Run callback(*args) after every dirty package has been saved"""
+        self._on_commit.append((callback, args))
+
+    @property
+    def avoided_writes(self):
+        """Package writes the per-stage saves would have done on top of the single pass"""
+        return max(0, sum(self.requests.values()) - len(self.dirty))
+
+    def commit(self):
+        """Save every dirty package in one call, then run the on_commit callbacks. Returns False if saving failed"""
+        objects = [obj for package in sorted(self.dirty) for obj in self.dirty[package]]
+        if objects and not self.editor.EditorAssetLibrary.save_loaded_assets(objects, False):
+            self.editor.log_error(f"Failed to save {len(self.dirty)} packages, the build manifest is not updated")
+            return False
+        for callback, args in self._on_commit:
+            callback(*args)
+        self._on_commit = []
+        return True
+
+    def rollback(self):
+        """Discard the in-memory changes of every dirty package; nothing is written to disk"""
+        asset_lib = self.editor.EditorAssetLibrary
+        for package in sorted(self.created):
+            for obj in self.dirty.get(package, []):
+                asset_lib.delete_loaded_asset(obj)
+        for file_path in self.created_files:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        existing = [self.dirty[package][0].get_outermost() for package in sorted(self.dirty) if package not in self.created]
+        if existing:
+            self.editor.EditorLoadingAndSavingUtils.reload_packages(
+                existing, self.editor.ReloadPackagesInteractionMode.ASSUME_POSITIVE)
+        self.editor.log_warning(f"Rolled back {len(existing)} modified and {len(self.created)} new packages")
+        self.reset()
+
+    def summary_lines(self, verbose=True):
+        lines = [f"Saved {len(self.dirty)} packages in one pass ({len(self.created)} new), "
+                 f"avoided {self.avoided_writes} package writes"]
+        for stage, count in sorted(self.requests.items()) if verbose else []:
+            lines.append(f"  {stage}: {count} save requests")
+        return lines
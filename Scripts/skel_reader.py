@@ -0,0 +1,345 @@
+"""
+Offline reader for Spine 3.8 binary skeletons (.skel)
+
+Parses only what the build needs: the header (hash, version), the string table
+and the skins with their attachments. Bones, slots and constraints are walked
+but not materialized; events and animations are never touched. The file is
+mapped with mmap and read through a memoryview, so nothing is copied except the
+strings that are kept.
+
+validate_skeleton checks the Spine version, that every DefaultSkins entry exists
+in the skeleton, and that every region/mesh attachment resolves to an atlas region.
+
+Usage outside the editor:
+    python skel_reader.py <file.skel> [<file.atlas>] [<DefaultSkins.json>]
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+import os
+import sys
+import mmap
+import json
+import struct
+
+SUPPORTED_VERSION_PREFIX = "3.8"
+
+# Attachment types (spine-cpp AttachmentType)
+ATTACHMENT_REGION = 0
+ATTACHMENT_BOUNDING_BOX = 1
+ATTACHMENT_MESH = 2
+ATTACHMENT_LINKED_MESH = 3
+ATTACHMENT_PATH = 4
+ATTACHMENT_POINT = 5
+ATTACHMENT_CLIPPING = 6
+
+# Attachment types whose path must be an atlas region
+TEXTURED_ATTACHMENTS = (ATTACHMENT_REGION, ATTACHMENT_MESH, ATTACHMENT_LINKED_MESH)
+
+
+class SkelFormatError(ValueError):
+    pass
+
+
+class SkeletonInfo:
+    """
+    - hash, version: header strings
+    - skins: { skin_name: [(slot_index, attachment_name, attachment_type, region_path), ...] }
+      the unnamed default skin is stored as "default"
+    """
+    __slots__ = ("hash", "version", "bone_count", "slot_count", "skins")
+
+    def __init__(self):
+        self.hash = ""
+        self.version = ""
+        self.bone_count = 0
+        self.slot_count = 0
+        self.skins = {}
+
+    def region_paths(self):
+        """All atlas region paths referenced by textured attachments: { path: [skin_name, ...] }"""
+        paths = {}
+        for skin_name, attachments in self.skins.items():
+            for slot_index, name, attachment_type, path in attachments:
+                if attachment_type in TEXTURED_ATTACHMENTS:
+                    paths.setdefault(path, []).append(skin_name)
+        return paths
+
+
+class _Reader:
+    """Big-endian cursor over a memoryview"""
+    __slots__ = ("buf", "pos", "strings")
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.pos = 0
+        self.strings = []
+
+    def _need(self, n):
+        if self.pos + n > len(self.buf):
+            raise SkelFormatError(f"Unexpected end of file at offset {self.pos}")
+
+    def byte(self):
+        self._need(1)
+        value = self.buf[self.pos]
+        self.pos += 1
+        return value
+
+    def boolean(self):
+        return self.byte() != 0
+
+    def skip(self, n):
+        self._need(n)
+        self.pos += n
+
+    def varint(self, optimize_positive=True):
+        result = 0
+        shift = 0
+        for _ in range(5):
+            b = self.byte()
+            result |= (b & 0x7F) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        if not optimize_positive:
+            result = (result >> 1) ^ -(result & 1)
+        return result
+
+    def string(self):
+        length = self.varint()
+        if length == 0:
+            return None
+        length -= 1
+        self._need(length)
+        value = bytes(self.buf[self.pos:self.pos + length]).decode("utf-8")
+        self.pos += length
+        return value
+
+    def string_ref(self):
+        index = self.varint()
+        if index == 0:
+            return None
+        if index > len(self.strings):
+            raise SkelFormatError(f"String reference {index} out of range at offset {self.pos}")
+        return self.strings[index - 1]
+
+    def skip_floats(self, n):
+        self.skip(4 * n)
+
+    def skip_varints(self, n):
+        for _ in range(n):
+            self.varint()
+
+    def skip_short_array(self):
+        self.skip(2 * self.varint())
+
+    def skip_vertices(self, vertex_count):
+        if not self.boolean():
+            self.skip_floats(vertex_count << 1)
+            return
+        # Weighted vertices: per vertex a bone count, then (bone index, x, y, weight) per bone
+        for _ in range(vertex_count):
+            for _ in range(self.varint()):
+                self.varint()
+                self.skip_floats(3)
+
+
+def _read_attachment(r, nonessential, attachment_name):
+    name = r.string_ref() or attachment_name
+    attachment_type = r.byte()
+    path = None
+    if attachment_type == ATTACHMENT_REGION:
+        path = r.string_ref()
+        r.skip_floats(7)  # rotation, x, y, scaleX, scaleY, width, height
+        r.skip(4)         # color
+    elif attachment_type == ATTACHMENT_BOUNDING_BOX:
+        r.skip_vertices(r.varint())
+        if nonessential: r.skip(4)
+    elif attachment_type == ATTACHMENT_MESH:
+        path = r.string_ref()
+        r.skip(4)         # color
+        vertex_count = r.varint()
+        r.skip_floats(vertex_count << 1)  # uvs
+        r.skip_short_array()              # triangles
+        r.skip_vertices(vertex_count)
+        r.varint()                        # hull length
+        if nonessential:
+            r.skip_short_array()          # edges
+            r.skip_floats(2)              # width, height
+    elif attachment_type == ATTACHMENT_LINKED_MESH:
+        path = r.string_ref()
+        r.skip(4)         # color
+        r.string_ref()    # skin
+        r.string_ref()    # parent
+        r.boolean()       # inherit deform
+        if nonessential: r.skip_floats(2)
+    elif attachment_type == ATTACHMENT_PATH:
+        r.skip(2)         # closed, constantSpeed
+        vertex_count = r.varint()
+        r.skip_vertices(vertex_count)
+        r.skip_floats(vertex_count // 3)  # lengths
+        if nonessential: r.skip(4)
+    elif attachment_type == ATTACHMENT_POINT:
+        r.skip_floats(3)
+        if nonessential: r.skip(4)
+    elif attachment_type == ATTACHMENT_CLIPPING:
+        r.varint()        # end slot
+        r.skip_vertices(r.varint())
+        if nonessential: r.skip(4)
+    else:
+        raise SkelFormatError(f"Unknown attachment type {attachment_type} for '{name}' at offset {r.pos}")
+    return name, attachment_type, path or name
+
+
+def _read_skin(r, nonessential, default_skin):
+    if default_skin:
+        slot_count = r.varint()
+        if slot_count == 0:
+            return None, []
+        skin_name = "default"
+    else:
+        skin_name = r.string_ref()
+        for _ in range(4):  # bones, ik, transform and path constraints
+            r.skip_varints(r.varint())
+        slot_count = r.varint()
+
+    attachments = []
+    for _ in range(slot_count):
+        slot_index = r.varint()
+        for _ in range(r.varint()):
+            attachment_name = r.string_ref()
+            name, attachment_type, path = _read_attachment(r, nonessential, attachment_name)
+            attachments.append((slot_index, name, attachment_type, path))
+    return skin_name, attachments
+
+
+def _read_skeleton(buf):
+    r = _Reader(buf)
+    info = SkeletonInfo()
+    info.hash = r.string() or ""
+    info.version = r.string() or ""
+    if not info.version.startswith(SUPPORTED_VERSION_PREFIX):
+        # The layout below is only valid for 3.8 exports, stop at the header
+        return info
+    r.skip_floats(4)  # x, y, width, height
+    nonessential = r.boolean()
+    if nonessential:
+        r.skip_floats(1)  # fps
+        r.string()        # images path
+        r.string()        # audio path
+
+    r.strings = [r.string() for _ in range(r.varint())]
+
+    # Bones
+    info.bone_count = r.varint()
+    for i in range(info.bone_count):
+        r.string()
+        if i > 0: r.varint()
+        r.skip_floats(8)  # rotation, x, y, scaleX, scaleY, shearX, shearY, length
+        r.varint()        # transform mode
+        r.boolean()       # skin required
+        if nonessential: r.skip(4)
+
+    # Slots
+    info.slot_count = r.varint()
+    for _ in range(info.slot_count):
+        r.string()
+        r.varint()        # bone
+        r.skip(8)         # color, dark color
+        r.string_ref()    # attachment
+        r.varint()        # blend mode
+
+    # IK constraints
+    for _ in range(r.varint()):
+        r.string(); r.varint(); r.boolean()
+        r.skip_varints(r.varint())
+        r.varint()
+        r.skip_floats(2)  # mix, softness
+        r.skip(4)         # bend direction, compress, stretch, uniform
+
+    # Transform constraints
+    for _ in range(r.varint()):
+        r.string(); r.varint(); r.boolean()
+        r.skip_varints(r.varint())
+        r.varint()
+        r.skip(2)         # local, relative
+        r.skip_floats(10) # offsets (6) + mixes (4)
+
+    # Path constraints
+    for _ in range(r.varint()):
+        r.string(); r.varint(); r.boolean()
+        r.skip_varints(r.varint())
+        r.varint()
+        r.skip_varints(3) # position, spacing and rotate modes
+        r.skip_floats(5)
+
+    # Skins (default skin first)
+    name, attachments = _read_skin(r, nonessential, True)
+    if name:
+        info.skins[name] = attachments
+    for _ in range(r.varint()):
+        name, attachments = _read_skin(r, nonessential, False)
+        info.skins[name] = attachments
+    return info
+
+
+def read_skeleton(skel_path):
+    """Read the header and skin table of a .skel file through a zero-copy view of an mmap"""
+    with open(skel_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SkelFormatError("Empty skeleton file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _read_skeleton(view)
+            finally:
+                view.release()
+
+
+def validate_skeleton(skeleton, atlas=None, default_skins=None):
+    """
+    Check a SkeletonInfo against the atlas region index and the DefaultSkins list
+    Returns: list of error strings (empty if valid)
+    """
+    if not skeleton.version.startswith(SUPPORTED_VERSION_PREFIX):
+        return [f"Unsupported Spine version {skeleton.version or '(none)'}, expected {SUPPORTED_VERSION_PREFIX}.x"]
+
+    errors = []
+    for skin_name in default_skins or []:
+        if skin_name not in skeleton.skins:
+            errors.append(f"DefaultSkins entry '{skin_name}' is not a skin of the skeleton")
+
+    if atlas is not None:
+        for path, skins in sorted(skeleton.region_paths().items()):
+            if path not in atlas:
+                errors.append(f"Attachment region '{path}' (skin {skins[0]}) missing from atlas")
+    return errors
+
+
+def load_default_skins(json_path, base_name):
+    """Effective DefaultSkins: DefaultSkins.json if present, otherwise the C++ factory default"""
+    if json_path and os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if "DefaultSkins" in config:
+            return list(config["DefaultSkins"])
+    return ["_common", base_name, "_Meat_Head_0"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    skeleton = read_skeleton(sys.argv[1])
+    atlas = None
+    if len(sys.argv) > 2:
+        from atlas_parser import load_atlas
+        atlas = load_atlas(sys.argv[2])
+    default_skins = load_default_skins(sys.argv[3], "") if len(sys.argv) > 3 else None
+    print(f"Spine {skeleton.version}, {skeleton.bone_count} bones, {skeleton.slot_count} slots")
+    for skin_name, attachments in skeleton.skins.items():
+        print(f"- {skin_name}: {len(attachments)} attachments")
+    errors = validate_skeleton(skeleton, atlas, default_skins)
+    for err in errors:
+        print(f"[FAIL] {err}")
+    sys.exit(1 if errors else 0)
@@ -0,0 +1,275 @@
+import os
+import re
+import sys
+import json
+
+from skin_config import EXTEND_SKINS_ROOT, CATALOG_PATH, SCAN_INDEX_PATH, ATLAS_CACHE_DIR, CHARACTERS_PATH
+from build_manifest import hash_value
+
+"""
+Skin catalog: every skin texture of ExtendSkins as one record
+
+The scan result (skin_scanner.scan_extend_skins) is turned into SkinCatalog records
+(id, kind, base folder, variant, source files, content path, size) with indexes by
+skin id, texture name and content path, so the build stages look skins up instead
+of re-deriving ids and paths from file names. Skin names are parsed in one place
+(parse_skin_name); ids have at least 4 digits and may have more (p12345_Lily).
+Every stage of a build (deep validation, dedupe, repack, tiers, import planning,
+DataTable, data asset, chunk labels, SkinIndex.lua) works on the one catalog of
+the run; the repack and tier stages point its records at the files they write.
+
+The catalog is saved to Saved/CreateMoreLilySkins/skin_catalog.json together with a
+fingerprint of the ExtendSkins listing (file names, sizes, mtimes). load_catalog
+returns the saved catalog while the listing is unchanged, without validating the
+folders again (the validation errors of the scan are kept and reported again), so
+a re-run or the final pass of a sharded build starts from it instantly.
+
+Usage outside the editor:
+    python skin_catalog.py [--json]    print the catalog of ExtendSkins
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+CATALOG_VERSION = 1
+
+# p0007_Lily, p0007_2_Lily, p12345_Lily (.png optional); ids are written with at least 4 digits
+SKIN_NAME_PATTERN = re.compile(r"^p(\d{4,})(?:_(\d+))?_Lily(?:\.png)?$")
+
+
+def parse_skin_name(name):
+    """
+    "p0007_Lily" / "p0007_2_Lily.png" -> (skin id, variant number; 0 for the base), or None
+    Ids with superfluous leading zeros (p00007_Lily) are not skin names: every id has one spelling.
+    """
+    match = SKIN_NAME_PATTERN.match(name)
+    if not match:
+        return None
+    sid = int(match.group(1))
+    if match.group(1) != f"{sid:04d}":
+        return None
+    return sid, int(match.group(2)) if match.group(2) else 0
+
+
+def parse_skin_key(key):
+    """"p0007" -> 7, or None"""
+    parsed = parse_skin_name(key + "_Lily")
+    return parsed[0] if parsed and not parsed[1] else None
+
+
+def skin_key(sid):
+    """7 -> "p0007" (the key of SkinIndex.lua and the chunk manifest)"""
+    return f"p{sid:04d}"
+
+
+def base_skin_name(sid):
+    """7 -> "p0007_Lily" (folder, base texture and spine asset name)"""
+    return f"{skin_key(sid)}_Lily"
+
+
+def texture_name(sid, variant=0):
+    """(7, 2) -> "p0007_2_Lily", (7, 0) -> "p0007_Lily" """
+    return f"{skin_key(sid)}_{variant}_Lily" if variant else base_skin_name(sid)
+
+
+def texture_object_path(sid, variant=0):
+    """Texture object path in the base skin folder: pXXXX_Lily/Textures/pXXXX_[y_]Lily"""
+    name = texture_name(sid, variant)
+    return f"{CHARACTERS_PATH}/{base_skin_name(sid)}/Textures/{name}.{name}"
+
+
+class SkinRecord:
+    """
+    One skin texture
+    - kind: "simple" (extension of a game skin 1-6), "advanced" (base of a skin 7+) or "extension" (of an advanced skin)
+    - source: PNG path; atlas/skel: spine sources of an advanced base, else None
+    - content: texture object path of the imported asset
+    The build stages that write derived files (atlas_repack, texture_tiers) point source/atlas/skel
+    and w/h of the records at them in place; later stages import whatever the record points at.
+    """
+    __slots__ = ("id", "kind", "base", "variant", "name", "source", "atlas", "skel", "content", "w", "h")
+
+    def __init__(self, sid, kind, variant, source, atlas=None, skel=None, w=0, h=0):
+        self.id = sid
+        self.kind = kind
+        self.base = base_skin_name(sid)
+        self.variant = variant
+        self.name = texture_name(sid, variant)
+        self.source = source
+        self.atlas = atlas
+        self.skel = skel
+        self.content = texture_object_path(sid, variant)
+        self.w = w
+        self.h = h
+
+    @property
+    def png(self):
+        """File name of the texture in its ExtendSkins folder, p0007_2_Lily.png"""
+        return self.name + ".png"
+
+    def to_list(self):
+        return [self.id, self.kind, self.variant, self.source, self.atlas, self.skel, self.w, self.h]
+
+
+class SkinCatalog:
+    """
+    Every skin texture that passed validation, in scan order (simple extensions by folder,
+    then every advanced base followed by its extensions)
+    - by_id: { skin id: [records of the skin, in scan order] }
+    - by_name: { texture name: record }
+    - by_content: { texture object path: record }
+    - errors: validation messages of the scan the catalog was built from
+    - listing: fingerprint of the ExtendSkins listing it was built from
+    The build stages share one catalog (or subsets of it, which share its records) and look
+    skins up through the indexes.
+    """
+    __slots__ = ("records", "by_id", "by_name", "by_content", "errors", "listing")
+
+    def __init__(self, errors=(), listing=None):
+        self.records = []
+        self.by_id = {}
+        self.by_name = {}
+        self.by_content = {}
+        self.errors = list(errors)
+        self.listing = listing
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def add(self, record):
+        self.records.append(record)
+        self.by_id.setdefault(record.id, []).append(record)
+        self.by_name[record.name] = record
+        self.by_content[record.content] = record
+
+    def of_kind(self, kind):
+        """Records of one kind ("simple", "advanced", "extension"), in scan order"""
+        return [record for record in self.records if record.kind == kind]
+
+    def advanced_ids(self):
+        """Ids of the advanced skins, sorted"""
+        return sorted(sid for sid, records in self.by_id.items() if records[0].kind == "advanced")
+
+    def base_record(self, sid):
+        """Advanced base record of a skin id, or None for a simple skin"""
+        record = self.by_name.get(base_skin_name(sid))
+        return record if record is not None and record.kind == "advanced" else None
+
+    def extensions(self, sid):
+        """Extension records of an advanced skin, in scan order"""
+        return [record for record in self.by_id.get(sid, ()) if record.kind == "extension"]
+
+    def subset(self, records):
+        """Catalog of some of the records (the same record objects, in the given order)"""
+        catalog = SkinCatalog()
+        for record in records:
+            catalog.add(record)
+        return catalog
+
+    def remove(self, records):
+        """Drop records in place (the indexes are rebuilt)"""
+        dropped = set(records)
+        kept = [record for record in self.records if record not in dropped]
+        self.records, self.by_id, self.by_name, self.by_content = [], {}, {}, {}
+        for record in kept:
+            self.add(record)
+
+    @classmethod
+    def from_scan(cls, simple_exts, adv_bases, adv_exts, errors=(), listing=None, root=EXTEND_SKINS_ROOT):
+        """Catalog of a skin_scanner.scan_extend_skins result"""
+        catalog = cls(errors, listing)
+        for folder, png_list in simple_exts.items():
+            for png in png_list:
+                sid, variant = parse_skin_name(png)
+                catalog.add(SkinRecord(sid, "simple", variant, os.path.join(root, folder, png), w=1024, h=256))
+        for sid, info in adv_bases.items():
+            catalog.add(SkinRecord(sid, "advanced", 0, info['png'], info['atlas'], info['skel'], info['w'], info['h']))
+            folder = os.path.dirname(info['png'])
+            for png in adv_exts.get(info['name'], []):
+                catalog.add(SkinRecord(sid, "extension", parse_skin_name(png)[1], os.path.join(folder, png),
+                                       w=info['w'], h=info['h']))
+        return catalog
+
+    def to_dict(self):
+        return {"version": CATALOG_VERSION, "listing": self.listing, "errors": self.errors,
+                "records": [record.to_list() for record in self.records]}
+
+    @classmethod
+    def from_dict(cls, data):
+        catalog = cls(data.get("errors", ()), data.get("listing"))
+        for sid, kind, variant, source, atlas, skel, w, h in data["records"]:
+            catalog.add(SkinRecord(sid, kind, variant, source, atlas, skel, w, h))
+        return catalog
+
+    def save(self, path=CATALOG_PATH):
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        """Saved catalog, or None if there is none (or it was written by another version)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls.from_dict(data) if data.get("version") == CATALOG_VERSION else None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+def listing_fingerprint(root, folders):
+    """Fingerprint of a skin_scanner.list_skin_folders result: every file name, size and mtime"""
+    return hash_value([os.path.abspath(root), CATALOG_VERSION,
+                       [[name, sorted([file_name, size, mtime] for file_name, (size, mtime) in files.items())]
+                        for name, _, _, files in folders]])
+
+
+def load_catalog(root=EXTEND_SKINS_ROOT, catalog_path=CATALOG_PATH, index_path=SCAN_INDEX_PATH, log_error=print,
+                 atlas_cache_dir=ATLAS_CACHE_DIR):
+    """
+    Catalog of ExtendSkins: the saved one while the folder listing is unchanged, else a new scan (saved)
+    Validation errors are reported through `log_error` either way.
+    """
+    from skin_scanner import list_skin_folders, scan_extend_skins
+
+    if not os.path.isdir(root):
+        log_error("Missing dir: " + root)
+        return SkinCatalog()
+    folders = list_skin_folders(root)
+    listing = listing_fingerprint(root, folders)
+    catalog = SkinCatalog.load(catalog_path) if catalog_path else None
+    if catalog is not None and catalog.listing == listing:
+        for message in catalog.errors:
+            log_error(message)
+        return catalog
+
+    errors = []
+
+    def collect_error(message):
+        errors.append(message)
+        log_error(message)
+
+    scan = scan_extend_skins(root, index_path, log_error=collect_error, atlas_cache_dir=atlas_cache_dir, folders=folders)
+    catalog = SkinCatalog.from_scan(*scan, errors=errors, listing=listing, root=root)
+    catalog.save(catalog_path)
+    return catalog
+
+
+if __name__ == "__main__":
+    def print_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    skins = load_catalog(log_error=print_error)
+    if "--json" in sys.argv:
+        print(json.dumps(skins.to_dict(), indent=1))
+    else:
+        for skin_id, skin_records in sorted(skins.by_id.items()):
+            print(f"{skin_key(skin_id)}: " + ", ".join(f"{record.name} ({record.kind}, {record.w}x{record.h})"
+                                                       for record in skin_records))
+        print(f"{len(skins.by_id)} skins, {len(skins)} textures")
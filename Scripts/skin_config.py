@@ -0,0 +1,169 @@
+import os
+import sys
+
+"""
+Build configuration shared by CreateMoreLilySkins.py and its editor-free helpers
+
+Command line flags (passed to the script, e.g. -script="CreateMoreLilySkins.py --force"):
+    --force          ignore the build manifest and rebuild everything
+    --deep-validate  check CRCs and decode every PNG before anything is imported
+    --soft-refs      keep ExtendSkinAssets free of hard references
+    --verbose        log every asset in the per-asset loops (off by default)
+    --watch          after the build, keep the editor open and rebuild whenever ExtendSkins changes
+    --shard <file>   worker mode: only import the operations of a shard written by build_scheduler.py
+    --pipeline       prepare skin folders on worker threads while the editor imports the previous ones
+    --batch-size <n> import tasks per batch; references are released and garbage collected between batches
+    --chunk-budget <mb>  split the skins into chunks (paks) of at most mb each; 0 (default) keeps them in the core chunk
+    --dedupe         import pixel-identical textures of a skin once and alias the duplicates
+    --dedupe-tolerance <n>  (implies --dedupe) also alias textures whose channels differ by at most n
+    --repack         repack advanced skin textures into the tightest sheet their atlas regions fit
+    --repack-pot     (implies --repack) repack into power-of-two sheets
+    --texture-tier <n>  import every skin texture scaled down by n (2: half, 4: quarter size), see texture_tiers.py
+"""
+
+# --- Configuration Paths ---
+PROJ_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CONTENT_DIR = os.path.join(PROJ_DIR, "Content")
+EXTEND_SKINS_ROOT = os.path.join(PROJ_DIR, "ExtendSkins")
+CSV_PATH = os.path.join(PROJ_DIR, "DT_SpineData_p0000.csv")
+BUILD_CACHE_DIR = os.path.join(PROJ_DIR, "Saved", "CreateMoreLilySkins")
+MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, "build_manifest.json")
+SCAN_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "scan_index.json")
+ATLAS_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "atlas")
+ROW_ALLOCATION_PATH = os.path.join(BUILD_CACHE_DIR, "row_allocation.json")
+# Skin id -> chunk (pak) of the last build, see chunk_planner.py
+CHUNK_MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, "chunk_manifest.json")
+# Validated skins of the last scan, see skin_catalog.py
+CATALOG_PATH = os.path.join(BUILD_CACHE_DIR, "skin_catalog.json")
+# Package listing of Content/ by directory mtime, see reference_validator.py
+CONTENT_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "content_index.json")
+# Pixel hashes of the skin PNGs, see texture_dedupe.py
+TEXTURE_HASH_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "texture_hashes.json")
+# Repacked advanced skins (texture, extensions, atlas, skel), see atlas_repack.py
+REPACK_DIR = os.path.join(BUILD_CACHE_DIR, "repacked")
+# Downscaled texture tiers (x2/, x4/, ...), see texture_tiers.py
+TIERS_DIR = os.path.join(BUILD_CACHE_DIR, "tiers")
+# Chrome trace / Perfetto JSON of the last run
+TRACE_PATH = os.path.join(BUILD_CACHE_DIR, "trace.json")
+
+# Precomputed skin table loaded by the SwitchSkinMod Lua script
+SKIN_INDEX_LUA_PATH = os.path.join(PROJ_DIR, "UE4SS_For_More_Skins_Mod", "Mods", "SwitchSkinMod", "Scripts", "SkinIndex.lua")
+
+# --- Flags ---
+FORCE_REBUILD = "--force" in sys.argv
+DEEP_VALIDATE_PNG = "--deep-validate" in sys.argv
+SOFT_REFERENCE_LAYOUT = "--soft-refs" in sys.argv
+VERBOSE_LOG = "--verbose" in sys.argv
+WATCH_MODE = "--watch" in sys.argv
+SHARD_PATH = sys.argv[sys.argv.index("--shard") + 1] if "--shard" in sys.argv[:-1] else None
+PIPELINE_MODE = "--pipeline" in sys.argv
+# Largest per-channel difference at which two textures still count as duplicates (0: identical pixels only)
+DEDUPE_TOLERANCE = int(sys.argv[sys.argv.index("--dedupe-tolerance") + 1]) if "--dedupe-tolerance" in sys.argv[:-1] else 0
+DEDUPE_TEXTURES = "--dedupe" in sys.argv or DEDUPE_TOLERANCE > 0
+REPACK_POWER_OF_TWO = "--repack-pot" in sys.argv
+REPACK_ATLASES = "--repack" in sys.argv or REPACK_POWER_OF_TWO
+# Texture downscale factor of this build (1: source resolution)
+TEXTURE_TIER = max(1, int(sys.argv[sys.argv.index("--texture-tier") + 1])) if "--texture-tier" in sys.argv[:-1] else 1
+
+# --- Watch mode ---
+# Quiet time after the last write before a rebuild starts (image editors write in bursts), in seconds
+WATCH_DEBOUNCE = 0.5
+# Scan interval where inotify is not available (Windows), in seconds
+WATCH_POLL_INTERVAL = 1.0
+
+# --- Sharded builds (build_scheduler.py) ---
+# Headless editor workers importing in parallel (each one is a full editor process, mind the RAM)
+SHARD_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+# Shard files, worker results and logs
+SHARD_DIR = os.path.join(BUILD_CACHE_DIR, "shards")
+
+# --- Pipelined builds (--pipeline) ---
+# Threads preparing skin folders (deep validation, hashing, import planning) next to the editor
+PIPELINE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+# Prepared folders waiting for the editor at most (caps the memory the workers can run ahead with)
+PIPELINE_QUEUE_SIZE = 16
+# Simple extension PNGs per unit (every advanced skin folder is one unit)
+PIPELINE_SIMPLE_CHUNK = 16
+
+# --- Import settings ---
+# Maximum number of tasks submitted to one import_asset_tasks call (--batch-size); after every batch
+# the script drops its references and collects garbage, so this bounds what one batch adds to the
+# editor's working set (see the "Editor memory" summary of a run)
+IMPORT_BATCH_SIZE = int(sys.argv[sys.argv.index("--batch-size") + 1]) if "--batch-size" in sys.argv[:-1] else 64
+# Collect garbage between import batches and after the stages that load assets only to reference them
+RELEASE_MEMORY_BETWEEN_BATCHES = True
+
+# Settings applied to every imported texture (also part of the manifest fingerprint)
+TEXTURE_IMPORT_SETTINGS = {
+    "mip_gen_settings": "TMGS_NO_MIPMAPS",
+    "lod_group": "TEXTUREGROUP_CHARACTER",
+}
+
+# Maximum time to wait for the asset registry after a targeted rescan, in seconds
+REGISTRY_WAIT_TIMEOUT = 30.0
+
+# Transparent texels between repacked regions (keeps linear filtering from bleeding into neighbours)
+REPACK_PADDING = 2
+
+# Resident size estimate for imported skin textures (DXT5, no mips)
+RESIDENT_BYTES_PER_TEXEL = 1
+
+# --- Generated assets ---
+CHARACTERS_PATH = "/Game/_Zenith/Characters"
+DT_PATH = "/Game/_Zenith/Gameplay/Data/DT_SpineData_p0000"
+DT_COLUMNS = ["Notify", "Atlas", "Skeleton", "LightMaterial"]
+ROW_STRUCT_PATH = "/Game/_Zenith/Gameplay/Structures/FSpineDataGroup"
+EXTEND_SKIN_ASSETS_PATH = "/Game/Mods/EnderLilies_More_Skins_Mod/ExtendSkinAssets"
+MOD_ASSETS = [
+    "/Game/Mods/EnderLilies_More_Skins_Mod/BP_ExtendSkinAssets",
+    "/Game/Mods/EnderLilies_More_Skins_Mod/ExtendSkinAssets",
+    "/Game/Mods/EnderLilies_More_Skins_Mod/ModActor"
+]
+CHUNK2_LABEL_PATH = "/Game/Chunk2"
+CHUNK3_LABEL_PATH = "/Game/Chunk3"
+
+# --- Chunks (paks) ---
+# Chunk2 is the core chunk: the mod assets every player needs (EnderLilies_More_Skins_Mod.pak)
+CORE_CHUNK_ID = 2
+CORE_PAK_NAME = "EnderLilies_More_Skins_Mod"
+# Skins are packed into chunks of at most this many (estimated cooked) bytes (--chunk-budget, in MB).
+# Each base skin stays in one chunk with its extensions; 0 (the default) puts every skin into the core chunk,
+# the layout of a build without chunking. Split only together with --soft-refs: hard references in
+# ExtendSkinAssets make every chunk required anyway.
+SKIN_CHUNK_BUDGET = int(float(sys.argv[sys.argv.index("--chunk-budget") + 1]) * 1048576) if "--chunk-budget" in sys.argv[:-1] else 0
+# Chunks 1, 3 and 4 are taken by the project's own labels (Content/Chunk1, Chunk3, Chunk4)
+SKIN_CHUNK_FIRST_ID = 5
+SKIN_CHUNK_LABEL_PATH = "/Game/Chunk{chunk_id}"
+# Name copy.bat gives pakchunkN-WindowsNoEditor.pak/.ucas/.utoc of a skin chunk
+SKIN_CHUNK_PAK_NAME = "EnderLilies_More_Skins_Mod_Chunk{chunk_id}_0_P"
+
+# Rows 1-11 are the original game skins; advanced skins start here
+FIRST_ADVANCED_ROW = 12
+
+
+def set_output_root(root, extend_skins_root=None):
+    """
+    Redirect everything the build writes (Content, Saved cache, SkinIndex.lua) below `root`
+    and optionally read the skins from another ExtendSkins folder.
+    Used for runs against the fake `unreal` module so the real project is left untouched.
+    Must be called before CreateMoreLilySkins.py and skin_plan are imported.
+    """
+    global EXTEND_SKINS_ROOT, CONTENT_DIR, BUILD_CACHE_DIR, MANIFEST_PATH, SCAN_INDEX_PATH, ATLAS_CACHE_DIR
+    global ROW_ALLOCATION_PATH, CHUNK_MANIFEST_PATH, CATALOG_PATH, CONTENT_INDEX_PATH, TEXTURE_HASH_INDEX_PATH, REPACK_DIR, TIERS_DIR, TRACE_PATH, SHARD_DIR, SKIN_INDEX_LUA_PATH
+    CONTENT_DIR = os.path.join(root, "Content")
+    BUILD_CACHE_DIR = os.path.join(root, "Saved", "CreateMoreLilySkins")
+    MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, "build_manifest.json")
+    SCAN_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "scan_index.json")
+    ATLAS_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "atlas")
+    ROW_ALLOCATION_PATH = os.path.join(BUILD_CACHE_DIR, "row_allocation.json")
+    CHUNK_MANIFEST_PATH = os.path.join(BUILD_CACHE_DIR, "chunk_manifest.json")
+    CATALOG_PATH = os.path.join(BUILD_CACHE_DIR, "skin_catalog.json")
+    CONTENT_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "content_index.json")
+    TEXTURE_HASH_INDEX_PATH = os.path.join(BUILD_CACHE_DIR, "texture_hashes.json")
+    REPACK_DIR = os.path.join(BUILD_CACHE_DIR, "repacked")
+    TIERS_DIR = os.path.join(BUILD_CACHE_DIR, "tiers")
+    TRACE_PATH = os.path.join(BUILD_CACHE_DIR, "trace.json")
+    SHARD_DIR = os.path.join(BUILD_CACHE_DIR, "shards")
+    SKIN_INDEX_LUA_PATH = os.path.join(root, "SkinIndex.lua")
+    if extend_skins_root:
+        EXTEND_SKINS_ROOT = extend_skins_root
@@ -0,0 +1,187 @@
+import os
+import json
+import queue
+import threading
+from contextlib import nullcontext
+
+from skin_config import EXTEND_SKINS_ROOT
+from png_validator import reject_corrupt_pngs
+from skin_plan import BuildPlan, plan_imports
+from texture_dedupe import find_texture_aliases
+from atlas_repack import repack_advanced_skins
+from texture_tiers import generate_tiers, use_tier
+from skin_catalog import SkinCatalog
+
+"""
+Host-side half of the pipelined build (CreateMoreLilySkins.py --pipeline)
+
+The skin catalog of the build is split into units: one advanced skin folder (base,
+spine, extensions) or a chunk of simple extension PNGs. Worker threads prepare unit
+after unit (deep PNG validation, DefaultSkins.json check, duplicate texture search,
+atlas repacking, texture tier generation, input hashing, import planning) and hand them to the editor thread through a bounded queue, so the
+editor imports unit N while unit N+1 is prepared and no more than `queue_size`
+prepared units wait in memory.
+
+A unit whose preparation fails carries its error instead of a plan; the editor
+side logs it and builds everything else. Duplicate textures (--dedupe) are only
+found within a unit, so a simple skin with more PNGs than one chunk may keep a few.
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+
+class PreparedUnit:
+    __slots__ = ("index", "unit", "plan", "spine_fingerprints", "aliases", "repack_reports", "tier_errors", "rejected", "error")
+
+    def __init__(self, index, unit):
+        self.index = index
+        self.unit = unit
+        self.plan = None
+        self.spine_fingerprints = []
+        self.aliases = {}
+        self.repack_reports = []  # atlas_repack reports of the unit's advanced skin
+        self.tier_errors = []  # textures of the unit texture_tiers could not downscale
+        self.rejected = []  # "Corrupt PNG rejected: ..." messages
+        self.error = None
+
+    @property
+    def label(self):
+        return ", ".join(dict.fromkeys(record.base for record in self.unit))
+
+
+def split_units(catalog, simple_chunk=16):
+    """
+    skin_catalog.SkinCatalog -> [SkinCatalog, ...] units, subsets sharing the catalog's records
+    Advanced skins form one unit per folder; simple extensions are cut into chunks of `simple_chunk` PNGs.
+    """
+    units = []
+    for sid, records in catalog.by_id.items():
+        if catalog.base_record(sid) is not None:
+            units.append(catalog.subset(records))
+            continue
+        for start in range(0, len(records), simple_chunk):
+            units.append(catalog.subset(records[start:start + simple_chunk]))
+    return units
+
+
+def merge_units(prepared_units):
+    """Catalog of the units that were prepared successfully (original order), with the records as the workers left them"""
+    merged = SkinCatalog()
+    for prepared in sorted(prepared_units, key=lambda p: p.index):
+        if not prepared.error:
+            for record in prepared.unit:
+                merged.add(record)
+    return merged
+
+
+def check_default_skins(json_path):
+    """Raise ValueError if DefaultSkins.json would not apply (bad JSON, not a list of layer names)"""
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Unreadable {json_path}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"{json_path} must contain a JSON object")
+    layers = config.get("DefaultSkins", [])
+    if not (isinstance(layers, list) and all(isinstance(layer, str) for layer in layers)):
+        raise ValueError(f"DefaultSkins in {json_path} must be a list of skin names")
+
+
+def prepare_unit(prepared, manifest, deep_validate=False, hash_index=None, dedupe_tolerance=0, repack=False,
+                texture_tier=1):
+    """
+    Host-side work for one unit, filled into `prepared`
+    Corrupt PNGs are dropped from the unit (a corrupt advanced base drops the folder), like
+    --deep-validate does for the whole tree. With a texture_dedupe.TextureHashIndex the unit's
+    duplicate textures become aliases; with `repack` its advanced skin is imported from the
+    atlas_repack output, with a `texture_tier` above 1 from that texture tier. Raises ValueError for a folder that cannot be built.
+    """
+    unit = prepared.unit
+    if deep_validate:
+        reject_corrupt_pngs(unit, prepared.rejected.append, max_workers=1)
+    for record in unit.of_kind("advanced"):
+        json_path = os.path.join(EXTEND_SKINS_ROOT, record.base, "DefaultSkins.json")
+        if os.path.exists(json_path):
+            check_default_skins(json_path)
+    if hash_index is not None:
+        prepared.aliases = find_texture_aliases(unit, hash_index, dedupe_tolerance, max_workers=1)
+    if repack and unit.advanced_ids():
+        prepared.repack_reports = repack_advanced_skins(unit, max_workers=1)
+    if texture_tier > 1:
+        prepared.tier_errors = generate_tiers(unit, [texture_tier], max_workers=1)[texture_tier]["errors"]
+        use_tier(unit, texture_tier)
+    prepared.plan = BuildPlan()
+    prepared.spine_fingerprints = plan_imports(prepared.plan, unit, manifest, prepared.aliases)
+    return prepared
+
+
+class UnitPipeline:
+    """
+    Prepares units on `workers` threads; iterate to receive them in completion order
+    The output queue holds at most `queue_size` prepared units, so the workers wait when the
+    editor falls behind. With a build_trace.Tracer every preparation is recorded as a span on
+    its worker thread; with a texture_dedupe.TextureHashIndex the workers look for duplicate textures,
+    with `repack` they repack the advanced skin textures (atlas_repack), with a `texture_tier`
+    above 1 they downscale the textures (texture_tiers).
+    """
+
+    def __init__(self, units, manifest, deep_validate=False, workers=4, queue_size=16, tracer=None,
+                 hash_index=None, dedupe_tolerance=0, repack=False, texture_tier=1):
+        self.manifest = manifest
+        self.deep_validate = deep_validate
+        self.hash_index = hash_index
+        self.dedupe_tolerance = dedupe_tolerance
+        self.repack = repack
+        self.texture_tier = texture_tier
+        self.tracer = tracer
+        self.prepared = []
+        self._todo = queue.Queue()
+        for index, unit in enumerate(units):
+            self._todo.put(PreparedUnit(index, unit))
+        self._done = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._work, name=f"skin-prep-{i}", daemon=True)
+                         for i in range(max(1, min(workers, len(units))))]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                prepared = self._todo.get_nowait()
+            except queue.Empty:
+                break
+            span = self.tracer.span("prepare_unit", "prepare", unit=prepared.label) if self.tracer else nullcontext()
+            try:
+                with span:
+                    prepare_unit(prepared, self.manifest, self.deep_validate, self.hash_index, self.dedupe_tolerance,
+                                 self.repack, self.texture_tier)
+            except Exception as e:
+                # Isolated: only this unit is left out of the build
+                prepared.error = f"{type(e).__name__}: {e}" if not isinstance(e, ValueError) else str(e)
+            self._done.put(prepared)
+        self._done.put(None)
+
+    def ready(self):
+        """Number of prepared units waiting for the editor"""
+        return self._done.qsize()
+
+    def __iter__(self):
+        finished = 0
+        while finished < len(self._threads):
+            prepared = self._done.get()
+            if prepared is None:
+                finished += 1
+                continue
+            self.prepared.append(prepared)
+            yield prepared
+
+    def close(self):
+        """Stop the workers early (the editor side failed); pending units are dropped"""
+        self._stop.set()
+        while any(thread.is_alive() for thread in self._threads):
+            try:
+                self._done.get(timeout=0.05)
+            except queue.Empty:
+                pass
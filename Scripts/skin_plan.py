@@ -0,0 +1,535 @@
+import os
+import io
+import re
+import csv
+import sys
+import json
+
+from skin_config import (
+    EXTEND_SKINS_ROOT, CONTENT_DIR, CSV_PATH, BUILD_CACHE_DIR, MANIFEST_PATH,
+    ROW_ALLOCATION_PATH, SKIN_INDEX_LUA_PATH, FORCE_REBUILD, SOFT_REFERENCE_LAYOUT, DEDUPE_TEXTURES, REPACK_ATLASES, TEXTURE_TIER, TEXTURE_IMPORT_SETTINGS,
+    RESIDENT_BYTES_PER_TEXEL, CHARACTERS_PATH, DT_PATH, DT_COLUMNS, EXTEND_SKIN_ASSETS_PATH, MOD_ASSETS,
+    CHUNK2_LABEL_PATH, CHUNK3_LABEL_PATH, CORE_CHUNK_ID, SKIN_CHUNK_LABEL_PATH, FIRST_ADVANCED_ROW,
+)
+from build_manifest import BuildManifest
+from skin_catalog import skin_key, base_skin_name
+from chunk_planner import SIMPLE_TEXTURE_TEXELS, estimate_skin_bytes, allocate_chunks, build_chunk_manifest, load_chunk_allocation, save_chunk_manifest, pak_name
+
+"""
+Editor-free build planner for CreateMoreLilySkins.py
+
+build_plan turns the validate_structure output into an explicit BuildPlan:
+the import tasks to run, the DataTable rows, the ExtendSkinAssets arrays and the
+chunk label contents, each only when the build manifest says it is out of date.
+CreateMoreLilySkins.execute_plan applies a plan through the `unreal` module (the
+real one, or fake_unreal for runs outside the editor).
+
+Usage outside the editor:
+    python skin_plan.py [--json] [--check] [--force] [--soft-refs] [--dedupe]
+    --json   print the whole plan as JSON instead of a summary
+    --check  exit with code 1 if the plan needs the editor (so it is only opened when there is work);
+             an outdated SkinIndex.lua alone does not need it and is written directly
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+
+def asset_file_path(asset_path):
+    """Map a /Game/... package path to its .uasset file on disk"""
+    package_path = asset_path.split(".")[0]
+    relative = package_path[len("/Game/"):].replace("/", os.sep)
+    return os.path.join(CONTENT_DIR, relative + ".uasset")
+
+def spine_object_paths(base_name):
+    """(atlas, skeleton data) object paths of an advanced skin's merged spine package"""
+    package_path = f"{CHARACTERS_PATH}/{base_name}/{base_name}"
+    return f"{package_path}.{base_name}-atlas", f"{package_path}.{base_name}-data"
+
+def flatten_skin_lists(catalog):
+    """skin_catalog.SkinCatalog -> (simple_skins, advanced_base_skins, advanced_extend_skins) PNG name lists"""
+    return tuple([record.png for record in catalog.of_kind(kind)] for kind in ("simple", "advanced", "extension"))
+
+# --- DataTable rows ---
+
+def load_row_allocation():
+    """Persisted skin id -> DataTable row map, { 7: 12, ... }"""
+    if not os.path.exists(ROW_ALLOCATION_PATH):
+        return {}
+    try:
+        with open(ROW_ALLOCATION_PATH, 'r', encoding='utf-8') as f:
+            return {int(sid): int(row) for sid, row in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+def save_row_allocation(allocation):
+    if not os.path.exists(BUILD_CACHE_DIR):
+        os.makedirs(BUILD_CACHE_DIR)
+    with open(ROW_ALLOCATION_PATH, 'w', encoding='utf-8') as f:
+        json.dump({str(sid): row for sid, row in sorted(allocation.items())}, f, indent=1)
+
+def seed_row_allocation(allocation, current_rows):
+    """Seed an empty allocation from rows already in the DataTable (first run with this script version)"""
+    if allocation:
+        return allocation
+    for name, values in current_rows.items():
+        match = re.search(r"/p(\d+)_Lily/", values[1]) if len(values) > 1 else None
+        if match and name.isdigit() and int(name) >= FIRST_ADVANCED_ROW:
+            allocation[int(match.group(1))] = int(name)
+    return allocation
+
+def allocate_rows(advanced_ids, allocation):
+    """
+    Give every advanced skin a stable DataTable row
+    Existing allocations never move (also for skins that were removed, so their row is not reused).
+    A new id prefers row 12 + (id - 7), the level SwitchSkinMod derives from the id,
+    and otherwise takes the next free row.
+    """
+    used = set(allocation.values())
+    for sid in sorted(advanced_ids):
+        if sid in allocation:
+            continue
+        row = FIRST_ADVANCED_ROW + (sid - 7)
+        if row in used or row < FIRST_ADVANCED_ROW:
+            row = max(used | {FIRST_ADVANCED_ROW - 1}) + 1
+        allocation[sid] = row
+        used.add(row)
+    return allocation
+
+def build_data_table_rows(advanced_ids, allocation):
+    """
+    Desired DT_SpineData_p0000 content
+    Returns: { row_name: [Notify, Atlas, Skeleton, LightMaterial] } (base rows from the CSV, then advanced rows)
+    """
+    rows = {}
+    if os.path.exists(CSV_PATH):
+        with open(CSV_PATH, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            for row in reader:
+                if row and int(row[0]) < FIRST_ADVANCED_ROW: rows[row[0]] = row[1:]
+
+    for sid in sorted(advanced_ids, key=lambda sid: allocation[sid]):
+        atlas_path, data_path = spine_object_paths(base_skin_name(sid))
+        rows[str(allocation[sid])] = [
+            "/Game/_Zenith/Characters/p0001_Lily/p0001_Lily-notify.p0001_Lily-notify",  # Shared notify file
+            atlas_path,                                                                  # Atlas reference
+            data_path,                                                                   # Skeleton data reference
+            "MaterialInstanceConstant'/Game/_Zenith/Characters/p0000_Lily/MI_LilyLight1.MI_LilyLight1'"  # Light material
+        ]
+    return rows
+
+def normalize_reference(value):
+    """Class'/Game/Path.Object' and "/Game/Path.Object" -> /Game/Path.Object, so exports compare with the CSV"""
+    value = value.strip().strip('"')
+    if value.endswith("'") and "'" in value[:-1]:
+        value = value[value.index("'") + 1:-1]
+    return value
+
+def diff_data_table_rows(current, desired):
+    """Row-level diff; returns (added, changed, removed) row name lists"""
+    added = [name for name in desired if name not in current]
+    removed = [name for name in current if name not in desired]
+    changed = [name for name in desired if name in current and
+               [normalize_reference(v) for v in current[name]] != [normalize_reference(v) for v in desired[name]]]
+    return added, changed, removed
+
+def rows_to_csv_string(rows):
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["---"] + DT_COLUMNS)
+    for name, values in rows.items():
+        writer.writerow([name] + values)
+    return output.getvalue()
+
+# --- Skin index and memory report ---
+
+def estimate_resident_memory(catalog):
+    """
+    Estimate memory held by ExtendSkinAssets at runtime
+    - hard layout: every texture, atlas and skeleton is loaded with the data asset
+    - soft layout: only the skin being worn (its texture plus, for advanced skins, atlas and skeleton)
+    Textures are counted as DXT5 without mips (1 byte per texel); spine assets by source file size.
+    Returns: (hard_bytes, lazy_bytes)
+    """
+    skin_costs = []
+    for record in catalog:
+        if record.kind == "simple":
+            skin_costs.append(SIMPLE_TEXTURE_TEXELS * RESIDENT_BYTES_PER_TEXEL)
+            continue
+        texel_bytes = record.w * record.h * RESIDENT_BYTES_PER_TEXEL
+        if record.kind == "advanced":
+            texel_bytes += sum(os.path.getsize(p) for p in (record.atlas, record.skel) if os.path.exists(p))
+        skin_costs.append(texel_bytes)
+
+    hard_bytes = sum(skin_costs)
+    lazy_bytes = max(skin_costs) if skin_costs else 0
+    return int(hard_bytes), int(lazy_bytes)
+
+def build_skin_index(catalog, allocation, chunk_allocation=None, aliases=None):
+    """
+    Precomputed skin table for SwitchSkinMod (no name parsing or dedupe on the game thread)
+    Variants whose texture is an alias (texture_dedupe) point at the texture they duplicate.
+    Returns: {
+        "variants": { "p0001": ["", "1_", "2_"], ... },    # variants of the fixed base skins 1-6
+        "advanced": [ {"asset": "p0007", "level": 12, "variants": ["", "1_"]}, ... ],  # sorted by id
+        "chunks": { "p0001": 5, ... }, "paks": { 5: "EnderLilies_More_Skins_Mod_Chunk5_0_P", ... }  # chunk_planner
+    }
+    Variant lists are sorted with the base texture ("") first, then by variant number.
+    """
+    aliases = aliases or {}
+    variants, textures = {}, {}
+    for sid in sorted(catalog.by_id):
+        records = sorted(catalog.by_id[sid], key=lambda record: record.variant)
+        variants[sid] = [""] + [f"{record.variant}_" for record in records if record.variant]
+        # Base textures of skins 1-6 are original game assets and not in the catalog (nor the index)
+        textures[skin_key(sid)] = {f"{record.variant}_" if record.variant else "":
+                                   catalog.by_name.get(aliases.get(record.name), record).content for record in records}
+
+    advanced = []
+    for sid in catalog.advanced_ids():
+        atlas_path, data_path = spine_object_paths(base_skin_name(sid))
+        advanced.append({
+            "asset": skin_key(sid),
+            # The DataTable row is the skin level the game uses for this skin
+            "level": allocation.get(sid, FIRST_ADVANCED_ROW + (sid - 7)),
+            "variants": variants[sid],
+            "atlas": atlas_path,
+            "data": data_path,
+        })
+
+    chunk_allocation = chunk_allocation or {}
+    return {
+        "variants": {skin_key(sid): variant_list for sid, variant_list in variants.items() if sid <= 6},
+        "textures": textures,
+        "advanced": advanced,
+        "chunks": {skin_key(sid): chunk_id for sid, chunk_id in sorted(chunk_allocation.items())},
+        "paks": {chunk_id: pak_name(chunk_id) for chunk_id in sorted(set(chunk_allocation.values()))},
+    }
+
+def render_skin_index_lua(index):
+    """Render the skin index as the source of a Lua module"""
+    def lua_list(values):
+        return "{" + ", ".join(f'"{v}"' for v in values) + "}"
+
+    lines = [
+        "-- Generated by Scripts/CreateMoreLilySkins.py. Do not edit by hand.",
+        "return {",
+        "    variants = {",
+    ]
+    for asset, variant_names in index["variants"].items():
+        lines.append(f"        {asset} = {lua_list(variant_names)},")
+    lines.append("    },")
+    lines.append("    textures = {")
+    for asset, paths in index["textures"].items():
+        entries = ", ".join(f'["{variant}"] = "{path}"' for variant, path in paths.items())
+        lines.append(f"        {asset} = {{{entries}}},")
+    lines.append("    },")
+    lines.append("    advanced = {")
+    for skin in index["advanced"]:
+        lines.append(f'        {{asset = "{skin["asset"]}", level = {skin["level"]}, variants = {lua_list(skin["variants"])}, '
+                     f'atlas = "{skin["atlas"]}", data = "{skin["data"]}"}},')
+    lines.append("    },")
+    # Skin -> chunk (pak) the skin's assets are cooked into
+    lines.append("    chunks = {")
+    for asset, chunk_id in index["chunks"].items():
+        lines.append(f"        {asset} = {chunk_id},")
+    lines.append("    },")
+    lines.append("    paks = {")
+    for chunk_id, name in index["paks"].items():
+        lines.append(f'        [{chunk_id}] = "{name}",')
+    lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def skin_index_changed(index, lua_path):
+    if not os.path.exists(lua_path):
+        return True
+    with open(lua_path, 'r', encoding='utf-8') as f:
+        return f.read() != render_skin_index_lua(index)
+
+def write_skin_index_lua(index, lua_path):
+    """Write the skin index as a Lua module (returns True if the file content changed)"""
+    if not skin_index_changed(index, lua_path):
+        return False
+    with open(lua_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(render_skin_index_lua(index))
+    return True
+
+# --- Build plan ---
+
+class BuildPlan:
+    """
+    Operations needed to bring the generated assets up to date
+    - texture_imports / spine_imports: [{"asset_path", "source", "dest", "name", "fingerprint", ...}, ...]
+      (spine imports also carry "atlas", "json" and "layers_fingerprint")
+    - layer_updates: [{"asset_path", "json", "fingerprint"}, ...] skeleton data assets whose
+      DefaultSkins.json alone changed (no reimport)
+    - data_table, data_asset, chunks, chunk3: stage operation dict with its "fingerprint", or None when up to date
+    - skipped: asset paths whose inputs are unchanged
+    - catalog: the skin_catalog.SkinCatalog the stages were planned from
+    - skin_lists: (simple_skins, advanced_base_skins, advanced_extend_skins) PNG name lists
+    - skin_index: SkinIndex.lua content for the planned row allocation
+    - chunk_manifest: chunk_manifest.json content for the planned chunk allocation
+    - aliases: { alias_texture_name: canonical_texture_name } duplicates that are not imported (--dedupe)
+    """
+    STAGES = ("data_table", "data_asset", "chunks", "chunk3")
+
+    def __init__(self):
+        self.texture_imports = []
+        self.spine_imports = []
+        self.layer_updates = []
+        self.skipped = []
+        self.data_table = None
+        self.data_asset = None
+        self.chunks = None
+        self.chunk3 = None
+        self.catalog = None
+        self.skin_lists = ([], [], [])
+        self.skin_index = None
+        self.chunk_manifest = None
+        self.aliases = {}
+
+    @property
+    def imports(self):
+        """Textures first, so the spine factory can resolve its page texture"""
+        return self.texture_imports + self.spine_imports
+
+    def is_empty(self):
+        """True when nothing needs the editor (SkinIndex.lua is written without it)"""
+        return not (self.texture_imports or self.spine_imports or self.layer_updates
+                    or any(getattr(self, stage) for stage in self.STAGES))
+
+    def summary_lines(self, verbose=True):
+        """Human-readable plan; verbose=False leaves out the per-import lines"""
+        simple_skins, advanced_base_skins, advanced_extend_skins = self.skin_lists
+        lines = [
+            f"Skins: {len(simple_skins)} simple, {len(advanced_base_skins)} advanced base, {len(advanced_extend_skins)} advanced extend",
+            f"Imports: {len(self.texture_imports)} textures, {len(self.spine_imports)} spine assets, {len(self.skipped)} unchanged",
+        ]
+        if self.aliases:
+            lines.append(f"Duplicates: {len(self.aliases)} textures aliased instead of imported")
+        for alias, texture in sorted(self.aliases.items()) if verbose else []:
+            lines.append(f"- Alias {alias} -> {texture}")
+        for op in self.imports if verbose else []:
+            lines.append(f"- Import {op['asset_path']} <- {os.path.basename(op['source'])}")
+        for op in self.layer_updates:
+            lines.append(f"- DefaultSkins {op['asset_path']} <- {os.path.basename(op['json'])}")
+        if self.data_table:
+            lines.append(f"- DataTable {DT_PATH}: {len(self.data_table['rows'])} rows ({len(self.data_table['advanced_ids'])} advanced)")
+        if self.data_asset:
+            layout = "soft references" if self.data_asset["soft_references"] else "hard references"
+            lines.append(f"- ExtendSkinAssets: {len(self.data_asset['textures'])} textures, {len(self.data_asset['atlases'])} atlases, "
+                         f"{len(self.data_asset['skeletons'])} skeletons ({layout})")
+        for label in self.chunks["labels"] if self.chunks else []:
+            lines.append(f"- Chunk{label['chunk_id']}: {len(label['simple_textures'])} simple textures, "
+                         f"{len(label['advanced_folders'])} advanced folders, {len(label['mod_assets'])} mod assets")
+        for label_path in self.chunks["released"] if self.chunks else []:
+            lines.append(f"- {label_path.rsplit('/', 1)[-1]}: no skins left, emptied")
+        if self.chunk3:
+            lines.append(f"- Chunk3: {len(self.chunk3['assets'])} assets")
+        if self.is_empty():
+            lines.append("Nothing to do in the editor")
+        return lines
+
+    def to_dict(self):
+        return {
+            "texture_imports": self.texture_imports,
+            "spine_imports": self.spine_imports,
+            "layer_updates": self.layer_updates,
+            "skipped": self.skipped,
+            "data_table": self.data_table,
+            "data_asset": self.data_asset,
+            "chunks": self.chunks,
+            "chunk3": self.chunk3,
+            "skin_lists": dict(zip(("simple", "advanced_base", "advanced_extend"), self.skin_lists)),
+            "skin_index": self.skin_index,
+            "chunk_manifest": self.chunk_manifest,
+            "aliases": self.aliases,
+        }
+
+
+def _plan_import(plan, queue, manifest, fingerprint, asset_path, source, force=False, **extra):
+    if not force and not manifest.is_asset_dirty(asset_path, fingerprint, asset_file_path(asset_path)):
+        manifest.skip_asset(asset_path)
+        plan.skipped.append(asset_path)
+        return
+    dest, name = asset_path.rsplit("/", 1)
+    op = {"asset_path": asset_path, "source": source, "dest": dest + "/", "name": name, "fingerprint": fingerprint}
+    op.update(extra)
+    queue.append(op)
+
+def build_plan(catalog, manifest, soft_references=False, aliases=None):
+    """
+    Decide every operation of a build from the skin catalog (skin_catalog.SkinCatalog) and the build manifest
+    Nothing is written: the manifest is only read (plus its in-memory file hash cache).
+    `aliases` are the duplicate textures found by texture_dedupe.find_texture_aliases (--dedupe).
+    """
+    plan = BuildPlan()
+    spine_fingerprints = plan_imports(plan, catalog, manifest, aliases)
+    plan_stages(plan, catalog, manifest, soft_references, spine_fingerprints, aliases)
+    return plan
+
+def plan_imports(plan, catalog, manifest, aliases=None):
+    """
+    Queue the imports whose inputs changed on `plan` (part 1 of build_plan)
+    Works on any subset of the skin catalog, e.g. one skin folder at a time. Textures are imported
+    from wherever their records point (ExtendSkins, or the atlas_repack / texture_tiers output).
+    Returns the spine asset fingerprints, which plan_stages needs for the data asset.
+    """
+    aliases = aliases or {}
+
+    # 1. Texture imports: simple extensions, advanced bases, advanced extensions (aliases are not imported)
+    def plan_texture(record):
+        if record.name in aliases:
+            return
+        fingerprint = manifest.fingerprint([record.source], TEXTURE_IMPORT_SETTINGS)
+        _plan_import(plan, plan.texture_imports, manifest, fingerprint, record.content.split(".")[0], record.source)
+
+    for record in catalog.of_kind("simple"):
+        plan_texture(record)
+
+    spine_fingerprints = []
+    for record in catalog.of_kind("advanced"):
+        base_name = record.base
+        plan_texture(record)
+
+        # Only the skel file is imported; the modified C++ factory loads the atlas next to it.
+        # DefaultSkins.json has its own fingerprint (keyed by the skeleton data object path), so an
+        # edit of the JSON alone only sets the layers on the existing asset
+        json_path = os.path.join(EXTEND_SKINS_ROOT, base_name, "DefaultSkins.json")
+        spine_path = f"{CHARACTERS_PATH}/{base_name}/{base_name}"
+        data_path = spine_object_paths(base_name)[1]
+        fingerprint = manifest.fingerprint([record.skel, record.atlas])
+        layers_fingerprint = manifest.fingerprint([json_path])
+        spine_fingerprints.append(fingerprint)
+        layers_dirty = manifest.is_asset_dirty(data_path, layers_fingerprint)
+        if layers_dirty and os.path.exists(json_path) and not manifest.is_asset_dirty(spine_path, fingerprint, asset_file_path(spine_path)):
+            plan.layer_updates.append({"asset_path": data_path, "json": json_path, "fingerprint": layers_fingerprint})
+            manifest.skip_asset(spine_path)
+            plan.skipped.append(spine_path)
+        else:
+            # A removed DefaultSkins.json needs the reimport to restore the factory defaults
+            _plan_import(plan, plan.spine_imports, manifest, fingerprint, spine_path, record.skel, force=layers_dirty,
+                         atlas=record.atlas, json=json_path, layers_fingerprint=layers_fingerprint)
+
+    for record in catalog.of_kind("extension"):
+        plan_texture(record)
+    return spine_fingerprints
+
+def plan_stages(plan, catalog, manifest, soft_references, spine_fingerprints, aliases=None):
+    """Plan the DataTable, data asset, label and skin index stages for the whole catalog (part 2 of build_plan)"""
+    plan.catalog = catalog
+    plan.aliases = dict(aliases or {})
+    # 2. DataTable rows (only for advanced base skins)
+    advanced_ids = catalog.advanced_ids()
+    allocation = allocate_rows(advanced_ids, load_row_allocation())
+    dt_fingerprint = manifest.fingerprint([CSV_PATH], advanced_ids)
+    if manifest.is_stage_dirty("update_data_table", dt_fingerprint, asset_file_path(DT_PATH)):
+        plan.data_table = {
+            "fingerprint": dt_fingerprint,
+            "advanced_ids": advanced_ids,
+            "rows": build_data_table_rows(advanced_ids, allocation),
+        }
+
+    # 3. Data asset arrays and chunk label contents, both derived from the skin lists
+    simple_skins, advanced_base_skins, advanced_extend_skins = flatten_skin_lists(catalog)
+    plan.skin_lists = (simple_skins, advanced_base_skins, advanced_extend_skins)
+    skin_lists = {
+        "simple": sorted(simple_skins),
+        "advanced_base": sorted(advanced_base_skins),
+        "advanced_extend": sorted(advanced_extend_skins),
+        # Fingerprints of the spine assets they reference
+        "spine": sorted(spine_fingerprints),
+        "soft_references": soft_references,
+    }
+    if plan.aliases:
+        skin_lists["aliases"] = sorted(plan.aliases.items())
+    # The soft reference layout leaves the arrays empty, so the skin lists do not matter for it
+    lists_fingerprint = manifest.fingerprint([], {"soft_references": True} if soft_references else skin_lists)
+
+    if manifest.is_stage_dirty("update_extend_skin_data_asset", lists_fingerprint, asset_file_path(EXTEND_SKIN_ASSETS_PATH)):
+        records = catalog.of_kind("simple") + catalog.of_kind("advanced") + catalog.of_kind("extension")
+        spine_paths = [spine_object_paths(record.base) for record in catalog.of_kind("advanced")]
+        plan.data_asset = {
+            "fingerprint": lists_fingerprint,
+            "soft_references": soft_references,
+            "textures": [record.content for record in records if record.name not in plan.aliases],
+            "atlases": [atlas for atlas, data in spine_paths],
+            "skeletons": [data for atlas, data in spine_paths],
+        }
+
+    # Skins are packed into size-budgeted chunks, the mod assets stay in the core chunk (Chunk2)
+    skin_bytes = estimate_skin_bytes(catalog, plan.aliases)
+    previous_chunks = load_chunk_allocation()
+    chunk_allocation = allocate_chunks(skin_bytes, previous_chunks)
+    plan.chunk_manifest = build_chunk_manifest(chunk_allocation, skin_bytes)
+
+    def chunk_label(chunk_id):
+        label_path = CHUNK2_LABEL_PATH if chunk_id == CORE_CHUNK_ID else SKIN_CHUNK_LABEL_PATH.format(chunk_id=chunk_id)
+        return {"chunk_id": chunk_id, "label": label_path, "simple_textures": [], "advanced_folders": [], "mod_assets": []}
+
+    labels = {CORE_CHUNK_ID: chunk_label(CORE_CHUNK_ID)}
+    labels[CORE_CHUNK_ID]["mod_assets"] = list(MOD_ASSETS)
+
+    def label_of(record):
+        chunk_id = chunk_allocation[record.id]
+        return labels.setdefault(chunk_id, chunk_label(chunk_id))
+
+    for record in sorted(catalog.of_kind("simple"), key=lambda record: record.name):
+        if record.name not in plan.aliases:
+            label_of(record)["simple_textures"].append(record.content)
+    for record in sorted(catalog.of_kind("advanced"), key=lambda record: record.name):
+        # Advanced skins are labeled per folder; their extension textures live there too,
+        # so a new advanced extension does not change the chunk labels
+        label_of(record)["advanced_folders"].append(f"{CHARACTERS_PATH}/{record.base}")
+    chunks = {"labels": [labels[chunk_id] for chunk_id in sorted(labels)]}
+    chunks_fingerprint = manifest.fingerprint([], chunks)
+    if manifest.is_stage_dirty("setup_chunk_labels", chunks_fingerprint, asset_file_path(CHUNK2_LABEL_PATH)):
+        # Skin chunks of the last build without skins now are emptied (not part of the fingerprint)
+        released = sorted(set(previous_chunks.values()) - set(labels) - {CORE_CHUNK_ID})
+        plan.chunks = dict(chunks, fingerprint=chunks_fingerprint,
+                           released=[SKIN_CHUNK_LABEL_PATH.format(chunk_id=chunk_id) for chunk_id in released])
+
+    # 4. Chunk3 follows the DataTable stage
+    chunk3_fingerprint = manifest.fingerprint([], dt_fingerprint)
+    if manifest.is_stage_dirty("setup_chunk3_label", chunk3_fingerprint, asset_file_path(CHUNK3_LABEL_PATH)):
+        plan.chunk3 = {"fingerprint": chunk3_fingerprint, "assets": [DT_PATH]}
+
+    plan.skin_index = build_skin_index(catalog, allocation, chunk_allocation, plan.aliases)
+
+
+if __name__ == "__main__":
+    from skin_catalog import load_catalog
+
+    def log_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    skins = load_catalog(log_error=log_error)
+    aliases = None
+    if DEDUPE_TEXTURES:
+        from texture_dedupe import TextureHashIndex, find_texture_aliases
+        hash_index = TextureHashIndex()
+        aliases = find_texture_aliases(skins, hash_index)
+        hash_index.save()
+    if REPACK_ATLASES:
+        from atlas_repack import repack_advanced_skins
+        repack_advanced_skins(skins)
+    if TEXTURE_TIER > 1:
+        from texture_tiers import generate_tiers, use_tier
+        generate_tiers(skins, [TEXTURE_TIER])
+        use_tier(skins, TEXTURE_TIER)
+    # The manifest is read only; the editor run records what it built
+    plan = build_plan(skins, BuildManifest(MANIFEST_PATH, force=FORCE_REBUILD), SOFT_REFERENCE_LAYOUT, aliases)
+    if "--json" in sys.argv:
+        print(json.dumps(plan.to_dict(), indent=1))
+    else:
+        for line in plan.summary_lines():
+            print(line)
+        if skin_index_changed(plan.skin_index, SKIN_INDEX_LUA_PATH):
+            print(f"SkinIndex.lua is out of date: {SKIN_INDEX_LUA_PATH}")
+    if "--check" in sys.argv:
+        if not plan.is_empty():
+            sys.exit(1)
+        save_chunk_manifest(plan.chunk_manifest)
+        if write_skin_index_lua(plan.skin_index, SKIN_INDEX_LUA_PATH):
+            print(f"Updated skin index: {SKIN_INDEX_LUA_PATH}")
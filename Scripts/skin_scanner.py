@@ -0,0 +1,269 @@
+import os
+import json
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from atlas_parser import load_atlas, validate_atlas
+from skel_reader import load_default_skins, read_skeleton, validate_skeleton
+from skin_catalog import parse_skin_name
+
+"""
+Single-pass ExtendSkins scanner
+
+Walks ExtendSkins/ with os.scandir, reads PNG headers on a thread pool and keeps a
+persistent directory index keyed on (path, size, mtime). Rescanning an unchanged
+tree therefore only costs the directory listings and stat calls.
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+INDEX_VERSION = 1
+SCAN_WORKERS = 8
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def get_png_info(file_path):
+    """Parse PNG file header to get resolution and bit depth
+
+    Returns:
+        tuple: (info_dict, error_string)
+        info_dict contains: w (width), h (height), bd (bit depth), ct (color type)
+        Color types: 0=Grayscale, 2=RGB, 3=Palette, 4=GrayscaleAlpha, 6=RGBA
+    """
+    with open(file_path, 'rb') as f:
+        # Read 33 bytes to ensure coverage of IHDR chunk
+        data = f.read(33)
+        if len(data) < 26 or data[:8] != PNG_SIGNATURE:
+            return None, "Invalid PNG"
+        # IHDR chunk starts from byte 16: Width(4), Height(4), BitDepth(1), ColorType(1)
+        width, height, bit_depth, color_type = struct.unpack('>IIBB', data[16:26])
+        return {"w": width, "h": height, "bd": bit_depth, "ct": color_type}, ""
+
+
+def _safe_png_info(file_path):
+    try:
+        return get_png_info(file_path)
+    except OSError as e:
+        return None, str(e)
+
+
+def load_index(index_path):
+    """Load the persisted directory index: { path: [size, mtime_ns, info, error] }"""
+    if not index_path or not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_index(index_path, entries):
+    if not index_path:
+        return
+    index_dir = os.path.dirname(index_path)
+    if index_dir and not os.path.exists(index_dir):
+        os.makedirs(index_dir)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": INDEX_VERSION, "entries": entries}, f, separators=(",", ":"))
+    os.replace(tmp_path, index_path)
+
+
+def parse_skin_folder(folder_name):
+    """Return the skin id of a pXXXX_Lily folder, or None if the name does not match"""
+    parsed = parse_skin_name(folder_name)
+    return parsed[0] if parsed and parsed[1] == 0 and not folder_name.endswith(".png") else None
+
+
+def list_skin_folders(root):
+    """
+    One scandir pass over ExtendSkins/
+    Returns: [(folder_name, folder_path, skin_id, {file_name: (size, mtime_ns)}), ...] sorted by name
+    """
+    folders = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            skin_id = parse_skin_folder(entry.name)
+            if skin_id is None:
+                continue
+            files = {}
+            with os.scandir(entry.path) as folder_it:
+                for f in folder_it:
+                    if f.is_file():
+                        st = f.stat()
+                        files[f.name] = (st.st_size, st.st_mtime_ns)
+            folders.append((entry.name, entry.path, skin_id, files))
+    folders.sort(key=lambda folder: folder[0])
+    return folders
+
+
+def _extension_pngs(folder_name, files):
+    """Match pXXXX_y_Lily.png of the folder's skin id, exclude the base png that might exist in folder"""
+    sid = parse_skin_folder(folder_name)
+    extensions = []
+    for f in files:
+        parsed = parse_skin_name(f) if f.endswith(".png") else None
+        if parsed and parsed[0] == sid and parsed[1] > 0:
+            extensions.append(f)
+    return sorted(extensions)
+
+
+def _misnamed_pngs(folder_name, files):
+    """pXXXX_..._Lily.png files of the folder that are not pXXXX_y_Lily.png with a numeric variant y"""
+    prefix = folder_name[:-len("_Lily")] + "_"
+    return sorted(f for f in files if f.startswith(prefix) and f.endswith("_Lily.png")
+                  and f != folder_name + ".png" and not parse_skin_name(f))
+
+
+def read_png_headers(paths_with_stat, index, max_workers=SCAN_WORKERS):
+    """
+    Resolve PNG header info for [(path, size, mtime_ns), ...]
+    Index hits cost nothing; misses are read in parallel on a thread pool.
+    Returns: ({path: (info, error)}, new_index_entries)
+    """
+    results = {}
+    new_entries = {}
+    misses = []
+    for path, size, mtime in paths_with_stat:
+        cached = index.get(path)
+        if cached and cached[0] == size and cached[1] == mtime:
+            results[path] = (cached[2], cached[3])
+            new_entries[path] = cached
+        else:
+            misses.append((path, size, mtime))
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as pool:
+            infos = pool.map(_safe_png_info, [m[0] for m in misses])
+            for (path, size, mtime), (info, err) in zip(misses, infos):
+                results[path] = (info, err)
+                new_entries[path] = [size, mtime, info, err]
+    return results, new_entries
+
+
+def check_atlas(atlas_path, png_info, png_name, cache_dir=None):
+    """Parse an advanced skin's atlas and validate it against its base texture
+    Returns: (atlas or None, error list)"""
+    try:
+        atlas = load_atlas(atlas_path, cache_dir)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        return None, [f"Failed to parse atlas: {e}"]
+    return atlas, validate_atlas(atlas, png_info, png_name)
+
+
+def check_skeleton(skel_path, atlas, json_path, base_name):
+    """Read the .skel skin table and check it against the atlas and DefaultSkins; returns error list"""
+    try:
+        skeleton = read_skeleton(skel_path)
+        default_skins = load_default_skins(json_path, base_name)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        # SkelFormatError and JSON errors are ValueErrors
+        return [f"Failed to read: {e}"]
+    return validate_skeleton(skeleton, atlas, default_skins)
+
+
+def scan_extend_skins(root, index_path=None, max_workers=SCAN_WORKERS, log_error=print, atlas_cache_dir=None, folders=None):
+    """
+    Scan ExtendSkins folder and validate structure
+    Returns:
+    - simple_extensions: { "p0001_Lily": [extension PNG list], ... }
+    - advanced_bases: { 7: {"name": "p0007_Lily", "png": path, "atlas": path, "skel": path, "w": 0, "h": 0} }
+    - advanced_extensions: { "p0007_Lily": [extension PNG list], ... }
+    `folders` is a list_skin_folders result to reuse (skin_catalog lists the tree before it scans).
+    """
+    if not os.path.isdir(root):
+        log_error("Missing dir: " + root)
+        return {}, {}, {}
+
+    folders = list_skin_folders(root) if folders is None else folders
+    index = load_index(index_path)
+
+    # Collect every PNG whose header is needed, then resolve them in one parallel pass
+    wanted = []
+    for folder_name, folder_path, skin_id, files in folders:
+        names = _extension_pngs(folder_name, files)
+        if skin_id >= 7:
+            names.append(folder_name + ".png")
+        for name in names:
+            if name in files:
+                size, mtime = files[name]
+                wanted.append((os.path.join(folder_path, name), size, mtime))
+    png_infos, new_index = read_png_headers(wanted, index, max_workers)
+    save_index(index_path, new_index)
+
+    simple_extensions = {}
+    advanced_bases = {}
+    advanced_extensions = {}
+
+    for folder_name, folder_path, skin_id, files in folders:
+        for f in _misnamed_pngs(folder_name, files):
+            log_error(f"Extension {f} skipped: variant must be a number ({folder_name[:-len('_Lily')]}_<number>_Lily.png)")
+
+        # --- Case A: Simple skin extensions (1-6) ---
+        if 1 <= skin_id <= 6:
+            valid_exts = []
+            for f in _extension_pngs(folder_name, files):
+                info, err = png_infos[os.path.join(folder_path, f)]
+                if not err and info['w'] == 1024 and info['h'] == 256:
+                    valid_exts.append(f)
+                else:
+                    log_error(f"Simple extension {f} must be 1024x256")
+            if valid_exts: simple_extensions[folder_name] = valid_exts
+
+        # --- Case B: Advanced skins (7+) ---
+        elif skin_id >= 7:
+            # Validate trinity files (required for advanced skins)
+            png_file = folder_name + ".png"      # Texture file
+            atlas_file = folder_name + ".atlas"  # Spine atlas data
+            skel_file = folder_name + ".skel"    # Binary skeleton data
+
+            if not (png_file in files and atlas_file in files and skel_file in files):
+                log_error(f"Advanced folder {folder_name} missing Trinity files (.png, .atlas, .skel)")
+                continue
+
+            base_png_path = os.path.join(folder_path, png_file)
+            info, err = png_infos[base_png_path]
+            if err or info['ct'] != 6:  # ColorType 6 = RGBA
+                log_error(f"Advanced base {png_file} must be RGBA8888 (ColorType=6)")
+                continue
+
+            atlas, atlas_errors = check_atlas(os.path.join(folder_path, atlas_file), info, png_file, atlas_cache_dir)
+            if atlas_errors:
+                for err in atlas_errors:
+                    log_error(f"Advanced atlas {atlas_file}: {err}")
+                continue
+
+            json_path = os.path.join(folder_path, "DefaultSkins.json") if "DefaultSkins.json" in files else None
+            skel_errors = check_skeleton(os.path.join(folder_path, skel_file), atlas, json_path, folder_name)
+            if skel_errors:
+                for err in skel_errors:
+                    log_error(f"Advanced skeleton {skel_file}: {err}")
+                continue
+
+            advanced_bases[skin_id] = {
+                "name": folder_name,
+                "png": base_png_path,
+                "atlas": os.path.join(folder_path, atlas_file),
+                "skel": os.path.join(folder_path, skel_file),
+                "w": info['w'], "h": info['h']
+            }
+
+            # Find extensions for this advanced skin
+            valid_exts = []
+            for f in _extension_pngs(folder_name, files):
+                ext_info, err = png_infos[os.path.join(folder_path, f)]
+                # Validate if size matches this advanced skin's base image
+                if not err and ext_info['w'] == info['w'] and ext_info['h'] == info['h']:
+                    valid_exts.append(f)
+                else:
+                    log_error(f"Extension {f} size must match base {info['w']}x{info['h']}")
+            if valid_exts: advanced_extensions[folder_name] = valid_exts
+
+    return simple_extensions, advanced_bases, advanced_extensions
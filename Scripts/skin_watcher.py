@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+
+"""
+Filesystem watcher for the ExtendSkins folder (CreateMoreLilySkins.py --watch)
+
+InotifyWatcher uses Linux inotify through ctypes; everywhere else (Windows, or
+when inotify is unavailable) PollingWatcher compares scandir snapshots of the
+tree. Both report the paths of changed skin files (.png, .atlas, .skel,
+DefaultSkins.json) and skin folders.
+
+wait_for_changes blocks until something changes, then keeps collecting until
+the tree has been quiet for `debounce` seconds, so the burst of writes an image
+editor does on save becomes one rebuild. describe_changes maps a batch of
+changed files to the work the build plan will do for them.
+
+Usage outside the editor:
+    python skin_watcher.py [root] [--poll]    print debounced change batches until Ctrl+C
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+WATCHED_EXTENSIONS = (".png", ".atlas", ".skel", ".json")
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_relevant(path):
+    """Skin files and folders; editor temp files (~, .tmp, .psd) are ignored"""
+    name = os.path.basename(path)
+    if name.startswith(".") or name.endswith("~"):
+        return False
+    _, ext = os.path.splitext(name)
+    return ext.lower() in WATCHED_EXTENSIONS or not ext
+
+
+class PollingWatcher:
+    """Detects changes by comparing (size, mtime) snapshots of the tree"""
+
+    def __init__(self, root, interval=1.0):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            try:
+                entries = list(os.scandir(stack.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    snapshot[entry.path] = (0, 0)
+                    stack.append(entry.path)
+                elif is_relevant(entry.path):
+                    st = entry.stat()
+                    snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout):
+        """Changed paths seen within `timeout` seconds (returns early once something changed)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify on the root and every skin folder below it"""
+
+    def __init__(self, root):
+        import ctypes
+        import ctypes.util
+        self.root = root
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+        self._add_tree(root)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = path
+
+    def _add_tree(self, path):
+        """Watch a directory and its subfolders; returns every path found (new folders may already have files)"""
+        found = []
+        self._add_watch(path)
+        for dir_path, dir_names, file_names in os.walk(path):
+            for name in dir_names:
+                self._add_watch(os.path.join(dir_path, name))
+            found.extend(os.path.join(dir_path, name) for name in dir_names + file_names)
+        return found
+
+    def _read_events(self):
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return changed
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost: report the whole tree
+                    changed.update(self._add_tree(self.root))
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, name) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._add_tree(path))
+                if is_relevant(path):
+                    changed.add(path)
+
+    def changes(self, timeout):
+        """Changed paths seen within `timeout` seconds (returns early once something changed)"""
+        readable, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        return self._read_events() if readable else set()
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(root, force_polling=False, poll_interval=1.0):
+    """InotifyWatcher on Linux, PollingWatcher otherwise (or when inotify cannot be set up)"""
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, poll_interval)
+
+
+def wait_for_changes(watcher, debounce=0.5, timeout=None):
+    """
+    Block until files change, then until no further change arrives for `debounce` seconds
+    Returns the sorted changed paths, or [] if `timeout` seconds pass without any change.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    changed = set()
+    while not changed:
+        wait = 1.0 if deadline is None else deadline - time.monotonic()
+        if wait <= 0:
+            return []
+        changed = watcher.changes(min(wait, 1.0))
+    while True:
+        more = watcher.changes(debounce)
+        if not more:
+            return sorted(changed)
+        changed |= more
+
+
+def describe_changes(root, paths):
+    """
+    Expected work per changed file, e.g. "p0007_Lily/p0007_3_Lily.png: texture import, ExtendSkinAssets"
+    The build plan decides the actual operations from the manifest; this is the explanation shown
+    before the rebuild.
+    """
+    lines = []
+    for path in paths:
+        relative = os.path.relpath(path, root)
+        name = os.path.basename(path).lower()
+        base = os.path.basename(os.path.dirname(path))
+        if relative.count(os.sep) == 0:
+            work = "skin folder added or removed: rescan, DataTable/labels if the skin set changed"
+        elif name == "defaultskins.json":
+            work = "DefaultSkins update on the spine asset"
+        elif name.endswith((".skel", ".atlas")):
+            work = "spine reimport + DefaultSkins"
+        elif name.endswith(".png") and name[:-4] == base.lower():
+            work = "base texture import"
+        elif name.endswith(".png"):
+            work = "texture import, ExtendSkinAssets (+ its chunk label for p0001-p0006)"
+        else:
+            continue
+        lines.append(f"{relative}: {work}")
+    return lines
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--poll"]
+    watch_root = args[0] if args else os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ExtendSkins")
+    watcher = make_watcher(watch_root, force_polling="--poll" in sys.argv)
+    print(f"Watching {os.path.abspath(watch_root)} with {type(watcher).__name__}, Ctrl+C to stop")
+    try:
+        while True:
+            for line in describe_changes(watch_root, wait_for_changes(watcher)):
+                print(line)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
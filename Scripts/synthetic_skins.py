@@ -0,0 +1,213 @@
+"""
+Synthetic ExtendSkins tree generator
+
+Writes N simple skin extensions (spread over p0001-p0006) and M advanced skins
+(p0007 and up, each with .png/.atlas/.skel, DefaultSkins.json and extension
+textures) to a folder, so the build can be timed on libraries of any size.
+A share of the files can be made invalid on purpose: wrong resolution, broken
+PNG signature, non-RGBA base texture or a missing trinity file.
+
+PNGs are real (all-zero pixels, tiny IDAT), atlases use the Spine 3.8 text
+format and skeletons are minimal Spine 3.8 binaries with one region attachment
+per skin, all readable by skin_scanner.
+
+Usage outside the editor:
+    python synthetic_skins.py <output_dir> <simple_count> <advanced_count> [--extensions K] [--invalid RATIO] [--seed S]
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+import os
+import sys
+import json
+import zlib
+import random
+import shutil
+import struct
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+SIMPLE_SIZE = (1024, 256)
+ADVANCED_SIZE = (1024, 512)
+REGION_SIZE = 32
+
+_png_cache = {}
+
+
+def _chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+
+
+def make_png(width, height, color_type=6):
+    """Encode an all-zero 8-bit image (cached per shape, the bytes are identical)"""
+    key = (width, height, color_type)
+    if key not in _png_cache:
+        channels = {0: 1, 2: 3, 4: 2, 6: 4}[color_type]
+        raw = (b'\0' * (width * channels + 1)) * height
+        _png_cache[key] = (PNG_SIGNATURE
+                           + _chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+                           + _chunk(b'IDAT', zlib.compress(raw, 9))
+                           + _chunk(b'IEND', b''))
+    return _png_cache[key]
+
+
+def write_png(path, width, height, color_type=6, corrupt_signature=False):
+    data = make_png(width, height, color_type)
+    if corrupt_signature:
+        data = b'\x89PNX' + data[4:]
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def region_names(base_name):
+    return ["_common/white", f"{base_name}/Body", "_Meat_Head_0/Head"]
+
+
+def write_atlas(path, base_name, width, height):
+    lines = [f"{base_name}.png", f"size: {width},{height}", "format: RGBA8888", "filter: Linear,Linear", "repeat: none"]
+    for i, name in enumerate(region_names(base_name)):
+        x = (i * REGION_SIZE) % (width - REGION_SIZE)
+        lines += [name, "  rotate: false", f"  xy: {x}, 0", f"  size: {REGION_SIZE}, {REGION_SIZE}",
+                  f"  orig: {REGION_SIZE}, {REGION_SIZE}", "  offset: 0, 0", "  index: -1"]
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write("\n" + "\n".join(lines) + "\n")
+
+
+# --- Minimal Spine 3.8 binary writer (the layout skel_reader.py reads) ---
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        b = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _string(value):
+    if value is None:
+        return _varint(0)
+    data = value.encode('utf-8')
+    return _varint(len(data) + 1) + data
+
+
+def _floats(*values):
+    return b''.join(struct.pack('>f', v) for v in values)
+
+
+def make_skeleton(skins, version="3.8.99"):
+    """skins: { skin_name: region_path } -> .skel bytes with one bone, one slot and one region attachment per skin"""
+    strings = []
+
+    def ref(value):
+        if value not in strings:
+            strings.append(value)
+        return _varint(strings.index(value) + 1)
+
+    body = bytearray()
+    body += _varint(1) + _string("root") + _floats(0, 0, 0, 1, 1, 0, 0, 0) + _varint(0) + b'\0'  # bones
+    body += _varint(1) + _string("slot0") + _varint(0) + b'\xff' * 8 + _varint(0) + _varint(0)  # slots
+    body += _varint(0) + _varint(0) + _varint(0)  # ik, transform and path constraints
+
+    body += _varint(0)  # empty default skin
+    body += _varint(len(skins))
+    for skin_name, region_path in skins.items():
+        body += ref(skin_name) + _varint(0) * 4 + _varint(1)       # name, no bones/constraints, one slot
+        body += _varint(0) + _varint(1)                            # slot 0, one attachment
+        body += ref(region_path) + ref(region_path) + bytes([0])   # region attachment
+        body += ref(region_path) + _floats(0, 0, 0, 1, 1, REGION_SIZE, REGION_SIZE) + b'\xff' * 4
+
+    header = _string("synthetic") + _string(version) + _floats(0, 0, 100, 100) + b'\0'
+    table = _varint(len(strings)) + b''.join(_string(s) for s in strings)
+    # Events and animation counts follow the skins
+    return header + table + bytes(body) + _varint(0) + _varint(0)
+
+
+def write_skeleton(path, base_name):
+    regions = region_names(base_name)
+    with open(path, 'wb') as f:
+        f.write(make_skeleton({"_common": regions[0], base_name: regions[1], "_Meat_Head_0": regions[2]}))
+
+
+def generate_tree(root, simple_count, advanced_count, extensions=2, invalid_ratio=0.0, seed=0):
+    """
+    Write a synthetic ExtendSkins tree to `root` (replacing it)
+    Returns: {"valid_simple", "valid_advanced", "valid_extensions", "invalid_files", "png_files"} counts
+    """
+    rng = random.Random(seed)
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    os.makedirs(root)
+    stats = {"valid_simple": 0, "valid_advanced": 0, "valid_extensions": 0, "invalid_files": 0, "png_files": 0}
+
+    def invalid():
+        return invalid_ratio > 0 and rng.random() < invalid_ratio
+
+    # Simple extensions, spread over p0001-p0006
+    for i in range(simple_count):
+        sid = 1 + i % 6
+        folder = os.path.join(root, f"p{sid:04d}_Lily")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"p{sid:04d}_{i // 6 + 1}_Lily.png")
+        stats["png_files"] += 1
+        if invalid():
+            stats["invalid_files"] += 1
+            if rng.random() < 0.5:
+                write_png(path, 512, 256)
+            else:
+                write_png(path, *SIMPLE_SIZE, corrupt_signature=True)
+        else:
+            write_png(path, *SIMPLE_SIZE)
+            stats["valid_simple"] += 1
+
+    # Advanced skins p0007+
+    for i in range(advanced_count):
+        sid = 7 + i
+        base_name = f"p{sid:04d}_Lily"
+        folder = os.path.join(root, base_name)
+        os.makedirs(folder)
+        width, height = ADVANCED_SIZE
+        broken = invalid()
+        stats["png_files"] += 1
+        write_png(os.path.join(folder, base_name + ".png"), width, height, 2 if broken else 6)
+        write_atlas(os.path.join(folder, base_name + ".atlas"), base_name, width, height)
+        if not (broken and rng.random() < 0.5):
+            write_skeleton(os.path.join(folder, base_name + ".skel"), base_name)
+        with open(os.path.join(folder, "DefaultSkins.json"), 'w', encoding='utf-8') as f:
+            json.dump({"DefaultSkins": ["_common", base_name, "_Meat_Head_0"]}, f, indent=2)
+        if broken:
+            stats["invalid_files"] += 1
+        else:
+            stats["valid_advanced"] += 1
+
+        for n in range(1, extensions + 1):
+            stats["png_files"] += 1
+            ext_path = os.path.join(folder, f"p{sid:04d}_{n}_Lily.png")
+            if invalid():
+                write_png(ext_path, width // 2, height)
+                stats["invalid_files"] += 1
+            else:
+                write_png(ext_path, width, height)
+                if not broken:
+                    stats["valid_extensions"] += 1
+    return stats
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    options = {"--extensions": "2", "--invalid": "0", "--seed": "0"}
+    positional = []
+    while args:
+        arg = args.pop(0)
+        if arg in options:
+            options[arg] = args.pop(0)
+        else:
+            positional.append(arg)
+    if len(positional) != 3:
+        print(__doc__)
+        sys.exit(2)
+    result = generate_tree(positional[0], int(positional[1]), int(positional[2]), int(options["--extensions"]),
+                           float(options["--invalid"]), int(options["--seed"]))
+    print(json.dumps(result, indent=1))
@@ -0,0 +1,65 @@
+"""
+Checks of png_validator.validate_png against damaged image data
+
+    python -m unittest test_png_validator
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from png_validator import validate_png
+from synthetic_skins import PNG_SIGNATURE, _chunk, make_png
+
+
+class ValidatePngTest(unittest.TestCase):
+    WIDTH, HEIGHT = 16, 8
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".png")
+        os.close(handle)
+        self.png = make_png(self.WIDTH, self.HEIGHT)
+        # Signature, IHDR (25 bytes), then the IDAT length and type
+        self.idat_data = len(PNG_SIGNATURE) + 25 + 8
+        self.idat_length = struct.unpack('>I', self.png[self.idat_data - 8:self.idat_data - 4])[0]
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def validate(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return validate_png(self.path)
+
+    def test_intact(self):
+        info, err = self.validate(self.png)
+        self.assertEqual(err, "")
+        self.assertEqual((info["w"], info["h"]), (self.WIDTH, self.HEIGHT))
+
+    def test_flipped_idat_byte_fails_crc(self):
+        data = bytearray(self.png)
+        data[self.idat_data + 2] ^= 0xFF
+        info, err = self.validate(bytes(data))
+        self.assertEqual(err, "CRC mismatch in IDAT chunk")
+
+    def test_flipped_compressed_byte_with_valid_crc(self):
+        # The CRC matches the damaged chunk: the damage is only found by inflating it
+        compressed = self.png[self.idat_data:self.idat_data + self.idat_length]
+        for position in range(len(compressed)):
+            damaged = bytearray(compressed)
+            damaged[position] ^= 0xFF
+            data = self.png[:self.idat_data - 8] + _chunk(b'IDAT', bytes(damaged)) + _chunk(b'IEND', b'')
+            info, err = self.validate(data)
+            self.assertTrue(err, f"byte {position} flipped but the file validated")
+
+    def test_corrupt_zlib_header(self):
+        compressed = bytearray(self.png[self.idat_data:self.idat_data + self.idat_length])
+        compressed[0] ^= 0xFF
+        data = self.png[:self.idat_data - 8] + _chunk(b'IDAT', bytes(compressed)) + _chunk(b'IEND', b'')
+        info, err = self.validate(data)
+        self.assertTrue(err.startswith("Corrupt image data: "), err)
+
+
+if __name__ == "__main__":
+    unittest.main()
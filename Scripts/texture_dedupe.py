@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import zlib
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from skin_config import TEXTURE_HASH_INDEX_PATH, ATLAS_CACHE_DIR, DEDUPE_TOLERANCE
+from build_manifest import hash_file
+from atlas_parser import load_atlas
+from png_validator import can_spawn_processes
+from png_codec import PngRows
+
+"""
+Duplicate texture detection for the skin PNGs (--dedupe)
+
+Contributed skin packs often ship variants that are pixel-identical to another
+variant or to the base texture, only saved with different compression. Every
+PNG is decoded one scanline at a time (png_codec; the editor's Python has no
+image library) and hashed over its RGBA8 pixels, so two files with the same
+pixels get the same hash whatever their PNG encoding. Hashes
+are cached by (path, size, mtime) like the scan index, so only new or edited
+files are decoded, on a process pool outside the editor.
+
+Within one skin, a texture with the pixels of an earlier one (the advanced base
+first, then the variants in number order) becomes an alias: it is not imported,
+and SkinIndex.lua points its variant at the texture it duplicates. With
+--dedupe-tolerance <n> two textures of the same size also count as duplicates
+when no channel of any pixel differs by more than n; for advanced skins only the
+pixels inside the atlas regions are compared, the rest of the page is unused.
+
+Aliases never cross skins: a skin's chunk pak must not depend on another skin's.
+
+Usage outside the editor:
+    python texture_dedupe.py [--dedupe-tolerance N]    print the duplicate textures of ExtendSkins
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+HASH_INDEX_VERSION = 1
+DEDUPE_WORKERS = os.cpu_count() or 4
+
+
+def texture_hash(file_path):
+    """
+    Hash the pixels of a PNG, independent of its compression and filters
+    Returns:
+        tuple: ({"w", "h", "format", "pixels"}, error_string); error_string is "" on success
+    """
+    try:
+        with PngRows(file_path) as png:
+            entry = {"w": png.info["w"], "h": png.info["h"], "format": png.format}
+            if png.format == "file":
+                entry["pixels"] = hash_file(file_path)
+                return entry, ""
+            h = hashlib.blake2b(digest_size=20)
+            if png.format == "raw":
+                h.update(bytes((png.info["bd"], png.info["ct"])) + png.palette + png.transparency)
+                rows = png.rows()
+            else:
+                rows = png.rgba_rows()
+            for row in rows:
+                h.update(row)
+            entry["pixels"] = h.hexdigest()
+            return entry, ""
+    except (OSError, ValueError, zlib.error) as e:
+        return None, str(e)
+
+
+def _row_spans(rects, width, height):
+    """Atlas region rectangles -> per row the merged [(x0, x1), ...] pixel spans they cover"""
+    rows = [[] for _ in range(height)]
+    for x, y, w, h in rects:
+        x0, x1 = max(0, x), min(width, x + w)
+        if x0 < x1:
+            for row in range(max(0, y), min(height, y + h)):
+                rows[row].append((x0, x1))
+    for row, spans in enumerate(rows):
+        merged = []
+        for x0, x1 in sorted(spans):
+            if merged and x0 <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], x1))
+            else:
+                merged.append((x0, x1))
+        rows[row] = merged
+    return rows
+
+
+def within_tolerance(path_a, path_b, tolerance, rects=None):
+    """
+    True if two 8-bit PNGs of the same size differ by at most `tolerance` in every channel
+    of every pixel; with atlas region `rects` [(x, y, w, h), ...] only those pixels count.
+    Both files are decoded side by side, one scanline at a time.
+    """
+    try:
+        with PngRows(path_a) as a, PngRows(path_b) as b:
+            if a.format != "rgba8" or b.format != "rgba8" or (a.info["w"], a.info["h"]) != (b.info["w"], b.info["h"]):
+                return False
+            width = a.info["w"]
+            spans = _row_spans(rects, width, a.info["h"]) if rects else None
+            for y, (row_a, row_b) in enumerate(zip(a.rgba_rows(), b.rgba_rows())):
+                if row_a == row_b:
+                    continue
+                for x0, x1 in spans[y] if spans else ((0, width),):
+                    part_a, part_b = row_a[x0 * 4:x1 * 4], row_b[x0 * 4:x1 * 4]
+                    if part_a != part_b and any(abs(p - q) > tolerance for p, q in zip(part_a, part_b)):
+                        return False
+            return True
+    except (OSError, ValueError, zlib.error):
+        return False
+
+
+class TextureHashIndex:
+    """
+    Persistent pixel hash cache: { path: [size, mtime_ns, entry] }
+    Entries of files that were not asked for in this run are dropped on save, like the scan index.
+    Safe to share between the pipeline worker threads.
+    """
+
+    def __init__(self, index_path=TEXTURE_HASH_INDEX_PATH):
+        self.index_path = index_path
+        self.entries = {}
+        self.used = {}
+        self._lock = threading.Lock()
+        if index_path and os.path.exists(index_path):
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == HASH_INDEX_VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def hashes(self, paths, max_workers=DEDUPE_WORKERS):
+        """
+        Pixel hash entry of every PNG, { path: entry or None (unreadable) }
+        Cache misses are decoded in parallel (process pool, or threads inside the editor).
+        """
+        results = {}
+        misses = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                results[path] = None
+                continue
+            cached = self.entries.get(path)
+            if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                results[path] = cached[2]
+                with self._lock:
+                    self.used[path] = cached
+            else:
+                misses.append((path, st.st_size, st.st_mtime_ns))
+
+        if misses:
+            workers = max(1, min(max_workers, len(misses)))
+            executor_class = ProcessPoolExecutor if can_spawn_processes() and workers > 1 else ThreadPoolExecutor
+            with executor_class(max_workers=workers) as pool:
+                for (path, size, mtime), (entry, err) in zip(misses, pool.map(texture_hash, [m[0] for m in misses])):
+                    results[path] = entry
+                    if entry is not None:
+                        with self._lock:
+                            self.used[path] = [size, mtime, entry]
+        return results
+
+    def save(self):
+        if not self.index_path:
+            return
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir and not os.path.exists(index_dir):
+            os.makedirs(index_dir)
+        with self._lock:
+            entries = dict(self.used)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": HASH_INDEX_VERSION, "entries": entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+
+def find_texture_aliases(catalog, hash_index, tolerance=DEDUPE_TOLERANCE, max_workers=DEDUPE_WORKERS,
+                         atlas_cache_dir=ATLAS_CACHE_DIR):
+    """
+    Find the textures of every skin of a skin_catalog.SkinCatalog that duplicate an earlier texture of the same skin
+    The advanced base comes first, then the extensions by variant number, so the base
+    texture (which the spine atlas references) is never an alias.
+    Returns: { alias_texture_name: canonical_texture_name }, e.g. {"p0007_2_Lily": "p0007_Lily"}
+    """
+    skins = {}  # skin id -> [(texture_name, png_path)]
+    regions = {}  # skin id -> atlas page rectangles of an advanced skin
+    for sid, records in catalog.by_id.items():
+        base = catalog.base_record(sid)
+        if base is not None and tolerance > 0:
+            try:
+                atlas = load_atlas(base.atlas, atlas_cache_dir)
+                regions[sid] = [atlas.page_rect(row) for row in range(len(atlas))]
+            except (OSError, ValueError, UnicodeDecodeError):
+                pass
+        # Within a skin: the advanced base (variant 0) first, then the extensions by variant number
+        skins[sid] = [(record.name, record.source) for record in sorted(records, key=lambda record: record.variant)]
+
+    hashes = hash_index.hashes([path for textures in skins.values() for _, path in textures], max_workers)
+    aliases = {}
+    for sid, textures in skins.items():
+        canonical = {}  # pixel hash key -> texture name
+        kept = []  # (texture_name, png_path, entry) of the textures that stay
+        for name, path in textures:
+            entry = hashes.get(path)
+            if entry is None:
+                continue
+            key = (entry["w"], entry["h"], entry["format"], entry["pixels"])
+            match = canonical.get(key)
+            if match is None and tolerance > 0 and entry["format"] == "rgba8":
+                match = next((kept_name for kept_name, kept_path, kept_entry in kept
+                              if kept_entry["format"] == "rgba8" and (kept_entry["w"], kept_entry["h"]) == (entry["w"], entry["h"])
+                              and within_tolerance(kept_path, path, tolerance, regions.get(sid))), None)
+            if match is None:
+                canonical[key] = name
+                kept.append((name, path, entry))
+            else:
+                canonical.setdefault(key, match)
+                aliases[name] = match
+    return aliases
+
+
+if __name__ == "__main__":
+    from skin_catalog import load_catalog
+
+    def log_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    index = TextureHashIndex()
+    found = find_texture_aliases(load_catalog(log_error=log_error), index)
+    index.save()
+    for alias, texture in sorted(found.items()):
+        print(f"{alias} -> {texture}")
+    print(f"{len(found)} duplicate textures")
@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from skin_config import TIERS_DIR, TEXTURE_TIER
+from png_codec import read_rgba, write_png
+from png_validator import can_spawn_processes
+
+"""
+Downscaled texture tiers for low-memory targets (--texture-tier <n>)
+
+Skin textures are imported at their source resolution without mips, so a handheld
+pays the same texture memory as a desktop. Tier n is every skin texture (simple
+extensions, advanced bases and their extensions) scaled down by n in both
+directions: each output texel is the area average of an n x n block, with the
+colour weighted by alpha so transparent texels do not darken the edges. The .atlas
+of every advanced skin is scaled with its texture (positions round down, sizes
+round up) and written next to a copy of the .skel, which the spine factory loads
+the atlas with.
+
+A tier lives in Saved/CreateMoreLilySkins/tiers/x<n>/<skin folder>/, like ExtendSkins,
+and is regenerated per file when its source changes. A build with --texture-tier n
+imports tier n instead of the source textures (after --repack, if given), so
+texture memory and chunk sizes shrink by about n squared; the asset paths stay the
+same, a deployment picks its tier by the build it ships. Tier 1 is the source itself.
+
+Usage outside the editor:
+    python texture_tiers.py 2 4    generate tiers 2 and 4 of ExtendSkins (one process pool for every texture)
+
+This module does not depend on `unreal` and can be used outside the editor.
+"""
+
+TIERS_VERSION = 1
+TIER_WORKERS = os.cpu_count() or 4
+TIER_STATE_FILE = "tier.json"
+# Largest downscale factor (block sums have to fit the 16-bit lanes of downscale_rows)
+MAX_TIER = 16
+
+# Pipeline workers generate the units of one tier side by side and share its state file
+_state_lock = threading.Lock()
+
+
+def tier_size(w, h, tier):
+    """Texture size at a tier (partial blocks at the right/bottom edge round up)"""
+    return -(-w // tier), -(-h // tier)
+
+
+def tier_dir(tier, out_root=TIERS_DIR):
+    return os.path.join(out_root, f"x{tier}")
+
+
+def downscale_rows(rows, width, height, tier):
+    """
+    RGBA8 rows -> rows of the texture scaled down by `tier` (a power of two up to MAX_TIER)
+    Every output texel averages a tier x tier block (edge texels repeat into partial blocks).
+    Colour is averaged weighted by alpha; where the alpha of a block is uniform (opaque or
+    transparent areas, most of a skin) that is the plain average, which is computed for a whole
+    block row at once in 16-bit lanes of one big integer. Only blocks whose alpha varies
+    (region edges) are weighted texel by texel.
+    """
+    if tier < 2 or tier > MAX_TIER or tier & (tier - 1):
+        raise ValueError(f"Texture tier {tier} is not a power of two between 2 and {MAX_TIER}")
+    out_w, out_h = tier_size(width, height, tier)
+    padded_w = out_w * tier
+    pad = padded_w - width
+    lanes = padded_w * 4
+    shift = (tier * tier).bit_length() - 1
+    rounding = int.from_bytes((tier * tier // 2).to_bytes(2, 'little') * lanes, 'little')
+    low_bytes = int.from_bytes(b"\xff\x00" * lanes, 'little')
+    wide = bytearray(lanes * 2)
+
+    out = []
+    for out_y in range(out_h):
+        block = []
+        for y in range(out_y * tier, out_y * tier + tier):
+            row = bytes(rows[min(y, height - 1)])
+            block.append(row + row[-4:] * pad if pad else row)
+
+        # Plain average: column sums of the block rows, then of `tier` neighbouring texels (64 bits apart)
+        total = 0
+        for row in block:
+            wide[0::2] = row
+            total += int.from_bytes(wide, 'little')
+        sums = total
+        for k in range(1, tier):
+            sums += total >> (64 * k)
+        average = (((sums + rounding) >> shift) & low_bytes).to_bytes(lanes * 2, 'little')[0::2]
+        out_row = bytearray(out_w * 4)
+        for channel in range(4):
+            out_row[channel::4] = average[channel::4 * tier]
+
+        # Blocks whose alpha varies: a texel differs from the one above it or from its left neighbour
+        first = int.from_bytes(block[0][3::4], 'little')
+        vertical = 0
+        for row in block[1:]:
+            vertical |= int.from_bytes(row[3::4], 'little') ^ first
+        adjacent = first ^ (first >> 8)
+        varies = 0
+        for k in range(tier):
+            varies |= vertical >> (8 * k)
+            if k < tier - 1:
+                varies |= adjacent >> (8 * k)
+        flags = varies.to_bytes(padded_w, 'little')[0::tier]
+        if flags.count(0) == out_w:
+            out.append(out_row)
+            continue
+        for x, flag in enumerate(flags):
+            if not flag:
+                continue
+            start = x * tier * 4
+            alpha = 0
+            weighted = [0, 0, 0]
+            for row in block:
+                for i in range(start, start + tier * 4, 4):
+                    a = row[i + 3]
+                    alpha += a
+                    weighted[0] += row[i] * a
+                    weighted[1] += row[i + 1] * a
+                    weighted[2] += row[i + 2] * a
+            for channel in range(3):
+                out_row[x * 4 + channel] = (weighted[channel] + alpha // 2) // alpha
+        out.append(out_row)
+    return out
+
+
+def scale_atlas(lines, tier):
+    """
+    Atlas text scaled down by `tier`: positions (xy, offset) round down, extents (page size,
+    size, orig) round up, so every region stays inside the page and inside its original size.
+    Everything else, including indentation and separators, is kept as it was.
+    """
+    def down(values):
+        return [v // tier for v in values]
+
+    def up(values):
+        return [-(-v // tier) for v in values]
+
+    scales = {"xy": down, "size": up, "orig": up, "offset": down,
+              "bounds": lambda v: down(v[:2]) + up(v[2:]), "offsets": lambda v: down(v[:2]) + up(v[2:])}
+    out = []
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        stripped = line.strip()
+        if ":" in stripped:
+            key, value = stripped.split(":", 1)
+            key, value = key.strip(), value.strip()
+            if key in scales:
+                indent = line[:len(line) - len(line.lstrip())]
+                sep = ", " if ", " in value else ","
+                scaled = scales[key]([int(v) for v in value.split(",")])
+                line = f"{indent}{key}: {sep.join(str(v) for v in scaled)}"
+        out.append(line + "\n")
+    return out
+
+
+def tier_texture(job):
+    """
+    Write one downscaled texture (runs in a worker process)
+    job: (src_path, dst_path, tier). Returns: (dst_path, error_string); error_string is "" on success
+    """
+    src_path, dst_path, tier = job
+    try:
+        width, height, rows = read_rgba(src_path)
+        out_w, out_h = tier_size(width, height, tier)
+        write_png(dst_path, out_w, out_h, downscale_rows(rows, width, height, tier))
+        return dst_path, ""
+    except (OSError, ValueError) as e:
+        return dst_path, str(e)
+
+
+def _load_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, TIER_STATE_FILE), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state.get("files", {}) if state.get("version") == TIERS_VERSION else {}
+
+
+def _save_state(out_dir, updates):
+    """Merge { dst_path: source key } into the state of a tier"""
+    with _state_lock:
+        files = _load_state(out_dir)
+        files.update(updates)
+        os.makedirs(out_dir, exist_ok=True)
+        state_path = os.path.join(out_dir, TIER_STATE_FILE)
+        with open(state_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"version": TIERS_VERSION, "files": files}, f, separators=(",", ":"))
+        os.replace(state_path + ".tmp", state_path)
+
+
+def _source_key(path):
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns]
+
+
+def plan_tier(catalog, tier, out_root=TIERS_DIR):
+    """
+    Files of one tier: { dst_path: src_path } for every texture, atlas and skel of a skin_catalog.SkinCatalog
+    Sources are wherever the records point (ExtendSkins, or the atlas_repack output).
+    """
+    out_dir = tier_dir(tier, out_root)
+    files = {}
+    for record in catalog:
+        skin_dir = os.path.join(out_dir, record.base)
+        for path in (record.source, record.atlas, record.skel):
+            if path:
+                files[os.path.join(skin_dir, os.path.basename(path))] = path
+    return files
+
+
+def generate_tiers(catalog, tiers, out_root=TIERS_DIR, max_workers=TIER_WORKERS):
+    """
+    Bring the given tiers up to date; every out-of-date texture of every tier is one job on a process pool
+    Works on any subset of the skin catalog (the pipeline generates one unit at a time).
+    Returns: { tier: {"textures": int, "generated": int, "errors": [message, ...]} }
+    """
+    reports = {}
+    jobs, states = [], {}
+    for tier in tiers:
+        out_dir = tier_dir(tier, out_root)
+        previous = _load_state(out_dir)
+        files = plan_tier(catalog, tier, out_root)
+        state = states[tier] = {}
+        reports[tier] = {"textures": 0, "generated": 0, "errors": []}
+        for dst, src in files.items():
+            try:
+                key = _source_key(src)
+            except OSError as e:
+                reports[tier]["errors"].append(str(e))
+                continue
+            is_png = dst.endswith(".png")
+            reports[tier]["textures"] += is_png
+            if previous.get(dst) == key and os.path.exists(dst):
+                state[dst] = key
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            if is_png:
+                jobs.append((tier, key, (src, dst, tier)))
+                continue
+            # Atlas and skeleton: scaled or copied right here
+            if dst.endswith(".atlas"):
+                with open(src, 'r', encoding='utf-8') as f:
+                    atlas_lines = scale_atlas(f, tier)
+                with open(dst, 'w', encoding='utf-8', newline='\n') as f:
+                    f.writelines(atlas_lines)
+            else:
+                shutil.copyfile(src, dst)
+            state[dst] = key
+
+    if jobs:
+        workers = max(1, min(max_workers, len(jobs)))
+        executor_class = ProcessPoolExecutor if can_spawn_processes() and workers > 1 else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as pool:
+            results = pool.map(tier_texture, [job for _, _, job in jobs], chunksize=max(1, len(jobs) // (workers * 4)))
+            for (tier, key, _), (dst, error) in zip(jobs, results):
+                if error:
+                    reports[tier]["errors"].append(f"{os.path.basename(dst)}: {error}")
+                else:
+                    states[tier][dst] = key
+                    reports[tier]["generated"] += 1
+
+    for tier, state in states.items():
+        _save_state(tier_dir(tier, out_root), state)
+    return reports
+
+
+def use_tier(catalog, tier, out_root=TIERS_DIR):
+    """Point the records of a skin_catalog.SkinCatalog at their files of a generated tier (source/atlas/skel, w/h)"""
+    out_dir = tier_dir(tier, out_root)
+    for record in catalog:
+        skin_dir = os.path.join(out_dir, record.base)
+        record.source = os.path.join(skin_dir, os.path.basename(record.source))
+        if record.atlas:
+            record.atlas = os.path.join(skin_dir, os.path.basename(record.atlas))
+            record.skel = os.path.join(skin_dir, os.path.basename(record.skel))
+        record.w, record.h = tier_size(record.w, record.h, tier)
+
+
+def summary_lines(reports):
+    lines = []
+    for tier, report in sorted(reports.items()):
+        failed = f", {len(report['errors'])} failed" if report["errors"] else ""
+        lines.append(f"Texture tier x{tier}: {report['textures']} textures, {report['generated']} regenerated{failed}")
+    return lines
+
+
+if __name__ == "__main__":
+    from skin_catalog import load_catalog
+
+    def log_error(message):
+        print(f"[ERROR] {message}", file=sys.stderr)
+
+    requested = [int(arg) for arg in sys.argv[1:] if arg.isdigit()] or [TEXTURE_TIER]
+    tier_reports = generate_tiers(load_catalog(log_error=log_error), [tier for tier in requested if tier > 1])
+    for tier_report in tier_reports.values():
+        for message in tier_report["errors"]:
+            log_error(message)
+    for line in summary_lines(tier_reports):
+        print(line)
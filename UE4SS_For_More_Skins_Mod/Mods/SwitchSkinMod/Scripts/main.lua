@@ -20,13 +20,48 @@ local INITIALIZED = false
 -- Parsing tool: Parse texture name (p0001_1_Lily -> ID:p0001, Prefix:1_)
 local function ParseVariant(fullName)
     local name = fullName:match("([^%.]+)$") or ""
-    local id, varNum = name:match("^(p%d%d%d%d)_(%d+)_Lily")
+    local id, varNum = name:match("^(p%d+)_(%d+)_Lily")
     if id and varNum then return id, varNum .. "_" end
-    return name:match("^(p%d%d%d%d)_Lily"), ""
+    return name:match("^(p%d+)_Lily"), ""
+end
+
+-- Fast path: precomputed table written by CreateMoreLilySkins.py (SkinIndex.lua)
+-- Variants are already deduplicated and sorted, levels come from the DataTable rows
+local function BuildSkinTableFromIndex(index)
+    SKINS = {}
+    local variants = index.variants or {}
+    local textures = index.textures or {}
+    local chunks = index.chunks or {}
+    for _, s in ipairs(BASE_SKINS) do
+        table.insert(SKINS, {asset = s.asset, level = s.level, variants = variants[s.asset] or {""},
+            textures = textures[s.asset], chunk = chunks[s.asset], isAdvanced = false})
+    end
+    -- Advanced skins keep object paths only; assets are loaded when the skin is selected
+    for _, s in ipairs(index.advanced or {}) do
+        table.insert(SKINS, {asset = s.asset, level = s.level, variants = s.variants, textures = textures[s.asset],
+            atlasPath = s.atlas, dataPath = s.data, chunk = chunks[s.asset], isAdvanced = true})
+    end
+    print(string.format("[Mod] Total Skins Loaded from SkinIndex: %d", #SKINS))
+    INITIALIZED = true
+end
+
+local SKIN_INDEX = nil
+do
+    local ok, index = pcall(require, "SkinIndex")
+    if ok and type(index) == "table" then
+        SKIN_INDEX = index
+    else
+        print("[Mod] SkinIndex not found, falling back to DataAsset scan")
+    end
 end
 
 -- Core: Build final skin table
 local function BuildSkinTable()
+    if SKIN_INDEX then
+        BuildSkinTableFromIndex(SKIN_INDEX)
+        return
+    end
+
     print("[Mod] Merging Base Skins with DataAsset...")
     
     -- Force reload the DataAsset
@@ -52,6 +87,11 @@ local function BuildSkinTable()
         if texArray then
             local texCount = texArray:GetArrayNum()
             print(string.format("[Mod] Found %d textures in DataAsset", texCount))
+            if texCount == 0 then
+                -- Soft reference builds (--soft-refs) leave the arrays empty, their skins are only listed in SkinIndex.lua
+                print("[Mod] WARNING: SkinIndex.lua is missing and the DataAsset lists no skin textures; " ..
+                      "only the base skins are available. Copy SkinIndex.lua from the build into Mods/SwitchSkinMod/Scripts")
+            end
             for i = 1, texCount do
                 local tex = texArray[i]
                 if tex and tex:IsValid() then
@@ -59,7 +99,7 @@ local function BuildSkinTable()
                     if id then
                         if not tempMap[id] then
                             -- Calculate correct level: p0007 = 12, p0008 = 13, p0009 = 14, etc.
-                            local idNum = tonumber(id:match("p(%d%d%d%d)"))
+                            local idNum = tonumber(id:match("p(%d+)"))
                             local level = idNum >= 7 and (12 + (idNum - 7)) or 12
                             tempMap[id] = {asset = id, level = level, variants = {}, isAdvanced = true}
                             table.insert(order, id)
@@ -86,7 +126,7 @@ local function BuildSkinTable()
             for i = 1, arr:GetArrayNum() do
                 local obj = arr[i]
                 if obj and obj:IsValid() then
-                    local id = obj:GetFullName():match("(p%d%d%d%d)")
+                    local id = obj:GetFullName():match("(p%d+)")
                     if id and tempMap[id] then 
                         tempMap[id][field] = obj
                         print(string.format("[Mod] Mapped %s for %s", field, id))
@@ -123,6 +163,13 @@ local function DetectCurrentVariant(animComp, skin)
     if not currentTex or not currentTex:IsValid() then return 1 end
     
     local currentTexName = currentTex:GetFullName():match("([^%.]+)$") or ""
+
+    -- Variants aliased at build time share one texture; keep the one applied last
+    local last = skin.lastVariant
+    local lastPath = last and skin.textures and skin.textures[skin.variants[last] or ""]
+    if lastPath and lastPath:match("([^%.]+)$") == currentTexName then
+        return last
+    end
     
     -- Match against all variants
     for i, prefix in ipairs(skin.variants) do
@@ -135,21 +182,32 @@ local function DetectCurrentVariant(animComp, skin)
     return 1
 end
 
+-- Name the pak a skin is cooked into (skins are split over chunk paks, see SkinIndex.paks)
+local function PrintMissingPak(skin)
+    local pak = skin.chunk and SKIN_INDEX and SKIN_INDEX.paks and SKIN_INDEX.paks[skin.chunk]
+    if pak then
+        print(string.format("[Mod] %s is in %s.pak, make sure it is in LogicMods", skin.asset, pak))
+    end
+end
+
 -- Apply texture for specific variant
 local function ApplyTexture(animComp, skin, vIndex)
     local variantPrefix = skin.variants[vIndex] or ""
     local texName = (variantPrefix == "") and (skin.asset .. "_Lily") or (skin.asset .. "_" .. variantPrefix .. "Lily")
-    local texPath = string.format("/Game/_Zenith/Characters/%s_Lily/Textures/%s.%s", skin.asset, texName, texName)
+    local texPath = (skin.textures and skin.textures[variantPrefix])
+        or string.format("/Game/_Zenith/Characters/%s_Lily/Textures/%s.%s", skin.asset, texName, texName)
     
     LoadAsset(texPath)
     local newTex = StaticFindObject(texPath)
     if newTex and newTex:IsValid() then
         if animComp.Atlas and animComp.Atlas:IsValid() then
             animComp.Atlas.atlasPages[1] = newTex
+            skin.lastVariant = vIndex
             print(string.format("[Applied] %s (Variant %d/%d)", texName, vIndex, #skin.variants))
         end
     else
         print("[Error] Failed to load texture: " .. texPath)
+        PrintMissingPak(skin)
     end
 end
 
@@ -179,7 +237,7 @@ local function SwitchSkin(index)
 
     -- Generate target path
     local folder = string.format("/Game/_Zenith/Characters/%s_Lily/", skin.asset)
-    local targetAtlasPath = string.format("%s%s_Lily.%s_Lily-atlas", folder, skin.asset, skin.asset)
+    local targetAtlasPath = skin.atlasPath or string.format("%s%s_Lily.%s_Lily-atlas", folder, skin.asset, skin.asset)
     
     local currentAtlasPath = ""
     if animComp.Atlas and animComp.Atlas:IsValid() then
@@ -195,7 +253,7 @@ local function SwitchSkin(index)
 
         -- If not configured in DataAsset (base skins), then search manually
         if not newAtlas or not newData then
-            local dataPath = folder .. skin.asset .. "_Lily." .. skin.asset .. "_Lily-data"
+            local dataPath = skin.dataPath or (folder .. skin.asset .. "_Lily." .. skin.asset .. "_Lily-data")
             LoadAsset(targetAtlasPath)
             LoadAsset(dataPath)
             newAtlas = StaticFindObject(targetAtlasPath)
@@ -209,6 +267,10 @@ local function SwitchSkin(index)
                 paramComp.SkinLevel = skin.level
             end
             animComp:ReplaceSpineData(newAtlas, newData, nil)
+            skin.lastVariant = nil
+        else
+            print("[Error] Failed to load skeleton: " .. targetAtlasPath)
+            PrintMissingPak(skin)
         end
     else
         -- Only cycle variants when staying on the same character